@@ -303,91 +303,13 @@ def load_users():
         print(f"❌ Unexpected error loading users: {e}")
         
 def generate_enhanced_report():
-    """Generate comprehensive data quality report with additional metrics"""
-    print("\n📊 Enhanced Data Quality Report")
-    print("=" * 50)
-    
+    """Print the data quality report for the freshly loaded data"""
+    from api.utils.data_quality import get_report
+    from data_quality_report import print_report
+
     with app.app_context():
-        # Sector Analysis
-        sector_stats = db.session.execute(text("""
-            SELECT sector,
-                   COUNT(*) as companies,
-                   COUNT(DISTINCT industry) as industries,
-                   GROUP_CONCAT(name) as company_names
-            FROM company
-            WHERE sector IS NOT NULL
-            GROUP BY sector
-            ORDER BY companies DESC
-        """)).fetchall()
-        
-        print("\n📊 Sector Distribution:")
-        for sector in sector_stats:
-            print(f"{sector[0]}:")
-            print(f"  Companies: {sector[1]}")
-            print(f"  Industries: {sector[2]}")
-            
-        # Financial Health Metrics
-        fin_health = db.session.execute(text("""
-            SELECT 
-                f.year,
-                COUNT(*) as records,
-                ROUND(AVG(revenue)/1000000, 2) as avg_revenue_m,
-                ROUND(AVG(return_on_equity), 2) as avg_roe,
-                ROUND(AVG(return_on_assets), 2) as avg_roa,
-                ROUND(AVG(current_ratio), 2) as avg_current_ratio,
-                ROUND(AVG(debt_to_equity), 2) as avg_debt_to_equity,
-                ROUND(AVG(profit_margin), 2) as avg_profit_margin
-            FROM financials f
-            GROUP BY year
-            ORDER BY year DESC
-        """)).fetchall()
-        
-        print("\n📈 Financial Trends by Year:")
-        for metric in fin_health:
-            print(f"\nYear {metric[0]}:")
-            print(f"  Number of Reports: {metric[1]}")
-            print(f"  Average Revenue: {metric[2]}M ETB")
-            print(f"  Return on Equity: {metric[3]}%")
-            print(f"  Return on Assets: {metric[4]}%")
-            print(f"  Current Ratio: {metric[5]}")
-            print(f"  Debt/Equity: {metric[6]}")
-            print(f"  Profit Margin: {metric[7]}%")
-            
-        # Macro Economic Overview
-        macro_stats = db.session.execute(text("""
-            SELECT 
-                strftime('%Y-%m', date) as month,
-                ROUND(AVG(gdp_growth), 2) as gdp_growth,
-                ROUND(AVG(inflation_rate), 2) as inflation,
-                ROUND(AVG(etb_usd), 2) as exchange_rate,
-                ROUND(AVG(npl_ratio), 2) as npl_ratio
-            FROM macro_indicators
-            GROUP BY strftime('%Y-%m', date)
-            ORDER BY date DESC
-            LIMIT 6
-        """)).fetchall()
-        
-        print("\n🌍 Recent Macro Trends (Last 6 Months):")
-        for macro in macro_stats:
-            print(f"\n{macro[0]}:")
-            print(f"  GDP Growth: {macro[1]}%")
-            print(f"  Inflation: {macro[2]}%")
-            print(f"  ETB/USD: {macro[3]}")
-            print(f"  NPL Ratio: {macro[4]}%")
+        print_report(get_report(force=True))
 
-        # Data Quality Metrics
-        quality_stats = db.session.execute(text("""
-            SELECT 
-                COUNT(DISTINCT company_id) as companies_with_data,
-                COUNT(DISTINCT year) as years_covered,
-                COUNT(*) as total_records
-            FROM financials
-        """)).fetchone()
-        
-        print("\n📋 Data Coverage:")
-        print(f"Companies with Financial Data: {quality_stats[0]} of {len(sector_stats)}")
-        print(f"Years of Historical Data: {quality_stats[1]}")
-        print(f"Total Financial Records: {quality_stats[2]}")
 def main():
     """Main function to orchestrate data loading"""
     print("🚀 Starting data import...")
@@ -0,0 +1,35 @@
+"""Build the columnar analytics mirror.
+
+The mirror is kept current after each ingestion; run this once to create
+it, or again after bulk changes made outside the ingestion pipeline:
+
+    python analytics_sync.py            # rebuild the mirror from market.db
+"""
+import argparse
+import time
+
+from app import create_app
+from api.utils.analytics import duckdb, AnalyticsStore
+from api.models.models import db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the DuckDB/Parquet analytics mirror")
+    parser.add_argument("--dir", help="mirror directory (defaults to ANALYTICS_DIR)")
+    args = parser.parse_args()
+
+    if duckdb is None:
+        print("❌ duckdb is not installed (pip install duckdb)")
+        return
+
+    app = create_app()
+    store = AnalyticsStore(args.dir or app.config["ANALYTICS_DIR"])
+    with app.app_context():
+        print(f"🚀 Rebuilding analytics mirror in {store.root}...")
+        started = time.perf_counter()
+        rows = store.rebuild(db.engine.url.database)
+        print(f"✅ Mirrored {rows:,} bars in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from api.utils.cache import cache
+from api.utils.cache import cache, init_cache
 from api.utils.limiter import limiter
 from api.utils.errors import init_error_handlers
 
@@ -9,6 +9,9 @@ def init_api(app):
     """Initialize API components"""
     if app is None:
         app = Flask(__name__)
+
+    # The blueprints cache through api.utils.cache, so bind it to this app
+    init_cache(app)
     
     # Register API blueprints
     from api.company_api import company_api
@@ -18,6 +21,8 @@ def init_api(app):
     from api.macro_api import macro_api
     from api.auth_api import auth_api
     from api.download_api import download_api
+    from api.admin_api import admin_api
+    from api.audit_api import audit_api
     
     # Register blueprints with URL prefixes
     blueprints = [
@@ -27,7 +32,9 @@ def init_api(app):
         (financials_api, '/api/v1'),
         (macro_api, '/api/v1'),
         (auth_api, '/api/v1'),
-        (download_api, '/api/v1')
+        (download_api, '/api/v1'),
+        (admin_api, '/api/v1'),
+        (audit_api, '/api/v1')
     ]
     
     for blueprint, url_prefix in blueprints:
@@ -0,0 +1,255 @@
+from flask import Blueprint, jsonify, request, current_app, send_file, url_for
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+from api.models.models import db, QuarantinedBar
+from api.utils.anomalies import review_bar
+from api.utils.auth import admin_required
+from api.utils.data_quality import get_report
+from api.utils.errors import APIError
+from api.utils.ingestion import IngestionError, sniff_dataset
+from api.utils.limiter import limiter
+from api.utils.uploads import uploads
+from api.utils.writer import write
+import logging
+import os
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+admin_api = Blueprint("admin_api", __name__)
+
+@admin_api.route("/admin/data-quality")
+@admin_required
+@limiter.limit("10/minute")
+def get_data_quality():
+    """Data quality report: coverage, gaps, stale tickers, null rates and outliers"""
+    try:
+        thresholds = {
+            "gap_days": request.args.get("gap_days", current_app.config["DATA_QUALITY_GAP_DAYS"], type=int),
+            "stale_days": request.args.get("stale_days", current_app.config["DATA_QUALITY_STALE_DAYS"], type=int),
+            "outlier_z": request.args.get("outlier_z", current_app.config["DATA_QUALITY_OUTLIER_Z"], type=float),
+        }
+        if any(value <= 0 for value in thresholds.values()):
+            raise APIError("Thresholds must be positive", status_code=400)
+
+        report = get_report(force=request.args.get("refresh") == "1", **thresholds)
+        return jsonify(report), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in get_data_quality: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in get_data_quality: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+def serialize_quarantined_bar(bar):
+    return {
+        "id": bar.id,
+        "company_id": bar.company_id,
+        "date": bar.date.isoformat(),
+        "open": bar.open,
+        "high": bar.high,
+        "low": bar.low,
+        "close": bar.close,
+        "volume": bar.volume,
+        "reasons": bar.reasons.split(","),
+        "return_z": bar.return_z,
+        "source": bar.source,
+        "status": bar.status,
+        "created_at": bar.created_at.isoformat() if bar.created_at else None,
+        "reviewed_at": bar.reviewed_at.isoformat() if bar.reviewed_at else None,
+    }
+
+def _review_quarantined_bar(bar_id, approve, user_id):
+    # Write job: the status check and the review cannot interleave with another
+    bar = db.session.get(QuarantinedBar, bar_id)
+    if not bar:
+        raise APIError("Quarantined bar not found", status_code=404)
+    if bar.status != "pending":
+        raise APIError(f"Bar was already {bar.status}", status_code=409)
+    review_bar(bar, approve, user_id)
+    return serialize_quarantined_bar(bar)
+
+@admin_api.route("/admin/quarantine")
+@admin_required
+@limiter.limit("30/minute")
+def get_quarantined_bars():
+    """Price bars held back by ingest-time anomaly screening"""
+    try:
+        page = request.args.get("page", 1, type=int)
+        per_page = min(request.args.get("per_page", 50, type=int), 500)
+        status = request.args.get("status", "pending")
+        company_id = request.args.get("company_id", type=int)
+
+        query = QuarantinedBar.query.filter_by(status=status)
+        if company_id:
+            query = query.filter_by(company_id=company_id)
+        paginated = query.order_by(QuarantinedBar.id.desc()).paginate(page=page, per_page=per_page)
+
+        return jsonify({
+            "bars": [serialize_quarantined_bar(b) for b in paginated.items],
+            "pagination": {
+                "total_items": paginated.total,
+                "total_pages": paginated.pages,
+                "current_page": page,
+                "per_page": per_page,
+            },
+        }), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in get_quarantined_bars: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in get_quarantined_bars: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@admin_api.route("/admin/quarantine/<int:bar_id>/<action>", methods=["POST"])
+@admin_required
+@limiter.limit("30/minute")
+def review_quarantined_bar(bar_id, action):
+    """Approve (load into stock) or reject a quarantined bar"""
+    try:
+        if action not in ("approve", "reject"):
+            raise APIError("Action must be approve or reject", status_code=400)
+
+        bar = write(_review_quarantined_bar, bar_id, action == "approve", get_jwt_identity())
+        return jsonify(bar), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in review_quarantined_bar: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in review_quarantined_bar: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@admin_api.route("/admin/slow-queries", methods=["GET", "DELETE"])
+@admin_required
+@limiter.limit("30/minute")
+def slow_queries():
+    """Slow statements aggregated by fingerprint; DELETE clears the log"""
+    try:
+        log = current_app.extensions["slow_query_log"]
+        if request.method == "DELETE":
+            log.clear()
+            return jsonify({"message": "Slow query log cleared"}), 200
+
+        limit = request.args.get("limit", 50, type=int)
+        entries = log.entries()
+        return jsonify({
+            "threshold_ms": current_app.config["SLOW_QUERY_MS"],
+            "fingerprints": len(entries),
+            "queries": entries[:limit],
+        }), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in slow_queries: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in slow_queries: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+UPLOAD_EXTENSIONS = (".csv", ".xlsx")
+UPLOAD_DATASETS = ("financials", "stocks")
+
+def serialize_upload(upload):
+    return {
+        **upload.to_dict(),
+        "status_url": url_for("admin_api.get_upload", upload_id=upload.id),
+        "report_url": (
+            url_for("admin_api.get_upload_rejections", upload_id=upload.id)
+            if upload.finished_at else None
+        ),
+    }
+
+@admin_api.route("/admin/uploads", methods=["POST"])
+@admin_required
+@limiter.limit("10/minute")
+def create_upload():
+    """
+    Upload a CSV or Excel file of financial statements or price bars
+    ---
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        required: true
+        description: >
+          .csv or .xlsx with the columns of the drop-folder files; companies
+          by company_id or ticker
+    responses:
+      202:
+        description: File spooled and queued for ingestion; poll status_url
+      400:
+        description: Missing file, unsupported type or unrecognised columns
+      413:
+        description: File larger than UPLOAD_MAX_CONTENT_LENGTH
+    """
+    try:
+        # Uploads may be larger than the bodies other endpoints accept
+        request.max_content_length = current_app.config["UPLOAD_MAX_CONTENT_LENGTH"]
+        file = request.files.get("file")
+        if file is None or not file.filename:
+            raise APIError("No file uploaded", status_code=400)
+        filename = secure_filename(file.filename)
+        if not filename.lower().endswith(UPLOAD_EXTENSIONS):
+            raise APIError(f"File must be one of {', '.join(UPLOAD_EXTENSIONS)}", status_code=400)
+
+        # Copied a block at a time from werkzeug's spooled temporary file
+        upload = uploads().create(filename, user_id=get_jwt_identity())
+        try:
+            file.save(upload.path)
+            upload.dataset = sniff_dataset(upload.path)
+            if upload.dataset not in UPLOAD_DATASETS:
+                raise APIError(
+                    "File columns must match financial statements or price bars", status_code=400
+                )
+        except IngestionError as e:
+            uploads().discard(upload)
+            raise APIError(str(e), status_code=400)
+        except Exception:
+            uploads().discard(upload)
+            raise
+
+        uploads().submit(upload)
+        logger.info(f"Upload {upload.id} ({filename}, {upload.dataset}) queued by user {upload.user_id}")
+        return jsonify(serialize_upload(upload)), 202
+
+    except RequestEntityTooLarge:
+        limit_mb = current_app.config["UPLOAD_MAX_CONTENT_LENGTH"] // (1024 * 1024)
+        return jsonify({"error": f"File exceeds the {limit_mb}MB upload limit"}), 413
+    except APIError as e:
+        logger.warning(f"API Error in create_upload: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in create_upload: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@admin_api.route("/admin/uploads/<upload_id>")
+@admin_required
+@limiter.exempt
+def get_upload(upload_id):
+    """Ingestion status of an upload with row counts and the first rejected rows"""
+    upload = uploads().get(upload_id)
+    if upload is None:
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify(serialize_upload(upload)), 200
+
+@admin_api.route("/admin/uploads/<upload_id>/rejections")
+@admin_required
+@limiter.limit("30/minute")
+def get_upload_rejections(upload_id):
+    """Every rejected row of a finished upload as CSV (row, error)"""
+    upload = uploads().get(upload_id)
+    if upload is None:
+        return jsonify({"error": "Upload not found"}), 404
+    if upload.finished_at is None or not os.path.exists(upload.report_path):
+        return jsonify({"error": f"Upload is {upload.status}", "upload": serialize_upload(upload)}), 409
+    return send_file(
+        upload.report_path,
+        as_attachment=True,
+        download_name=f"{os.path.splitext(upload.filename)[0]}_rejections.csv",
+        mimetype="text/csv",
+    )
@@ -0,0 +1,194 @@
+from flask import Blueprint, jsonify, request
+from api.models.models import CompanyAudit
+from api.utils.auth import admin_required
+from api.utils.errors import APIError
+from api.utils.exports import iter_chunks, ndjson_response
+from api.utils.limiter import limiter
+from api.utils.serializers import RowSerializer, iso_text
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, asc, desc, or_
+import base64
+import binascii
+import logging
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+audit_api = Blueprint("audit_api", __name__)
+
+AUDIT_PAGE_SIZE = 100
+AUDIT_MAX_PAGE_SIZE = 1000
+
+
+def iso_timestamp(value):
+    """Stored ``YYYY-MM-DD HH:MM:SS.ffffff`` text as ISO 8601"""
+    return value.replace(" ", "T", 1)
+
+
+# Audit fields, read as Core rows. The timestamp is read as the text SQLite
+# stores so cursors compare against exactly what is in the index
+AUDIT_ROWS = RowSerializer([
+    ("id", CompanyAudit.id),
+    ("company_id", CompanyAudit.company_id),
+    ("user_id", CompanyAudit.user_id),
+    ("action", CompanyAudit.action),
+    ("details", CompanyAudit.details),
+    ("timestamp", iso_text(CompanyAudit.timestamp), iso_timestamp),
+])
+
+
+def encode_cursor(timestamp, audit_id):
+    return base64.urlsafe_b64encode(f"{timestamp}|{audit_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """``(stored timestamp, id)`` of the last row of the previous page"""
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, audit_id = text.rsplit("|", 1)
+        datetime.fromisoformat(timestamp)
+        return timestamp, int(audit_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise APIError("Invalid cursor", status_code=400)
+
+
+def parse_time(value, name, end=False):
+    """An ISO date or datetime parameter; a date ``end`` covers the whole day"""
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            return datetime.combine(day + timedelta(days=1) if end else day, datetime.min.time())
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise APIError(f"{name} must be an ISO date or datetime", status_code=400)
+    # Timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def audit_query(args, default_order="desc"):
+    """Filtered audit select from query parameters, ordered by (timestamp, id).
+
+    company_id and user_id each seek their (column, timestamp) index and
+    the time range bounds the seek, so the cost of a page does not grow
+    with the table. Returns the statement and the order.
+    """
+    order = args.get("order", default_order).lower()
+    if order not in ("asc", "desc"):
+        raise APIError("order must be asc or desc", status_code=400)
+
+    query = AUDIT_ROWS.select()
+    company_id = args.get("company_id", type=int)
+    user_id = args.get("user_id", type=int)
+    action = args.get("action")
+    if company_id is not None:
+        query = query.where(CompanyAudit.company_id == company_id)
+    if user_id is not None:
+        query = query.where(CompanyAudit.user_id == user_id)
+    if action:
+        query = query.where(CompanyAudit.action == action.upper())
+
+    since = parse_time(args["since"], "since") if args.get("since") else None
+    until = parse_time(args["until"], "until", end=True) if args.get("until") else None
+    if since and until and until <= since:
+        raise APIError("until must be later than since", status_code=400)
+    if since:
+        query = query.where(CompanyAudit.timestamp >= since)
+    if until:
+        query = query.where(CompanyAudit.timestamp < until)
+
+    direction = desc if order == "desc" else asc
+    query = query.order_by(direction(CompanyAudit.timestamp), direction(CompanyAudit.id))
+    return query, order
+
+
+def after_cursor(query, order, cursor):
+    """Rows past the cursor row in (timestamp, id) order.
+
+    The bare timestamp bound keeps this an index range; the OR only decides
+    rows sharing the cursor's timestamp.
+    """
+    timestamp, audit_id = decode_cursor(cursor)
+    stored = iso_text(CompanyAudit.timestamp)
+    if order == "desc":
+        return query.where(
+            stored <= timestamp, or_(stored < timestamp, and_(stored == timestamp, CompanyAudit.id < audit_id))
+        )
+    return query.where(
+        stored >= timestamp, or_(stored > timestamp, and_(stored == timestamp, CompanyAudit.id > audit_id))
+    )
+
+
+@audit_api.route("/audit", methods=["GET"])
+@admin_required
+@limiter.limit("60/minute")
+def get_audit_log():
+    """Company audit entries, newest first, filtered by company, user, action and time.
+
+    Keyset paginated: pass ``next_cursor`` from a response as ``cursor`` for
+    the following page. Entries recorded through the async audit queue
+    appear once flushed (within AUDIT_FLUSH_INTERVAL seconds).
+    """
+    try:
+        limit = request.args.get("limit", AUDIT_PAGE_SIZE, type=int)
+        if not 1 <= limit <= AUDIT_MAX_PAGE_SIZE:
+            raise APIError(f"limit must be between 1 and {AUDIT_MAX_PAGE_SIZE}", status_code=400)
+
+        query, order = audit_query(request.args)
+        cursor = request.args.get("cursor")
+        if cursor:
+            query = after_cursor(query, order, cursor)
+
+        # One extra row says whether there is a next page without a COUNT
+        rows = AUDIT_ROWS.rows(query.limit(limit + 1))
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1][-1], page[-1][0])
+
+        return jsonify({
+            "data": AUDIT_ROWS.serialize(page),
+            "metadata": {
+                "count": len(page),
+                "limit": limit,
+                "order": order,
+                "next_cursor": next_cursor,
+            },
+        }), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in get_audit_log: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in get_audit_log: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@audit_api.route("/audit/export", methods=["GET"])
+@admin_required
+@limiter.limit("10/minute")
+def export_audit_log():
+    """Stream the matching audit entries as NDJSON, oldest first by default.
+
+    Takes the filters of GET /audit. Rows come off one cursor a chunk at a
+    time, so a range of millions of entries streams in constant memory.
+    """
+    try:
+        query, order = audit_query(request.args, default_order="asc")
+        cursor = request.args.get("cursor")
+        if cursor:
+            query = after_cursor(query, order, cursor)
+        return ndjson_response(
+            AUDIT_ROWS.serialize,
+            iter_chunks(query),
+            f"company_audit_{datetime.utcnow():%Y%m%d_%H%M%S}.ndjson",
+            "No audit entries found for the specified criteria",
+        )
+
+    except APIError as e:
+        logger.warning(f"API Error in export_audit_log: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in export_audit_log: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
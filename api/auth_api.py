@@ -4,6 +4,7 @@ from api.models import db, bcrypt
 from api.utils.errors import APIError
 from api.utils.limiter import limiter
 from api.utils.cache import cache
+from api.utils.writer import submit_write
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -11,6 +12,7 @@ from flask_jwt_extended import (
     jwt_required
 )
 from datetime import datetime, timedelta
+from sqlalchemy import update
 import re
 import logging
 
@@ -19,6 +21,16 @@ logger = logging.getLogger(__name__)
 
 auth_api = Blueprint("auth_api", __name__)
 
+def record_login(user_id, logged_in_at):
+    """Write job storing a user's last login time"""
+    db.session.execute(
+        update(User).where(User.id == user_id).values(last_login=logged_in_at)
+    )
+
+def log_write_failure(future):
+    if future.exception() is not None:
+        logger.error(f"Failed to record login: {str(future.exception())}")
+
 def validate_password(password):
     """Validate password strength"""
     if len(password) < 8:
@@ -129,9 +141,8 @@ def login():
         if not bcrypt.check_password_hash(user.password, data["password"]):
             raise APIError("Invalid credentials", status_code=401)
 
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+        # Record the login on the writer without waiting for the commit
+        submit_write(record_login, user.id, datetime.utcnow()).add_done_callback(log_write_failure)
 
         # Generate tokens
         access_token = create_access_token(
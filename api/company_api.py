@@ -1,13 +1,15 @@
 from flask import Blueprint, jsonify, request, current_app
 from api.models.models import Company, CompanyAudit  # Updated import path
 from api.models import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from api.utils.errors import APIError
 from api.utils.validators import validate_company_data
-from api.utils.cache import cache
+from api.utils.cache import cache, bump_generation
 from api.utils.limiter import limiter
+from api.utils.writer import write
+from api.utils.audit import audit
 from datetime import datetime
-from sqlalchemy import desc, asc, or_
+from sqlalchemy import desc, asc, or_, select, insert, update, bindparam
 import logging
 from urllib.parse import urlparse
 import re
@@ -21,6 +23,13 @@ logger = logging.getLogger(__name__)
 
 company_api = Blueprint('company_api', __name__)
 
+# Writable company fields, as accepted by POST /companies/batch
+COMPANY_FIELDS = ('name', 'ticker', 'industry', 'sector', 'description', 'website', 'established_date')
+
+# Companies per request, and per IN query / INSERT ... RETURNING statement
+BATCH_MAX_COMPANIES = 5000
+BATCH_CHUNK_SIZE = 500
+
 @company_api.before_request
 def before_request():
     """Enhanced request logging"""
@@ -31,7 +40,7 @@ def before_request():
             'ip': request.remote_addr,
             'user_agent': request.headers.get('User-Agent'),
             'params': dict(request.args),
-            'user_id': get_jwt_identity() if request.endpoint != 'login' else None
+            'user_id': get_jwt_identity() if verify_jwt_in_request(optional=True) else None
         })
 
 def serialize_company(company):
@@ -51,16 +60,156 @@ def serialize_company(company):
         'updated_by': company.updated_by
     }
 
-def add_audit_log(company_id, action, user_id, details=None):
-    """Add audit log entry"""
-    audit = CompanyAudit(
-        company_id=company_id,
-        action=action,
-        user_id=user_id,
-        details=details,
-        timestamp=datetime.utcnow()
+def company_state(company):
+    """Column values of a company as they are, for audit details"""
+    return {column.key: getattr(company, column.key) for column in Company.__table__.columns}
+
+# Write jobs, run on the single writer thread (see api.utils.writer)
+
+def bump_company_generations():
+    """Retire cached company views and the data quality report.
+
+    Updates and deletes move no MAX(id), so dataset_version() only sees
+    them through the dataset generation.
+    """
+    bump_generation('companies')
+    bump_generation('dataset')
+
+def _create_company(data, established_date, user_id):
+    # Checked on the writer so the check and the insert cannot interleave
+    if Company.query.filter_by(ticker=data['ticker']).first():
+        raise APIError("Company with this ticker already exists", status_code=409)
+
+    new_company = Company(
+        name=data['name'],
+        ticker=data['ticker'],
+        industry=data['industry'],
+        sector=data.get('sector'),
+        description=data.get('description'),
+        website=data.get('website'),
+        established_date=established_date,
+        created_by=user_id,
+        created_at=datetime.utcnow()
     )
-    db.session.add(audit)
+    db.session.add(new_company)
+    db.session.flush()  # Get ID for the audit log
+
+    audit(new_company.id, 'CREATE', user_id, data)
+    bump_company_generations()
+    return serialize_company(new_company)
+
+def _update_company(id, data, established_date, user_id):
+    company = Company.query.get_or_404(id)
+
+    # Raw column values; the audit writer turns them into JSON
+    original_state = company_state(company)
+
+    # Update fields if provided
+    for field in ['name', 'industry', 'sector', 'description', 'website']:
+        if field in data:
+            setattr(company, field, data[field])
+    if established_date is not None:
+        company.established_date = established_date
+
+    company.updated_by = user_id
+    company.updated_at = datetime.utcnow()
+
+    audit(company.id, 'UPDATE', user_id, {'before': original_state, 'after': data})
+    bump_company_generations()
+    db.session.flush()
+    return serialize_company(company)
+
+def _delete_company(id, user_id):
+    company = Company.query.get_or_404(id)
+
+    # Add audit log before deletion
+    audit(company.id, 'DELETE', user_id, company_state(company))
+    db.session.delete(company)
+    bump_company_generations()
+
+def _upsert_companies(items, user_id, update_existing):
+    """Insert new tickers and update (or skip) existing ones in one transaction.
+
+    ``items`` are validated field dicts, each with its raw request payload
+    under ``'_payload'`` for the audit log. Existing tickers are found with
+    one IN query per chunk, new companies are inserted with RETURNING ids
+    chunk by chunk, updates run as one executemany per set of fields and
+    every audit row goes in with a single executemany. Returns a
+    ``(status, id)`` pair per item, in order.
+    """
+    company = Company.__table__
+    now = datetime.utcnow()
+
+    existing = {}
+    tickers = [item['ticker'] for item in items]
+    for i in range(0, len(tickers), BATCH_CHUNK_SIZE):
+        rows = db.session.execute(
+            select(company).where(company.c.ticker.in_(tickers[i:i + BATCH_CHUNK_SIZE]))
+        ).all()
+        existing.update((row.ticker, row) for row in rows)
+
+    outcomes = {}
+    audits = []
+
+    new_items = [item for item in items if item['ticker'] not in existing]
+    for i in range(0, len(new_items), BATCH_CHUNK_SIZE):
+        chunk = new_items[i:i + BATCH_CHUNK_SIZE]
+        # Matched back by ticker: asking for rows in parameter order would
+        # make SQLite fall back to one INSERT per row
+        ids = dict(db.session.execute(
+            insert(company).returning(company.c.ticker, company.c.id),
+            [
+                {
+                    **{field: item.get(field) for field in COMPANY_FIELDS},
+                    'created_by': user_id,
+                    'created_at': now,
+                }
+                for item in chunk
+            ],
+        ).all())
+        for item in chunk:
+            company_id = ids[item['ticker']]
+            outcomes[item['ticker']] = ('created', company_id)
+            audits.append({
+                'company_id': company_id, 'action': 'BATCH_CREATE', 'user_id': user_id,
+                'details': item['_payload'], 'timestamp': now,
+            })
+
+    # Rows updating the same fields share one executemany
+    updates = {}
+    for item in items:
+        row = existing.get(item['ticker'])
+        if row is None:
+            continue
+        if not update_existing:
+            outcomes[item['ticker']] = ('skipped', row.id)
+            continue
+        fields = tuple(field for field in COMPANY_FIELDS if field in item and field != 'ticker')
+        updates.setdefault(fields, []).append(
+            {**{field: item[field] for field in fields}, '_id': row.id}
+        )
+        outcomes[item['ticker']] = ('updated', row.id)
+        audits.append({
+            'company_id': row.id, 'action': 'BATCH_UPDATE', 'user_id': user_id,
+            'details': {'before': serialize_company(row), 'after': item['_payload']},
+            'timestamp': now,
+        })
+    for fields, params in updates.items():
+        db.session.execute(
+            update(company)
+            .where(company.c.id == bindparam('_id'))
+            .values(
+                **{field: bindparam(field) for field in fields},
+                updated_by=user_id,
+                updated_at=now,
+            ),
+            params,
+        )
+
+    if audits:
+        db.session.execute(insert(CompanyAudit.__table__), audits)
+    bump_company_generations()
+    return [outcomes[item['ticker']] for item in items]
 
 @company_api.route('/companies', methods=['GET'])
 @cache.cached(timeout=300, query_string=True)
@@ -190,10 +339,6 @@ def create_company():
         if errors:
             raise APIError("; ".join(errors))
         
-        # Check for duplicate ticker
-        if Company.query.filter_by(ticker=data['ticker']).first():
-            raise APIError("Company with this ticker already exists", status_code=409)
-        
         # Parse established_date if provided
         established_date = None
         if 'established_date' in data:
@@ -202,30 +347,15 @@ def create_company():
             except ValueError:
                 raise APIError("Invalid established_date format. Use YYYY-MM-DD")
         
-        # Create company
-        new_company = Company(
-            name=data['name'],
-            ticker=data['ticker'],
-            industry=data['industry'],
-            sector=data.get('sector'),
-            description=data.get('description'),
-            website=data.get('website'),
-            established_date=established_date,
-            created_by=user_id,
-            created_at=datetime.utcnow()
-        )
-        
-        db.session.add(new_company)
-        db.session.flush()  # Get ID before commit
-        
-        # Add audit log
-        add_audit_log(new_company.id, 'CREATE', user_id, data)
-        
-        db.session.commit()
+        company = write(_create_company, data, established_date, user_id)
         cache.delete_memoized(get_companies)
         
-        return jsonify(serialize_company(new_company)), 201
+        return jsonify(company), 201
 
+    except APIError:
+        # Keep the status (a busy write queue is a 503, not a 400)
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error in create_company: {str(e)}")
@@ -236,41 +366,25 @@ def create_company():
 def update_company(id):
     """Update existing company"""
     try:
-        company = Company.query.get_or_404(id)
         data = request.get_json()
         user_id = get_jwt_identity()
         
-        # Store original state for audit
-        original_state = serialize_company(company)
-        
-        # Update fields if provided
-        for field in ['name', 'industry', 'sector', 'description', 'website']:
-            if field in data:
-                setattr(company, field, data[field])
-        
+        established_date = None
         if 'established_date' in data:
             try:
-                company.established_date = datetime.strptime(data['established_date'], '%Y-%m-%d').date()
+                established_date = datetime.strptime(data['established_date'], '%Y-%m-%d').date()
             except ValueError:
                 raise APIError("Invalid established_date format. Use YYYY-MM-DD")
         
-        company.updated_by = user_id
-        company.updated_at = datetime.utcnow()
-        
-        # Add audit log
-        add_audit_log(
-            company.id, 
-            'UPDATE', 
-            user_id, 
-            {'before': original_state, 'after': data}
-        )
-        
-        db.session.commit()
+        company = write(_update_company, id, data, established_date, user_id)
         cache.delete_memoized(get_company_by_id, id)
         cache.delete_memoized(get_companies)
         
-        return jsonify(serialize_company(company)), 200
+        return jsonify(company), 200
 
+    except APIError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         raise APIError(str(e))
@@ -280,25 +394,17 @@ def update_company(id):
 def delete_company(id):
     """Delete company"""
     try:
-        company = Company.query.get_or_404(id)
         user_id = get_jwt_identity()
-        
-        # Add audit log before deletion
-        add_audit_log(
-            company.id, 
-            'DELETE', 
-            user_id, 
-            serialize_company(company)
-        )
-        
-        db.session.delete(company)
-        db.session.commit()
+        write(_delete_company, id, user_id)
         
         cache.delete_memoized(get_company_by_id, id)
         cache.delete_memoized(get_companies)
         
         return jsonify({'message': f'Company {id} deleted successfully'}), 200
 
+    except APIError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         raise APIError(str(e))
@@ -327,41 +433,74 @@ def get_sectors():
 @jwt_required()
 @limiter.limit("2/minute")
 def batch_create_companies():
-    """Batch create companies"""
+    """Bulk upsert companies by ticker with a result per item.
+
+    New tickers are created; existing ones are updated with the fields
+    given, or left alone with ``?on_conflict=skip``. Invalid items (and
+    repeats of a ticker earlier in the request) are reported and the rest
+    are still written, all in one transaction.
+    """
     try:
         data = request.get_json()
         user_id = get_jwt_identity()
-        
+        on_conflict = request.args.get('on_conflict', 'update')
+
         if not isinstance(data, list):
             raise APIError("Expected array of companies")
-        
-        companies = []
-        for item in data:
-            errors = validate_company_data(item)
+        if len(data) > BATCH_MAX_COMPANIES:
+            raise APIError(f"At most {BATCH_MAX_COMPANIES} companies per request")
+        if on_conflict not in ('update', 'skip'):
+            raise APIError("on_conflict must be update or skip")
+
+        results = []
+        items = []
+        seen = set()
+        for index, item in enumerate(data):
+            errors = validate_company_data(item) if isinstance(item, dict) else ["Expected an object"]
+            ticker = item.get('ticker') if isinstance(item, dict) else None
+            if not errors:
+                unknown = sorted(set(item) - set(COMPANY_FIELDS))
+                if unknown:
+                    errors.append(f"Unknown field(s): {', '.join(unknown)}")
+                if ticker in seen:
+                    errors.append("Duplicate ticker in request")
+            fields = {}
+            if not errors:
+                fields = {**item, '_payload': item}
+                if 'established_date' in item:
+                    try:
+                        fields['established_date'] = datetime.strptime(item['established_date'], '%Y-%m-%d').date()
+                    except (TypeError, ValueError):
+                        errors.append("Invalid established_date format. Use YYYY-MM-DD")
+            result = {'index': index, 'ticker': ticker}
             if errors:
-                raise APIError(f"Invalid company data: {'; '.join(errors)}")
-            
-            company = Company(
-                **item,
-                created_by=user_id,
-                created_at=datetime.utcnow()
+                result.update(status='invalid', errors=errors)
+            else:
+                seen.add(ticker)
+                items.append((result, fields))
+            results.append(result)
+
+        if items:
+            outcomes = write(
+                _upsert_companies, [fields for _, fields in items], user_id, on_conflict == 'update'
             )
-            companies.append(company)
-        
-        db.session.bulk_save_objects(companies)
-        db.session.commit()
-        
-        # Add audit logs for batch creation
-        for company in companies:
-            add_audit_log(company.id, 'BATCH_CREATE', user_id, item)
-        
-        cache.delete_memoized(get_companies)
-        
+            for (result, _), (status, company_id) in zip(items, outcomes):
+                result.update(status=status, id=company_id)
+            cache.delete_memoized(get_companies)
+
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
         return jsonify({
-            "message": f"Created {len(companies)} companies",
-            "company_ids": [c.id for c in companies]
-        }), 201
-        
+            "message": ", ".join(f"{count} {status}" for status, count in counts.items()),
+            "counts": counts,
+            "company_ids": [r['id'] for r in results if r['status'] == 'created'],
+            "results": results,
+        }), 201 if counts.get('created') else 200
+
+    except APIError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error in batch_create_companies: {str(e)}")
@@ -1,19 +1,226 @@
-from flask import Blueprint, send_file, request, jsonify, current_app
+from flask import Blueprint, Response, send_file, request, jsonify, current_app, url_for
 from api.models.models import Company, Financial, Stock, MacroIndicators
 from api.models import db
 from api.utils.errors import APIError
-from api.utils.cache import cache
+from api.utils.cache import generation
 from api.utils.limiter import limiter
+from api.utils.serializers import RowSerializer, iso_text
+from api.utils.exports import (
+    EXPORT_CHUNK_ROWS, MIMETYPES, ZIP_MIMETYPE, iter_chunks, arrow_schema, encode_csv,
+    encode_columnar, encode_zip, csv_response, columnar_response, xlsx_response, write_export,
+    write_xlsx
+)
+from api.utils.archive import INTERVALS, daily_bars, rollup_bars
+from api.utils.export_jobs import export_jobs
+from sqlalchemy import Date, DateTime, select
+from werkzeug.datastructures import MultiDict
+from concurrent.futures import as_completed
 from datetime import datetime
-import pandas as pd
-from io import BytesIO
+import json
 import logging
+import os
+import re
+import tempfile
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 download_api = Blueprint("download_api", __name__)
 
+EXTENSIONS = {"csv": "csv", "excel": "xlsx", "parquet": "parquet", "arrow": "arrow"}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Export columns by label; rows go straight from Core tuples into the frame
+COMPANY_EXPORT = RowSerializer([
+    ("ID", Company.id),
+    ("Name", Company.name),
+    ("Ticker", Company.ticker),
+    ("Industry", Company.industry),
+    ("Sector", Company.sector),
+    ("Description", Company.description),
+    ("Website", Company.website),
+    ("Established Date", iso_text(Company.established_date)),
+])
+
+FINANCIAL_EXPORT = RowSerializer([
+    ("Year", Financial.year),
+    ("Period", Financial.period),
+    ("Revenue", Financial.revenue),
+    ("Cost of Revenue", Financial.cost_of_revenue),
+    ("Gross Profit", Financial.gross_profit),
+    ("Operating Income", Financial.operating_income),
+    ("Net Income", Financial.net_income),
+    ("Total Assets", Financial.total_assets),
+    ("Total Liabilities", Financial.total_liabilities),
+    ("Total Equity", Financial.total_equity),
+    ("Current Ratio", Financial.current_ratio),
+    ("Debt to Equity", Financial.debt_to_equity),
+    ("Return on Equity", Financial.return_on_equity),
+    ("Return on Assets", Financial.return_on_assets),
+    ("Profit Margin", Financial.profit_margin),
+])
+
+
+class DatasetExport:
+    """One filtered download: its rows, column labels and the data it depends on.
+
+    ``version`` is the (namespace, scope) cache generation that moves when
+    the underlying data changes.
+    """
+
+    def __init__(self, header, query, filename, empty_message, version):
+        self.header = list(header)
+        self.query = query
+        self.filename = filename
+        self.empty_message = empty_message
+        self.version = version
+
+    def schema(self):
+        """Typed columns for Parquet, Arrow and Excel output"""
+        return arrow_schema(self.header, self.query.selected_columns)
+
+    def chunks(self):
+        return iter_chunks(self.query)
+
+    def sheets(self):
+        return [("Data", self.schema(), self.chunks())]
+
+    def response(self, file_format):
+        """Download response: an Excel file built on disk, other formats streamed"""
+        if file_format not in EXTENSIONS:
+            raise APIError(f"format must be one of {', '.join(EXTENSIONS)}", status_code=400)
+        if file_format == "excel":
+            return xlsx_response(self.sheets(), f"{self.filename}.xlsx", self.empty_message)
+        if file_format in COLUMNAR_FORMATS:
+            return columnar_response(
+                file_format,
+                self.schema(),
+                self.chunks(),
+                f"{self.filename}.{EXTENSIONS[file_format]}",
+                self.empty_message,
+            )
+        return csv_response(self.header, self.chunks(), f"{self.filename}.csv", self.empty_message)
+
+    def write(self, path, file_format):
+        """Build the download into a file and return the number of rows in it"""
+        rows = 0
+
+        def counted(chunks):
+            nonlocal rows
+            for chunk in chunks:
+                rows += len(chunk)
+                yield chunk
+
+        if file_format == "excel":
+            sheets = ((name, schema, counted(chunks)) for name, schema, chunks in self.sheets())
+            write_xlsx(path, sheets, self.empty_message)
+        elif file_format in COLUMNAR_FORMATS:
+            schema = self.schema()
+            write_export(
+                path,
+                lambda chunks: encode_columnar(file_format, schema, chunks),
+                counted(self.chunks()),
+                self.empty_message,
+            )
+        else:
+            write_export(
+                path,
+                lambda chunks: encode_csv(self.header, chunks),
+                counted(self.chunks()),
+                self.empty_message,
+            )
+        return rows
+
+
+def company_export(args):
+    industry = args.get("industry")
+    sector = args.get("sector")
+
+    query = COMPANY_EXPORT.select()
+    if industry:
+        query = query.where(Company.industry == industry)
+    if sector:
+        query = query.where(Company.sector == sector)
+
+    return DatasetExport(
+        COMPANY_EXPORT.keys, query, "companies", "No companies found", ("companies", "all")
+    )
+
+def financial_export(company_id, args):
+    """Financials of one company, or of every company with a Ticker column when ``company_id`` is None"""
+    year_from = args.get("year_from", type=int)
+    year_to = args.get("year_to", type=int)
+    period = args.get("period")  # Annual/Q1/Q2/Q3/Q4
+
+    if company_id is None:
+        header = ["Ticker", *FINANCIAL_EXPORT.keys]
+        query = (
+            select(Company.ticker, *FINANCIAL_EXPORT.columns)
+            .join(Company, Company.id == Financial.company_id)
+            .order_by(Company.ticker, Financial.year, Financial.period)
+        )
+        filename = "financials"
+        version = ("dataset", "all")
+    else:
+        company = db.session.get(Company, company_id)
+        if company is None:
+            raise APIError("Company not found", status_code=404)
+        header = FINANCIAL_EXPORT.keys
+        query = FINANCIAL_EXPORT.select().where(Financial.company_id == company_id)
+        filename = f"{company.ticker}_financials"
+        version = ("financials", company_id)
+
+    if year_from:
+        query = query.where(Financial.year >= year_from)
+    if year_to:
+        query = query.where(Financial.year <= year_to)
+    if period:
+        query = query.where(Financial.period == period)
+
+    return DatasetExport(
+        header,
+        query,
+        f"{filename}_{year_from or 'all'}_to_{year_to or 'present'}",
+        "No financial data found",
+        version,
+    )
+
+def macro_export(args):
+    date_from = args.get("date_from")
+    date_to = args.get("date_to")
+    variables = args.get("variables")
+
+    # Validate dates if provided
+    validate_date_range(date_from, date_to)
+
+    # Filter columns if specified
+    columns = [column.name for column in MacroIndicators.__table__.columns]
+    if variables:
+        selected_columns = ["date"] + variables.split(",")
+        invalid_cols = [col for col in selected_columns if col not in columns]
+        if invalid_cols:
+            raise APIError(f"Invalid column(s): {', '.join(invalid_cols)}", status_code=400)
+        columns = selected_columns
+
+    table = MacroIndicators.__table__
+    query = select(*(macro_column(table.c[name]) for name in columns)).order_by(table.c.date)
+    if date_from:
+        query = query.where(table.c.date >= date_from)
+    if date_to:
+        query = query.where(table.c.date <= date_to)
+
+    return DatasetExport(
+        columns,
+        query,
+        f"macro_indicators_{date_from or 'start'}_to_{date_to or 'present'}",
+        "No data found for the specified criteria",
+        ("macro", "all"),
+    )
+
+def macro_column(column):
+    """Dates and timestamps go out as the ISO text SQLite stores"""
+    return iso_text(column) if isinstance(column.type, (Date, DateTime)) else column
+
 def validate_date_range(date_from, date_to):
     """Validate date range parameters"""
     try:
@@ -27,73 +234,13 @@ def validate_date_range(date_from, date_to):
     except ValueError as e:
         raise APIError(str(e), status_code=400)
 
-def create_excel_response(df, filename):
-    """Create Excel file response"""
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Data')
-        # Auto-adjust columns width
-        worksheet = writer.sheets['Data']
-        for idx, col in enumerate(df.columns):
-            max_length = max(df[col].astype(str).apply(len).max(), len(col)) + 2
-            worksheet.set_column(idx, idx, max_length)
-    
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-
 @download_api.route("/download/companies")
 @limiter.limit("30/minute")
-@cache.cached(timeout=300, query_string=True)
 def download_companies():
-    """Download companies data in CSV or Excel format"""
+    """Download companies data in CSV, Excel, Parquet or Arrow format"""
     try:
-        file_format = request.args.get("format", "csv")
-        industry = request.args.get("industry")
-        sector = request.args.get("sector")
-
-        # Build query
-        query = Company.query
-        if industry:
-            query = query.filter(Company.industry == industry)
-        if sector:
-            query = query.filter(Company.sector == sector)
-
-        companies = query.all()
-        if not companies:
-            raise APIError("No companies found", status_code=404)
-
-        # Prepare data
-        data = [{
-            "ID": c.id,
-            "Name": c.name,
-            "Ticker": c.ticker,
-            "Industry": c.industry,
-            "Sector": c.sector,
-            "Description": c.description,
-            "Website": c.website,
-            "Established Date": c.established_date.strftime("%Y-%m-%d") if c.established_date else None
-        } for c in companies]
-
-        df = pd.DataFrame(data)
-        
-        # Return appropriate format
-        if file_format.lower() == "excel":
-            return create_excel_response(df, "companies.xlsx")
-        else:
-            buffer = BytesIO()
-            df.to_csv(buffer, index=False)
-            buffer.seek(0)
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name="companies.csv",
-                mimetype="text/csv"
-            )
+        file_format = request.args.get("format", "csv").lower()
+        return company_export(request.args).response(file_format)
 
     except APIError as e:
         logger.warning(f"API Error in download_companies: {str(e)}")
@@ -104,63 +251,11 @@ def download_companies():
 
 @download_api.route("/download/financials/<int:company_id>")
 @limiter.limit("30/minute")
-@cache.cached(timeout=300, query_string=True)
 def download_financials(company_id):
     """Download financial data for a specific company"""
     try:
-        company = Company.query.get_or_404(company_id)
-        year_from = request.args.get("year_from", type=int)
-        year_to = request.args.get("year_to", type=int)
-        period = request.args.get("period")  # Annual/Q1/Q2/Q3/Q4
-        file_format = request.args.get("format", "csv")
-
-        # Build query
-        query = Financial.query.filter_by(company_id=company_id)
-        if year_from:
-            query = query.filter(Financial.year >= year_from)
-        if year_to:
-            query = query.filter(Financial.year <= year_to)
-        if period:
-            query = query.filter(Financial.period == period)
-
-        financials = query.all()
-        if not financials:
-            raise APIError("No financial data found", status_code=404)
-
-        # Prepare data
-        data = [{
-            "Year": f.year,
-            "Period": f.period,
-            "Revenue": f.revenue,
-            "Cost of Revenue": f.cost_of_revenue,
-            "Gross Profit": f.gross_profit,
-            "Operating Income": f.operating_income,
-            "Net Income": f.net_income,
-            "Total Assets": f.total_assets,
-            "Total Liabilities": f.total_liabilities,
-            "Total Equity": f.total_equity,
-            "Current Ratio": f.current_ratio,
-            "Debt to Equity": f.debt_to_equity,
-            "Return on Equity": f.return_on_equity,
-            "Return on Assets": f.return_on_assets,
-            "Profit Margin": f.profit_margin
-        } for f in financials]
-
-        df = pd.DataFrame(data)
-        filename = f"{company.ticker}_financials_{year_from or 'all'}_to_{year_to or 'present'}"
-
-        if file_format.lower() == "excel":
-            return create_excel_response(df, f"{filename}.xlsx")
-        else:
-            buffer = BytesIO()
-            df.to_csv(buffer, index=False)
-            buffer.seek(0)
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name=f"{filename}.csv",
-                mimetype="text/csv"
-            )
+        file_format = request.args.get("format", "csv").lower()
+        return financial_export(company_id, request.args).response(file_format)
 
     except APIError as e:
         logger.warning(f"API Error in download_financials: {str(e)}")
@@ -171,60 +266,431 @@ def download_financials(company_id):
 
 @download_api.route("/download/macro")
 @limiter.limit("30/minute")
-@cache.cached(timeout=300, query_string=True)
 def download_macro():
     """Download macroeconomic indicators with filtering options"""
     try:
-        date_from = request.args.get("date_from")
-        date_to = request.args.get("date_to")
-        variables = request.args.get("variables")
-        file_format = request.args.get("format", "csv")
+        file_format = request.args.get("format", "csv").lower()
+        return macro_export(request.args).response(file_format)
+
+    except APIError as e:
+        logger.warning(f"API Error in download_macro: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in download_macro: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        # Validate dates if provided
-        validate_date_range(date_from, date_to)
+# Stock export columns in row order with their Parquet types
+STOCK_EXPORT = [
+    ("Ticker", "string"),
+    ("Date", "date32"),
+    ("Open", "float64"),
+    ("High", "float64"),
+    ("Low", "float64"),
+    ("Close", "float64"),
+    ("Volume", "int64"),
+]
 
-        # Build query
-        query = MacroIndicators.query
-        if date_from:
-            query = query.filter(MacroIndicators.date >= date_from)
-        if date_to:
-            query = query.filter(MacroIndicators.date <= date_to)
+# Excel downloads put each ticker on its own sheet
+STOCK_EXCEL_MAX_TICKERS = 100
+
+def company_bars(company_id, start, end, interval):
+    """One company's bars in date order as (date, open, high, low, close, volume) rows"""
+    bars = daily_bars(company_id, start, end)
+    if interval != "daily":
+        bars = rollup_bars(bars, interval)
+    return db.session.execute(
+        select(
+            iso_text(bars.c.date), bars.c.open, bars.c.high, bars.c.low, bars.c.close, bars.c.volume
+        ).order_by(bars.c.date)
+    )
+
+def stock_chunks(companies, start, end, interval):
+    """Bars of each (id, ticker) company in turn, as chunks of export rows.
+
+    One indexed range query per company keeps every read in date order
+    without sorting the whole market, so the first rows go out at once.
+    """
+    chunk = []
+    for company_id, ticker in companies:
+        chunk.extend((ticker, *row) for row in company_bars(company_id, start, end, interval))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
-        records = query.all()
-        if not records:
-            raise APIError("No data found for the specified criteria", status_code=404)
+def stock_sheets(companies, start, end, interval):
+    """One Excel sheet per company, read only when the workbook reaches it"""
+    for company_id, ticker in companies:
+        rows = company_bars(company_id, start, end, interval)
+        yield ticker, STOCK_EXPORT[1:], rows.partitions(EXPORT_CHUNK_ROWS)
 
-        # Convert to DataFrame
-        data = [r.__dict__ for r in records]
-        df = pd.DataFrame(data)
-        df.drop(columns=["_sa_instance_state"], inplace=True)
+class StockExport(DatasetExport):
+    """Bars of many companies, read one company at a time instead of from one query"""
 
-        # Filter columns if specified
-        if variables:
-            selected_columns = ["date"] + variables.split(",")
-            invalid_cols = [col for col in selected_columns if col not in df.columns]
-            if invalid_cols:
-                raise APIError(f"Invalid column(s): {', '.join(invalid_cols)}", status_code=400)
-            df = df[selected_columns]
+    def __init__(self, companies, start, end, interval, filename):
+        super().__init__(
+            [name for name, _ in STOCK_EXPORT], None, filename, "No stock data found", ("market", "all")
+        )
+        self.companies = companies
+        self.start = start
+        self.end = end
+        self.interval = interval
 
-        filename = f"macro_indicators_{date_from or 'start'}_to_{date_to or 'present'}"
+    def schema(self):
+        return STOCK_EXPORT
 
-        if file_format.lower() == "excel":
-            return create_excel_response(df, f"{filename}.xlsx")
+    def chunks(self):
+        return stock_chunks(self.companies, self.start, self.end, self.interval)
+
+    def sheets(self):
+        if len(self.companies) > STOCK_EXCEL_MAX_TICKERS:
+            raise APIError(
+                f"Excel downloads are limited to {STOCK_EXCEL_MAX_TICKERS} tickers; "
+                "use csv, parquet or arrow for more",
+                status_code=400,
+            )
+        return stock_sheets(self.companies, self.start, self.end, self.interval)
+
+def stock_export(args):
+    tickers = args.get("tickers")
+    start_date = args.get("start_date")
+    end_date = args.get("end_date")
+    interval = args.get("interval", "daily")
+
+    validate_date_range(start_date, end_date)
+    if interval not in INTERVALS:
+        raise APIError(f"interval must be one of {', '.join(INTERVALS)}", status_code=400)
+
+    query = select(Company.id, Company.ticker).order_by(Company.ticker)
+    if tickers:
+        requested = {ticker.strip() for ticker in tickers.split(",") if ticker.strip()}
+        query = query.where(Company.ticker.in_(requested))
+    companies = db.session.execute(query).all()
+    if tickers:
+        unknown = sorted(requested - {company.ticker for company in companies})
+        if unknown:
+            raise APIError(f"Unknown ticker(s): {', '.join(unknown)}", status_code=400)
+
+    return StockExport(
+        companies,
+        datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None,
+        datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None,
+        interval,
+        f"stocks_{interval}_{start_date or 'start'}_to_{end_date or 'present'}",
+    )
+
+@download_api.route("/download/stocks")
+@limiter.limit("10/minute")
+def download_stocks():
+    """
+    Download price history for many companies in one file
+    ---
+    parameters:
+      - name: tickers
+        in: query
+        type: string
+        description: Comma-separated tickers; all companies when omitted
+      - name: start_date
+        in: query
+        type: string
+      - name: end_date
+        in: query
+        type: string
+      - name: interval
+        in: query
+        type: string
+        enum: [daily, weekly, monthly]
+        default: daily
+      - name: format
+        in: query
+        type: string
+        enum: [csv, parquet, arrow, excel]
+        default: csv
+    responses:
+      200:
+        description: >
+          Streamed CSV, Parquet or Arrow file with one row per ticker and bar,
+          or an Excel workbook with one sheet per ticker
+      400:
+        description: Invalid parameters or unknown tickers
+      404:
+        description: No bars in the range
+    """
+    try:
+        file_format = request.args.get("format", "csv").lower()
+        return stock_export(request.args).response(file_format)
+
+    except APIError as e:
+        logger.warning(f"API Error in download_stocks: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in download_stocks: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+# Exportable datasets with the filters each accepts, for export jobs and bundles
+EXPORT_DATASETS = {
+    "companies": (company_export, ("industry", "sector")),
+    "financials": (
+        lambda args: financial_export(args.get("company_id", type=int), args),
+        ("company_id", "year_from", "year_to", "period"),
+    ),
+    "macro": (macro_export, ("date_from", "date_to", "variables")),
+    "stocks": (stock_export, ("tickers", "start_date", "end_date", "interval")),
+}
+
+def parse_export_spec(data):
+    """Validate a ``{dataset, format, filters}`` request into its spec and export.
+
+    The same spelling of the same filters gives the same spec, so identical
+    requests dedupe onto the same job.
+    """
+    if not isinstance(data, dict):
+        raise APIError("export must be an object", status_code=400)
+    dataset = data.get("dataset")
+    file_format = str(data.get("format", "csv")).lower()
+    filters = data.get("filters") or {}
+
+    if dataset not in EXPORT_DATASETS:
+        raise APIError(f"dataset must be one of {', '.join(EXPORT_DATASETS)}", status_code=400)
+    if file_format not in EXTENSIONS:
+        raise APIError(f"format must be one of {', '.join(EXTENSIONS)}", status_code=400)
+    build_export, allowed = EXPORT_DATASETS[dataset]
+    if not isinstance(filters, dict):
+        raise APIError("filters must be an object", status_code=400)
+    unknown = sorted(set(filters) - set(allowed))
+    if unknown:
+        raise APIError(f"Unknown filter(s) for {dataset}: {', '.join(unknown)}", status_code=400)
+
+    filters = {key: str(value) for key, value in sorted(filters.items()) if value not in (None, "")}
+    spec = {"dataset": dataset, "format": file_format, "filters": filters}
+    return spec, build_export(MultiDict(filters))
+
+def submit_export(spec, export):
+    """Queue an export, or return the job already building or built at the current data version"""
+    file_format = spec["format"]
+    return export_jobs().submit(
+        spec,
+        generation(*export.version),
+        f"{export.filename}.{EXTENSIONS[file_format]}",
+        lambda path: export.write(path, file_format),
+    )
+
+def serialize_job(job):
+    return {
+        **job.to_dict(),
+        "status_url": url_for("download_api.get_export_job", job_id=job.id),
+        "download_url": (
+            url_for("download_api.download_export_job", job_id=job.id)
+            if job.status == "finished" else None
+        ),
+    }
+
+@download_api.route("/download/jobs", methods=["POST"])
+@limiter.limit("30/minute")
+def create_export_job():
+    """
+    Queue an export to be built in the background
+    ---
+    parameters:
+      - name: body
+        in: body
+        schema:
+          properties:
+            dataset:
+              type: string
+              enum: [companies, financials, macro, stocks]
+            format:
+              type: string
+              enum: [csv, excel, parquet, arrow]
+            filters:
+              type: object
+    responses:
+      200:
+        description: The same export is already built
+      202:
+        description: Export queued; poll status_url
+      400:
+        description: Invalid dataset, format or filters
+    """
+    try:
+        spec, export = parse_export_spec(request.get_json(silent=True) or {})
+        job = submit_export(spec, export)
+        return jsonify(serialize_job(job)), 200 if job.status == "finished" else 202
+
+    except APIError as e:
+        logger.warning(f"API Error in create_export_job: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in create_export_job: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@download_api.route("/download/jobs/<job_id>")
+@limiter.exempt
+def get_export_job(job_id):
+    """Status of an export job"""
+    job = export_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Export job not found"}), 404
+    return jsonify(serialize_job(job)), 200
+
+@download_api.route("/download/jobs/<job_id>/file")
+@limiter.limit("30/minute")
+def download_export_job(job_id):
+    """Download a finished export; supports Range and conditional requests"""
+    job = export_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Export job not found"}), 404
+    if job.status != "finished":
+        return jsonify({"error": f"Export job is {job.status}", "job": serialize_job(job)}), 409
+    return send_file(
+        job.path,
+        as_attachment=True,
+        download_name=job.filename,
+        mimetype=MIMETYPES[job.spec["format"]],
+        conditional=True,
+    )
+
+# Exports per bundle; members share the export worker pool with export jobs
+BUNDLE_MAX_MEMBERS = 20
+
+def bundle_members(jobs, manifest):
+    """Finished member files in the order their jobs complete, then manifest.json.
+
+    ``jobs`` is a list of (name, job). Failed members are left out of the
+    archive and listed in the manifest with their error.
+    """
+    entries = {}
+    futures = {job.future: (name, job) for name, job in jobs}
+    for future in as_completed(futures):
+        name, job = futures[future]
+        entry = entries[name] = {"name": name, **job.spec}
+        if job.status != "finished":
+            entry["error"] = job.error
+            continue
+        try:
+            member_file = open(job.path, "rb")
+        except OSError:
+            # Superseded by a newer build between finishing and being read
+            entry["error"] = "Export file is no longer available"
+            continue
+        entry.update(rows=job.rows, bytes=job.size, sha256=job.sha256)
+        with member_file:
+            yield name, member_file, job.spec["format"] == "csv"
+
+    manifest["created_at"] = datetime.utcnow().isoformat()
+    manifest["members"] = [entries[name] for name, _ in jobs]
+    yield "manifest.json", json.dumps(manifest, indent=2).encode("utf-8"), True
+
+def stream_bundle(jobs, path):
+    """Stream the bundle zip and keep a copy at ``path`` if every member made it in"""
+    manifest = {}
+    folder, name = os.path.split(path)
+    copy = tempfile.NamedTemporaryFile(dir=folder, prefix=f"{name.split('.')[0]}.", suffix=".tmp", delete=False)
+    complete = False
+    try:
+        with copy:
+            for data in encode_zip(bundle_members(jobs, manifest)):
+                copy.write(data)
+                yield data
+        complete = all("error" not in entry for entry in manifest["members"])
+    finally:
+        if complete:
+            os.replace(copy.name, path)
         else:
-            buffer = BytesIO()
-            df.to_csv(buffer, index=False)
-            buffer.seek(0)
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name=f"{filename}.csv",
-                mimetype="text/csv"
+            os.remove(copy.name)
+
+def send_bundle(path):
+    return send_file(
+        path, as_attachment=True, download_name="bundle.zip", mimetype=ZIP_MIMETYPE, conditional=True
+    )
+
+@download_api.route("/download/bundle", methods=["POST"])
+@limiter.limit("10/minute")
+def download_bundle():
+    """
+    Download several exports as one zip archive
+    ---
+    parameters:
+      - name: body
+        in: body
+        schema:
+          properties:
+            members:
+              type: array
+              description: Exports as for /download/jobs
+              items:
+                properties:
+                  dataset:
+                    type: string
+                    enum: [companies, financials, macro, stocks]
+                  format:
+                    type: string
+                    enum: [csv, excel, parquet, arrow]
+                  filters:
+                    type: object
+    responses:
+      200:
+        description: >
+          Zip streamed as its members finish building in parallel, ending with
+          manifest.json listing each member's rows, size and SHA-256 or its
+          error. Bundles of exports whose data has not changed since are
+          served from disk. Once every member has made it in, the
+          Content-Location URL serves the same zip with Range support.
+      400:
+        description: Invalid members
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        members = data.get("members")
+        if not isinstance(members, list) or not members:
+            raise APIError("members must be a non-empty list", status_code=400)
+        if len(members) > BUNDLE_MAX_MEMBERS:
+            raise APIError(f"A bundle holds at most {BUNDLE_MAX_MEMBERS} members", status_code=400)
+
+        # Every member is an export job, so each dedupes onto any identical
+        # job and the pool builds them concurrently
+        jobs = []
+        names = set()
+        for index, member in enumerate(members):
+            try:
+                spec, export = parse_export_spec(member)
+            except APIError as e:
+                raise APIError(f"members[{index}]: {str(e)}", status_code=e.status_code)
+            name = f"{export.filename}.{EXTENSIONS[spec['format']]}"
+            suffix = 1
+            while name in names:
+                suffix += 1
+                name = f"{export.filename}_{suffix}.{EXTENSIONS[spec['format']]}"
+            names.add(name)
+            jobs.append((name, submit_export(spec, export)))
+
+        bundle_id = export_jobs().bundle_id([(name, job.id) for name, job in jobs])
+        path = export_jobs().bundle_path(bundle_id)
+        location = url_for("download_api.download_cached_bundle", bundle_id=bundle_id)
+        if os.path.exists(path):
+            response = send_bundle(path)
+        else:
+            response = Response(
+                stream_bundle(jobs, path),
+                mimetype=ZIP_MIMETYPE,
+                headers={"Content-Disposition": 'attachment; filename="bundle.zip"'},
             )
+        response.headers["Content-Location"] = location
+        return response
 
     except APIError as e:
-        logger.warning(f"API Error in download_macro: {str(e)}")
+        logger.warning(f"API Error in download_bundle: {str(e)}")
         return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
-        logger.error(f"Unexpected error in download_macro: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        logger.error(f"Unexpected error in download_bundle: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@download_api.route("/download/bundle/<bundle_id>")
+@limiter.limit("30/minute")
+def download_cached_bundle(bundle_id):
+    """Download a complete bundle again; supports Range and conditional requests"""
+    path = export_jobs().bundle_path(bundle_id)
+    if not re.fullmatch(r"[0-9a-f]{32}", bundle_id) or not os.path.exists(path):
+        return jsonify({"error": "Bundle not found"}), 404
+    return send_bundle(path)
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 from api.models.models import Financial, Company
 from api.models import db
-from api.utils.cache import cache
+from api.utils.cache import cache, versioned_key
 from api.utils.limiter import limiter
 from api.utils.errors import APIError
+from api.utils.serializers import RowSerializer, isoformat
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from sqlalchemy import desc, asc
@@ -14,37 +15,36 @@ logger = logging.getLogger(__name__)
 
 financials_api = Blueprint("financials_api", __name__)
 
-def serialize_financial(record):
-    """Helper function to serialize financial data"""
-    return {
-        "id": record.id,
-        "company_id": record.company_id,
-        "year": record.year,
-        "period": record.period,
-        # Income Statement
-        "revenue": float(record.revenue) if record.revenue else None,
-        "cost_of_revenue": float(record.cost_of_revenue) if record.cost_of_revenue else None,
-        "gross_profit": float(record.gross_profit) if record.gross_profit else None,
-        "operating_expenses": float(record.operating_expenses) if record.operating_expenses else None,
-        "operating_income": float(record.operating_income) if record.operating_income else None,
-        "net_income": float(record.net_income) if record.net_income else None,
-        # Balance Sheet
-        "total_assets": float(record.total_assets) if record.total_assets else None,
-        "total_liabilities": float(record.total_liabilities) if record.total_liabilities else None,
-        "total_equity": float(record.total_equity) if record.total_equity else None,
-        # Ratios
-        "current_ratio": float(record.current_ratio) if record.current_ratio else None,
-        "debt_to_equity": float(record.debt_to_equity) if record.debt_to_equity else None,
-        "return_on_equity": float(record.return_on_equity) if record.return_on_equity else None,
-        "return_on_assets": float(record.return_on_assets) if record.return_on_assets else None,
-        "profit_margin": float(record.profit_margin) if record.profit_margin else None,
-        # Metadata
-        "created_at": record.created_at.isoformat() if record.created_at else None,
-        "updated_at": record.updated_at.isoformat() if record.updated_at else None
-    }
+# Serialized financial fields, read as Core rows
+FINANCIAL_ROWS = RowSerializer([
+    ("id", Financial.id),
+    ("company_id", Financial.company_id),
+    ("year", Financial.year),
+    ("period", Financial.period),
+    # Income Statement
+    ("revenue", Financial.revenue),
+    ("cost_of_revenue", Financial.cost_of_revenue),
+    ("gross_profit", Financial.gross_profit),
+    ("operating_expenses", Financial.operating_expenses),
+    ("operating_income", Financial.operating_income),
+    ("net_income", Financial.net_income),
+    # Balance Sheet
+    ("total_assets", Financial.total_assets),
+    ("total_liabilities", Financial.total_liabilities),
+    ("total_equity", Financial.total_equity),
+    # Ratios
+    ("current_ratio", Financial.current_ratio),
+    ("debt_to_equity", Financial.debt_to_equity),
+    ("return_on_equity", Financial.return_on_equity),
+    ("return_on_assets", Financial.return_on_assets),
+    ("profit_margin", Financial.profit_margin),
+    # Metadata
+    ("created_at", Financial.created_at, isoformat),
+    ("updated_at", Financial.updated_at, isoformat),
+])
 
 @financials_api.route("/financials/<int:company_id>")
-@cache.cached(timeout=300, query_string=True)
+@cache.cached(timeout=300, make_cache_key=versioned_key("financials", "company_id"))
 @limiter.limit("30/minute")
 def get_financials(company_id):
     """Get financial records for a company with optional filters"""
@@ -59,12 +59,12 @@ def get_financials(company_id):
         limit = request.args.get("limit", type=int)
         
         # Build query
-        query = Financial.query.filter_by(company_id=company_id)
+        query = FINANCIAL_ROWS.select().where(Financial.company_id == company_id)
         
         if year:
-            query = query.filter_by(year=year)
+            query = query.where(Financial.year == year)
         if period:
-            query = query.filter_by(period=period)
+            query = query.where(Financial.period == period)
             
         # Apply sorting
         sort_func = desc if sort == "desc" else asc
@@ -74,7 +74,7 @@ def get_financials(company_id):
         if limit:
             query = query.limit(limit)
         
-        records = query.all()
+        records = FINANCIAL_ROWS.all(query)
         if not records:
             raise APIError("No financial data found", status_code=404)
         
@@ -84,7 +84,7 @@ def get_financials(company_id):
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "data": [serialize_financial(r) for r in records],
+            "data": records,
             "metadata": {
                 "count": len(records),
                 "year": year,
@@ -103,16 +103,18 @@ def get_financials(company_id):
         return jsonify({"error": "Internal server error"}), 500
 
 @financials_api.route("/financials/<int:company_id>/latest")
-@cache.cached(timeout=60)
+@cache.cached(timeout=60, make_cache_key=versioned_key("financials", "company_id"))
 @limiter.limit("60/minute")
 def get_latest_financials(company_id):
     """Get latest financial record for a company"""
     try:
         company = Company.query.get_or_404(company_id)
         
-        latest = Financial.query.filter_by(company_id=company_id)\
-            .order_by(desc(Financial.year), desc(Financial.period))\
-            .first()
+        latest = FINANCIAL_ROWS.first(
+            FINANCIAL_ROWS.select()
+            .where(Financial.company_id == company_id)
+            .order_by(desc(Financial.year), desc(Financial.period))
+        )
             
         if not latest:
             raise APIError("No financial data found", status_code=404)
@@ -123,7 +125,7 @@ def get_latest_financials(company_id):
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "latest_financials": serialize_financial(latest)
+            "latest_financials": latest
         }
         
         return jsonify(response), 200
@@ -136,7 +138,7 @@ def get_latest_financials(company_id):
         return jsonify({"error": "Internal server error"}), 500
 
 @financials_api.route("/financials/<int:company_id>/summary")
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("financials", "company_id"))
 @limiter.limit("30/minute")
 def get_financials_summary(company_id):
     """Get financial summary for a company"""
@@ -144,30 +146,27 @@ def get_financials_summary(company_id):
         company = Company.query.get_or_404(company_id)
         
         # Get latest annual financials
-        latest = Financial.query.filter_by(
-            company_id=company_id,
-            period='Annual'
-        ).order_by(desc(Financial.year)).first()
+        annual = FINANCIAL_ROWS.select().where(
+            Financial.company_id == company_id,
+            Financial.period == 'Annual'
+        )
+        latest = FINANCIAL_ROWS.first(annual.order_by(desc(Financial.year)))
         
         if not latest:
             raise APIError("No financial data found", status_code=404)
             
         # Calculate year-over-year growth
-        previous = Financial.query.filter_by(
-            company_id=company_id,
-            period='Annual',
-            year=latest.year - 1
-        ).first()
+        previous = FINANCIAL_ROWS.first(annual.where(Financial.year == latest["year"] - 1))
         
         growth = {}
         if previous:
             growth = {
-                "revenue_growth": ((latest.revenue - previous.revenue) / previous.revenue * 100) 
-                    if previous.revenue else None,
-                "profit_growth": ((latest.net_income - previous.net_income) / previous.net_income * 100) 
-                    if previous.net_income else None,
-                "assets_growth": ((latest.total_assets - previous.total_assets) / previous.total_assets * 100) 
-                    if previous.total_assets else None
+                "revenue_growth": ((latest["revenue"] - previous["revenue"]) / previous["revenue"] * 100) 
+                    if previous["revenue"] else None,
+                "profit_growth": ((latest["net_income"] - previous["net_income"]) / previous["net_income"] * 100) 
+                    if previous["net_income"] else None,
+                "assets_growth": ((latest["total_assets"] - previous["total_assets"]) / previous["total_assets"] * 100) 
+                    if previous["total_assets"] else None
             }
         
         response = {
@@ -176,7 +175,7 @@ def get_financials_summary(company_id):
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "latest_annual": serialize_financial(latest),
+            "latest_annual": latest,
             "year_over_year_growth": growth
         }
         
@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from api.models.models import MacroIndicators
 from api.models import db
-from api.utils.cache import cache
+from api.utils.cache import cache, versioned_key
 from api.utils.limiter import limiter
 from api.utils.errors import APIError
-from datetime import datetime, timedelta
+from api.utils.serializers import RowSerializer, iso_text
+from datetime import date, datetime, timedelta
 from sqlalchemy import desc, asc
 import logging
 
@@ -26,30 +27,29 @@ def validate_date_range(date_from, date_to):
     except ValueError as e:
         raise APIError(str(e), status_code=400)
 
-def serialize_macro(record):
-    """Helper function to serialize macro indicators"""
-    return {
-        "id": record.id,
-        "date": record.date.strftime("%Y-%m-%d"),
-        # Real Sector
-        "gdp_growth": float(record.gdp_growth) if record.gdp_growth else None,
-        "gdp_per_capita": float(record.gdp_per_capita) if record.gdp_per_capita else None,
-        "inflation_rate": float(record.inflation_rate) if record.inflation_rate else None,
-        "interest_rate": float(record.interest_rate) if record.interest_rate else None,
-        "unemployment_rate": float(record.unemployment_rate) if record.unemployment_rate else None,
-        # Foreign Exchange
-        "etb_usd": float(record.etb_usd) if record.etb_usd else None,
-        "etb_eur": float(record.etb_eur) if record.etb_eur else None,
-        "etb_gbp": float(record.etb_gbp) if record.etb_gbp else None,
-        "etb_jpy": float(record.etb_jpy) if record.etb_jpy else None,
-        # Banking Sector
-        "total_deposits": float(record.total_deposits) if record.total_deposits else None,
-        "total_loans": float(record.total_loans) if record.total_loans else None,
-        "npl_ratio": float(record.npl_ratio) if record.npl_ratio else None
-    }
+# Serialized macro indicator fields, read as Core rows
+MACRO_ROWS = RowSerializer([
+    ("id", MacroIndicators.id),
+    ("date", iso_text(MacroIndicators.date)),
+    # Real Sector
+    ("gdp_growth", MacroIndicators.gdp_growth),
+    ("gdp_per_capita", MacroIndicators.gdp_per_capita),
+    ("inflation_rate", MacroIndicators.inflation_rate),
+    ("interest_rate", MacroIndicators.interest_rate),
+    ("unemployment_rate", MacroIndicators.unemployment_rate),
+    # Foreign Exchange
+    ("etb_usd", MacroIndicators.etb_usd),
+    ("etb_eur", MacroIndicators.etb_eur),
+    ("etb_gbp", MacroIndicators.etb_gbp),
+    ("etb_jpy", MacroIndicators.etb_jpy),
+    # Banking Sector
+    ("total_deposits", MacroIndicators.total_deposits),
+    ("total_loans", MacroIndicators.total_loans),
+    ("npl_ratio", MacroIndicators.npl_ratio),
+])
 
 @macro_api.route("/macro/indicators")
-@cache.cached(timeout=300, query_string=True)
+@cache.cached(timeout=300, make_cache_key=versioned_key("macro"))
 @limiter.limit("30/minute")
 def get_macro_indicators():
     """Get macro indicators with optional date range and filters"""
@@ -64,12 +64,12 @@ def get_macro_indicators():
         validate_date_range(date_from, date_to)
         
         # Build query
-        query = MacroIndicators.query
+        query = MACRO_ROWS.select()
         
         if date_from:
-            query = query.filter(MacroIndicators.date >= datetime.strptime(date_from, "%Y-%m-%d"))
+            query = query.where(MacroIndicators.date >= datetime.strptime(date_from, "%Y-%m-%d").date())
         if date_to:
-            query = query.filter(MacroIndicators.date <= datetime.strptime(date_to, "%Y-%m-%d"))
+            query = query.where(MacroIndicators.date <= datetime.strptime(date_to, "%Y-%m-%d").date())
             
         # Apply sorting
         sort_func = desc if sort == "desc" else asc
@@ -79,12 +79,12 @@ def get_macro_indicators():
         if limit:
             query = query.limit(limit)
         
-        records = query.all()
+        records = MACRO_ROWS.all(query)
         if not records:
             raise APIError("No data found for the specified criteria", status_code=404)
         
         response = {
-            "data": [serialize_macro(r) for r in records],
+            "data": records,
             "metadata": {
                 "count": len(records),
                 "date_from": date_from,
@@ -103,19 +103,19 @@ def get_macro_indicators():
         return jsonify({"error": "Internal server error"}), 500
 
 @macro_api.route("/macro/latest")
-@cache.cached(timeout=60)
+@cache.cached(timeout=60, make_cache_key=versioned_key("macro"))
 @limiter.limit("60/minute")
 def get_latest_indicators():
     """Get latest macro indicators"""
     try:
-        latest = MacroIndicators.query.order_by(desc(MacroIndicators.date)).first()
+        latest = MACRO_ROWS.first(MACRO_ROWS.select().order_by(desc(MacroIndicators.date)))
         
         if not latest:
             raise APIError("No macro data found", status_code=404)
         
         response = {
-            "latest_indicators": serialize_macro(latest),
-            "as_of": latest.date.strftime("%Y-%m-%d")
+            "latest_indicators": latest,
+            "as_of": latest["date"]
         }
         
         return jsonify(response), 200
@@ -128,35 +128,37 @@ def get_latest_indicators():
         return jsonify({"error": "Internal server error"}), 500
 
 @macro_api.route("/macro/summary")
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("macro"))
 @limiter.limit("30/minute")
 def get_macro_summary():
     """Get macro indicators summary with trends"""
     try:
         # Get latest record
-        latest = MacroIndicators.query.order_by(desc(MacroIndicators.date)).first()
+        latest = MACRO_ROWS.first(MACRO_ROWS.select().order_by(desc(MacroIndicators.date)))
         if not latest:
             raise APIError("No macro data found", status_code=404)
             
         # Get record from previous month
-        prev_month = latest.date - timedelta(days=30)
-        previous = MacroIndicators.query.filter(
-            MacroIndicators.date <= prev_month
-        ).order_by(desc(MacroIndicators.date)).first()
+        prev_month = date.fromisoformat(latest["date"]) - timedelta(days=30)
+        previous = MACRO_ROWS.first(
+            MACRO_ROWS.select()
+            .where(MacroIndicators.date <= prev_month)
+            .order_by(desc(MacroIndicators.date))
+        )
         
         # Calculate changes
         changes = {}
         if previous:
             changes = {
-                "inflation_change": latest.inflation_rate - previous.inflation_rate if all([latest.inflation_rate, previous.inflation_rate]) else None,
-                "interest_rate_change": latest.interest_rate - previous.interest_rate if all([latest.interest_rate, previous.interest_rate]) else None,
-                "fx_usd_change": ((latest.etb_usd - previous.etb_usd) / previous.etb_usd * 100) if all([latest.etb_usd, previous.etb_usd]) else None
+                "inflation_change": latest["inflation_rate"] - previous["inflation_rate"] if all([latest["inflation_rate"], previous["inflation_rate"]]) else None,
+                "interest_rate_change": latest["interest_rate"] - previous["interest_rate"] if all([latest["interest_rate"], previous["interest_rate"]]) else None,
+                "fx_usd_change": ((latest["etb_usd"] - previous["etb_usd"]) / previous["etb_usd"] * 100) if all([latest["etb_usd"], previous["etb_usd"]]) else None
             }
         
         response = {
-            "current": serialize_macro(latest),
+            "current": latest,
             "monthly_changes": changes,
-            "as_of": latest.date.strftime("%Y-%m-%d")
+            "as_of": latest["date"]
         }
         
         return jsonify(response), 200
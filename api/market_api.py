@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request, current_app
 from api.models.models import Company, Stock
 from api.models import db
-from api.utils.cache import cache
+from api.utils.cache import cache, generation, versioned_key
 from api.utils.limiter import limiter
 from api.utils.errors import APIError
-from sqlalchemy import func, desc
+from api.utils.refresh import refresher
+from api.utils.analytics import run_query
+from sqlalchemy import and_, desc, func, null, select
 from datetime import datetime, timedelta
 import logging
 
@@ -13,38 +15,118 @@ logger = logging.getLogger(__name__)
 
 market_api = Blueprint("market_api", __name__)
 
-def calculate_market_metrics(companies, date=None):
-    """Calculate key market metrics"""
-    total_market_cap = 0
+# Cached latest/previous bar per company with the market generation it was
+# built at; a load by any process bumps the generation and retires it
+SNAPSHOT_KEY = "market:snapshot"
+SNAPSHOT_TIMEOUT = 300
+
+def _latest_bars(company_ids=None):
+    """Snapshot entries (latest and previous bar) of every company, or of ``company_ids``.
+
+    One query: each company's second-latest date, found by an index seek,
+    bounds a (company_id, date) range of at most two bars. Companies
+    without bars map to None.
+    """
+    bars = Stock.__table__.alias("bars")
+    previous_date = select(bars.c.date).where(bars.c.company_id == Company.id)\
+        .order_by(desc(bars.c.date)).limit(1).offset(1).scalar_subquery()
+    first_date = select(func.min(bars.c.date)).where(bars.c.company_id == Company.id).scalar_subquery()
+
+    query = select(Company.id, Stock.date, Stock.close, Stock.volume)\
+        .outerjoin(Stock, and_(
+            Stock.company_id == Company.id,
+            Stock.date >= func.coalesce(previous_date, first_date, null()),
+        ))\
+        .order_by(Company.id, desc(Stock.date))
+    if company_ids is not None:
+        query = query.where(Company.id.in_(company_ids))
+
+    entries = {}
+    for company_id, date, close, volume in db.session.execute(query):
+        if date is None:
+            entries[company_id] = None
+        elif company_id not in entries:
+            entries[company_id] = {"date": date, "close": close, "volume": volume,
+                                   "prev_date": None, "prev_close": None}
+        else:
+            entries[company_id].update(prev_date=date, prev_close=close)
+    return entries
+
+def get_market_snapshot():
+    """Return the market snapshot, rebuilding it once the market generation moves on.
+
+    The generation lives in the database, so bars loaded by the ingest
+    service are picked up on the next read here; the timeout bounds how
+    long writes that bump nothing (manual SQL) can go unseen.
+    """
+    current = generation("market")
+    cached = cache.get(SNAPSHOT_KEY)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    snapshot = _latest_bars()
+    cache.set(SNAPSHOT_KEY, (current, snapshot), timeout=SNAPSHOT_TIMEOUT)
+    return snapshot
+
+@refresher("stocks")
+def refresh_market_snapshot(event):
+    """Update snapshot entries for the companies whose bars were loaded"""
+    cached = cache.get(SNAPSHOT_KEY)
+    if cached is None:
+        return  # Built lazily on the next read
+    built_at, snapshot = cached
+    current = generation("market")
+    if built_at != current - 1:
+        # Other loads landed since it was built; rebuild on the next read
+        cache.delete(SNAPSHOT_KEY)
+        return
+    snapshot.update(_latest_bars(event.company_ids))
+    cache.set(SNAPSHOT_KEY, (current, snapshot), timeout=SNAPSHOT_TIMEOUT)
+
+def calculate_market_metrics(companies, date=None, snapshot=None):
+    """Calculate key market metrics.
+
+    With a snapshot, each company's latest and previous bar come from it
+    instead of two queries per company.
+    """
     active_companies = 0
     total_volume = 0
     gainers = 0
     losers = 0
 
     for company in companies:
-        query = Stock.query.filter_by(company_id=company.id)
-        if date:
-            query = query.filter(Stock.date <= date)
-        
-        latest_stock = query.order_by(desc(Stock.date)).first()
-        if latest_stock:
-            market_cap = latest_stock.close * company.shares_outstanding
-            total_market_cap += market_cap
-            total_volume += latest_stock.volume
+        if snapshot is not None:
+            entry = snapshot.get(company.id)
+            latest_close = entry["close"] if entry else None
+            latest_volume = entry["volume"] if entry else None
+            prev_close = entry["prev_close"] if entry else None
+        else:
+            query = Stock.query.filter_by(company_id=company.id)
+            if date:
+                query = query.filter(Stock.date <= date)
+
+            latest_stock = query.order_by(desc(Stock.date)).first()
+            latest_close = latest_stock.close if latest_stock else None
+            latest_volume = latest_stock.volume if latest_stock else None
+            prev_close = None
+            if latest_stock:
+                prev_stock = Stock.query.filter_by(company_id=company.id)\
+                    .filter(Stock.date < latest_stock.date)\
+                    .order_by(desc(Stock.date)).first()
+                prev_close = prev_stock.close if prev_stock else None
+
+        if latest_close is not None:
+            total_volume += latest_volume
             active_companies += 1
-            
-            prev_stock = Stock.query.filter_by(company_id=company.id)\
-                .filter(Stock.date < latest_stock.date)\
-                .order_by(desc(Stock.date)).first()
-            
-            if prev_stock:
-                if latest_stock.close > prev_stock.close:
+
+            if prev_close is not None:
+                if latest_close > prev_close:
                     gainers += 1
-                elif latest_stock.close < prev_stock.close:
+                elif latest_close < prev_close:
                     losers += 1
 
+    # Market cap needs share counts, which the company table does not hold
     return {
-        "total_market_cap": round(total_market_cap, 2),
+        "total_market_cap": None,
         "active_companies": active_companies,
         "total_volume": total_volume,
         "gainers": gainers,
@@ -52,7 +134,7 @@ def calculate_market_metrics(companies, date=None):
     }
 
 @market_api.route("/market/summary")
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("market"))
 @limiter.limit("60/minute")
 def get_market_summary():
     """Get market summary with key metrics"""
@@ -65,7 +147,7 @@ def get_market_summary():
         if not latest_date:
             raise APIError("No trading data available", status_code=404)
 
-        metrics = calculate_market_metrics(companies, latest_date)
+        metrics = calculate_market_metrics(companies, snapshot=get_market_snapshot())
 
         response = {
             "summary": {
@@ -92,36 +174,81 @@ def get_market_summary():
         logger.error(f"Unexpected error in get_market_summary: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+# Daily breadth over a window in one set-based query (DuckDB mirror or SQLite)
+TRENDS_SQL = """
+    WITH bars AS (
+        SELECT company_id, date, close, volume,
+               LAG(close) OVER (PARTITION BY company_id ORDER BY date) AS prev_close
+        FROM stock
+        WHERE date >= $lookback AND date <= $end
+    )
+    SELECT date, COUNT(*) AS active_companies, SUM(volume) AS volume,
+           SUM(CASE WHEN close > prev_close THEN 1 ELSE 0 END) AS gainers,
+           SUM(CASE WHEN close < prev_close THEN 1 ELSE 0 END) AS losers
+    FROM bars
+    WHERE date >= $start
+    GROUP BY date
+    ORDER BY date
+"""
+
+SECTORS_SQL = """
+    WITH window_bars AS (
+        SELECT company_id, MIN(date) AS first_date, MAX(date) AS last_date, SUM(volume) AS volume
+        FROM stock
+        WHERE date >= $start AND date <= $end
+        GROUP BY company_id
+    )
+    SELECT c.sector, COUNT(*) AS companies,
+           AVG((l.close - f.close) / f.close) * 100 AS avg_change,
+           SUM(w.volume) AS volume
+    FROM window_bars w
+    JOIN stock f ON f.company_id = w.company_id AND f.date = w.first_date
+    JOIN stock l ON l.company_id = w.company_id AND l.date = w.last_date
+    JOIN company c ON c.id = w.company_id
+    GROUP BY c.sector
+    ORDER BY avg_change DESC
+"""
+
+CLOSES_SQL = """
+    SELECT s.date, c.ticker, s.close
+    FROM stock s JOIN company c ON c.id = s.company_id
+    WHERE c.ticker IN ({tickers}) AND s.date >= $start AND s.date <= $end
+"""
+
+def _window(days):
+    """(start, end) dates of a window ending at the latest market date"""
+    if days <= 0:
+        raise APIError("Days parameter must be positive", status_code=400)
+    latest_date = db.session.query(func.max(Stock.date)).scalar()
+    if not latest_date:
+        raise APIError("No trading data available", status_code=404)
+    return latest_date - timedelta(days=days), latest_date
+
 @market_api.route("/market/trends")
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("market"))
 @limiter.limit("30/minute")
 def get_market_trends():
-    """Get market trends over time"""
+    """Get daily market breadth and volume over time"""
     try:
         days = request.args.get("days", default=30, type=int)
-        if days <= 0:
-            raise APIError("Days parameter must be positive", status_code=400)
+        start_date, latest_date = _window(days)
 
-        latest_date = db.session.query(func.max(Stock.date)).scalar()
-        if not latest_date:
-            raise APIError("No trading data available", status_code=404)
+        # Look back a little further so the first day has a previous close
+        frame = run_query(TRENDS_SQL, {
+            "lookback": (start_date - timedelta(days=10)).isoformat(),
+            "start": start_date.isoformat(),
+            "end": latest_date.isoformat(),
+        })
 
-        start_date = latest_date - timedelta(days=days)
-        companies = Company.query.all()
-
-        daily_metrics = []
-        current_date = start_date
-        while current_date <= latest_date:
-            metrics = calculate_market_metrics(companies, current_date)
-            if metrics["active_companies"] > 0:
-                daily_metrics.append({
-                    "date": current_date.strftime("%Y-%m-%d"),
-                    "market_cap": metrics["total_market_cap"],
-                    "volume": metrics["total_volume"],
-                    "gainers": metrics["gainers"],
-                    "losers": metrics["losers"]
-                })
-            current_date += timedelta(days=1)
+        # Market cap needs share counts, which the company table does not hold
+        daily_metrics = [{
+            "date": str(row.date)[:10],
+            "market_cap": None,
+            "active_companies": int(row.active_companies),
+            "volume": int(row.volume or 0),
+            "gainers": int(row.gainers),
+            "losers": int(row.losers)
+        } for row in frame.itertuples()]
 
         response = {
             "trends": daily_metrics,
@@ -141,8 +268,81 @@ def get_market_trends():
         logger.error(f"Unexpected error in get_market_trends: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+@market_api.route("/market/sectors")
+@cache.cached(timeout=300, make_cache_key=versioned_key("market"))
+@limiter.limit("30/minute")
+def get_sector_performance():
+    """Average price change and volume per sector over a window"""
+    try:
+        days = request.args.get("days", default=30, type=int)
+        start_date, latest_date = _window(days)
+
+        frame = run_query(SECTORS_SQL, {"start": start_date.isoformat(), "end": latest_date.isoformat()})
+        sectors = [{
+            "sector": row.sector,
+            "companies": int(row.companies),
+            "avg_change": round(float(row.avg_change), 2) if row.avg_change is not None else None,
+            "volume": int(row.volume or 0)
+        } for row in frame.itertuples()]
+
+        return jsonify({
+            "sectors": sectors,
+            "metadata": {
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": latest_date.strftime("%Y-%m-%d")
+            }
+        }), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in get_sector_performance: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in get_sector_performance: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@market_api.route("/market/correlations")
+@cache.cached(timeout=300, make_cache_key=versioned_key("market"))
+@limiter.limit("30/minute")
+def get_return_correlations():
+    """Correlation matrix of daily returns for up to 50 tickers"""
+    try:
+        tickers = [t.strip().upper() for t in request.args.get("tickers", "").split(",") if t.strip()]
+        if not 2 <= len(tickers) <= 50:
+            raise APIError("Provide between 2 and 50 comma separated tickers", status_code=400)
+        days = request.args.get("days", default=365, type=int)
+        start_date, latest_date = _window(days)
+
+        params = {f"t{i}": ticker for i, ticker in enumerate(tickers)}
+        frame = run_query(
+            CLOSES_SQL.format(tickers=", ".join(f"${name}" for name in params)),
+            {**params, "start": start_date.isoformat(), "end": latest_date.isoformat()},
+        )
+        if frame.empty:
+            raise APIError("No price data for the requested tickers", status_code=404)
+
+        returns = frame.pivot(index="date", columns="ticker", values="close").sort_index().pct_change()
+        matrix = returns.corr().round(4)
+        matrix = matrix.astype(object).where(matrix.notna(), None)
+
+        return jsonify({
+            "tickers": list(matrix.columns),
+            "correlations": {ticker: matrix[ticker].to_dict() for ticker in matrix.columns},
+            "metadata": {
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": latest_date.strftime("%Y-%m-%d"),
+                "observations": int(returns.notna().all(axis=1).sum())
+            }
+        }), 200
+
+    except APIError as e:
+        logger.warning(f"API Error in get_return_correlations: {str(e)}")
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Unexpected error in get_return_correlations: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @market_api.route("/market/leaders")
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("market"))
 @limiter.limit("30/minute")
 def get_market_leaders():
     """Get market leaders and laggards"""
@@ -158,28 +358,22 @@ def get_market_leaders():
             raise APIError("Insufficient data for comparison", status_code=404)
 
         companies = Company.query.all()
+        snapshot = get_market_snapshot()
         performance = []
 
         for company in companies:
-            latest = Stock.query.filter_by(
-                company_id=company.id,
-                date=latest_date
-            ).first()
-            
-            previous = Stock.query.filter_by(
-                company_id=company.id,
-                date=prev_date[0]
-            ).first()
-
-            if latest and previous:
-                change = ((latest.close - previous.close) / previous.close) * 100
+            entry = snapshot.get(company.id)
+
+            # Only companies that traded on both of the last two market days
+            if entry and entry["date"] == latest_date and entry["prev_date"] == prev_date[0]:
+                change = ((entry["close"] - entry["prev_close"]) / entry["prev_close"]) * 100
                 performance.append({
                     "company_id": company.id,
                     "ticker": company.ticker,
                     "name": company.name,
-                    "price": round(latest.close, 2),
+                    "price": round(entry["close"], 2),
                     "change": round(change, 2),
-                    "volume": latest.volume
+                    "volume": entry["volume"]
                 })
 
         gainers = sorted(performance, key=lambda x: x["change"], reverse=True)[:5]
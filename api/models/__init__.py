@@ -1,12 +1,10 @@
-from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
-
-# Initialize extensions
-db = SQLAlchemy()
-bcrypt = Bcrypt()
-
-# Import models after db initialization to avoid circular imports
-from api.models.models import Company, CompanyAudit
+# Re-export the extensions bound in models.py so blueprints and scripts share
+# the same SQLAlchemy instance that create_app() initialises
+from api.models.models import (
+    db, bcrypt, Company, CompanyAudit, IngestedFile, BarStats, QuarantinedBar,
+    StockArchive, StockArchiveRun, CacheGeneration
+)
 
 # Optional: Define what should be imported when using 'from api.models import *'
-__all__ = ['db', 'bcrypt', 'Company', 'CompanyAudit']
\ No newline at end of file
+__all__ = ['db', 'bcrypt', 'Company', 'CompanyAudit', 'IngestedFile', 'BarStats', 'QuarantinedBar',
+           'StockArchive', 'StockArchiveRun', 'CacheGeneration']
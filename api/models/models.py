@@ -1,8 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from datetime import datetime
+from api.models.session import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 
 class Company(db.Model):
@@ -32,6 +33,13 @@ class Company(db.Model):
 class CompanyAudit(db.Model):
     """Company Audit Model"""
     __tablename__ = "company_audit"
+    __table_args__ = (
+        # Audit queries: filter on company, user or neither, newest first by
+        # (timestamp, id); id is the rowid, so every index already ends in it
+        db.Index('ix_company_audit_company_timestamp', 'company_id', 'timestamp'),
+        db.Index('ix_company_audit_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_company_audit_timestamp', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
@@ -44,12 +52,16 @@ class CompanyAudit(db.Model):
 
 class Financial(db.Model):
     __tablename__ = "financials"
-    __table_args__ = (db.UniqueConstraint('company_id', 'year', 'period', name='unique_financial_period'),)
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'year', 'period', name='unique_financial_period'),
+        # Latest-annual lookups: company_id = ? AND period = ? ORDER BY year DESC
+        db.Index('ix_financials_company_period_year', 'company_id', 'period', 'year'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey("company.id", ondelete="CASCADE"), nullable=False)
-    year = db.Column(db.Integer, nullable=False, index=True)
-    period = db.Column(db.String(10), nullable=False, index=True)  # Annual/Q1/Q2/Q3/Q4
+    year = db.Column(db.Integer, nullable=False)
+    period = db.Column(db.String(10), nullable=False)  # Annual/Q1/Q2/Q3/Q4
 
     # Income Statement
     revenue = db.Column(db.Float(precision=2))
@@ -99,6 +111,8 @@ class Financial(db.Model):
 
 class Stock(db.Model):
     __tablename__ = "stock"
+    # (company_id, date) serves every per-company range, latest-bar and upsert
+    # lookup; the date index serves market-wide MAX(date) / calendar queries
     __table_args__ = (db.UniqueConstraint('company_id', 'date', name='unique_stock_date'),)
 
     id = db.Column(db.Integer, primary_key=True)
@@ -117,13 +131,16 @@ class Stock(db.Model):
 
 class CompanyNews(db.Model):
     __tablename__ = "company_news"
+    __table_args__ = (
+        db.Index('ix_company_news_company_published', 'company_id', 'published_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey("company.id", ondelete="CASCADE"), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     source = db.Column(db.String(100))
-    published_date = db.Column(db.DateTime, nullable=False, index=True)
+    published_date = db.Column(db.DateTime, nullable=False)
     category = db.Column(db.String(50), index=True)  # Company/Industry/Regulatory
     url = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -137,7 +154,7 @@ class MacroIndicators(db.Model):
     __table_args__ = (db.UniqueConstraint('date', name='unique_macro_date'),)
 
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
 
     # Real Sector
     gdp_growth = db.Column(db.Float(precision=2), nullable=False)
@@ -225,4 +242,112 @@ class User(db.Model):
         self.password = bcrypt.generate_password_hash(password).decode('utf-8')
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password, password)
\ No newline at end of file
+        return bcrypt.check_password_hash(self.password, password)
+
+class IngestedFile(db.Model):
+    """Ledger of drop-folder files already loaded, keyed by content hash"""
+    __tablename__ = "ingested_file"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    dataset = db.Column(db.String(20), index=True)  # stocks/financials/macro/news
+    status = db.Column(db.String(20), nullable=False)  # loaded/rejected
+    rows_loaded = db.Column(db.Integer, default=0)
+    rows_rejected = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    ingested_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<IngestedFile {self.filename} ({self.dataset})>"
+
+class BarStats(db.Model):
+    """Rolling per-company price statistics used to screen incoming bars"""
+    __tablename__ = "bar_stats"
+
+    company_id = db.Column(db.Integer, db.ForeignKey("company.id", ondelete="CASCADE"), primary_key=True)
+    last_date = db.Column(db.Date)
+    last_close = db.Column(db.Float)
+    pending_close = db.Column(db.Float)  # close of the last quarantined jump
+    return_mean = db.Column(db.Float, default=0.0)  # EWMA of log returns
+    return_var = db.Column(db.Float, default=0.0)
+    volume_mean = db.Column(db.Float)  # EWMA of volume
+    observations = db.Column(db.Integer, default=0)
+    repeats = db.Column(db.Integer, default=0)  # consecutive unchanged closes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BarStats {self.company_id} {self.last_date}>"
+
+class QuarantinedBar(db.Model):
+    """Incoming price bar held back from ``stock`` until reviewed"""
+    __tablename__ = "quarantined_bar"
+
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey("company.id", ondelete="CASCADE"), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
+    open = db.Column(db.Float(precision=2))
+    close = db.Column(db.Float(precision=2))
+    high = db.Column(db.Float(precision=2))
+    low = db.Column(db.Float(precision=2))
+    volume = db.Column(db.Integer)
+    reasons = db.Column(db.String(100), nullable=False)  # comma separated anomaly codes
+    return_z = db.Column(db.Float)
+    source = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)  # pending/approved/rejected
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reviewed_at = db.Column(db.DateTime)
+    reviewed_by = db.Column(db.Integer, db.ForeignKey("user.id"))
+
+    def __repr__(self):
+        return f"<QuarantinedBar {self.company_id} {self.date} {self.reasons}>"
+
+class StockArchive(db.Model):
+    """Daily bars older than the archive horizon, moved out of ``stock``.
+
+    Clustered on (company_id, date) without a rowid, so the table is its own
+    index and carries no id or audit columns.
+    """
+    __tablename__ = "stock_archive"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    company_id = db.Column(db.Integer, db.ForeignKey("company.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    open = db.Column(db.Float(precision=2))
+    close = db.Column(db.Float(precision=2))
+    high = db.Column(db.Float(precision=2))
+    low = db.Column(db.Float(precision=2))
+    volume = db.Column(db.Integer)
+
+    def __repr__(self):
+        return f"<StockArchive {self.company_id} {self.date}>"
+
+class StockArchiveRun(db.Model):
+    """One archival pass; the latest cutoff tells readers where the archive ends"""
+    __tablename__ = "stock_archive_run"
+
+    id = db.Column(db.Integer, primary_key=True)
+    cutoff = db.Column(db.Date, nullable=False)  # bars before this date are archived
+    rows_archived = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20), nullable=False, default="running")  # running/finished
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<StockArchiveRun {self.cutoff} {self.status}>"
+
+class CacheGeneration(db.Model):
+    """Invalidation counter of a cache namespace scope, shared by every process.
+
+    Cached views and export jobs key on these, so a bump committed by the
+    ingest service or any app worker retires their entries everywhere.
+    """
+    __tablename__ = "cache_generation"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    namespace = db.Column(db.String(50), primary_key=True)
+    scope = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheGeneration {self.namespace}:{self.scope} {self.generation}>"
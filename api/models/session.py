@@ -0,0 +1,32 @@
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Bind key of the read-only engine configured by api.utils.database
+READER_BIND = "reader"
+
+# Requests that must not change data and can be served by the reader
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """Route reads of safe requests to the read-only engine.
+
+    Statements issued while handling GET/HEAD/OPTIONS requests go to the
+    ``reader`` bind when it is configured. Flushes, DML statements and
+    everything outside a request (ingestion, CLI scripts) use the writer,
+    so a slow export never holds a connection that a login or admin write
+    is waiting for.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+            and has_request_context()
+            and request.method in READ_METHODS
+        ):
+            reader = self._db.engines.get(READER_BIND)
+            if reader is not None:
+                return reader
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
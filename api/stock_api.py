@@ -1,12 +1,15 @@
 from flask import Blueprint, jsonify, request, current_app
 from api.models.models import Stock, Company
 from api.models import db
-from api.utils.cache import cache
+from api.utils.cache import cache, generation, versioned_key
 from api.utils.limiter import limiter
 from api.utils.errors import APIError
+from api.utils.refresh import refresher
+from api.utils.serializers import RowSerializer, iso_text
+from api.utils.archive import INTERVALS, daily_bars, rollup_bars
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, select
 import logging
 
 # Configure logger
@@ -14,6 +17,13 @@ logger = logging.getLogger(__name__)
 
 stock_api = Blueprint("stock_api", __name__)
 
+# Precomputed 30-day summary per company, refreshed after ingestion. Keyed
+# on the company's stocks generation, so a load by any process retires it
+SUMMARY_KEY = "stocks:summary:{}:g{}"
+
+def summary_key(company_id):
+    return SUMMARY_KEY.format(company_id, generation("stocks", company_id))
+
 def validate_date_params(start_date, end_date):
     """Validate date parameters"""
     try:
@@ -27,20 +37,62 @@ def validate_date_params(start_date, end_date):
     except ValueError as e:
         raise APIError(str(e), status_code=400)
 
-def serialize_stock(stock):
-    """Serialize stock data"""
+def stock_change(record):
+    """Open-to-close change in percent"""
+    if not record["open"] or record["close"] is None:
+        return None
+    return round(((record["close"] - record["open"]) / record["open"]) * 100, 2)
+
+# Serialized stock fields, read as Core rows
+STOCK_ROWS = RowSerializer(
+    [
+        ("date", iso_text(Stock.date)),
+        ("open", Stock.open),
+        ("close", Stock.close),
+        ("high", Stock.high),
+        ("low", Stock.low),
+        ("volume", Stock.volume),
+    ],
+    derived=[("change", stock_change)],
+)
+
+def compute_stock_summary(company_id):
+    """Compute 30-day summary statistics for a company ({} without data)"""
+    # Last 30 days of daily bars; the archive holds them if the cutoff is recent
+    thirty_days_ago = (datetime.now() - timedelta(days=30)).date()
+    bars = daily_bars(company_id, thirty_days_ago, archived=True)
+    stocks = db.session.execute(
+        select(bars.c.date, bars.c.close, bars.c.high, bars.c.low, bars.c.volume).order_by(bars.c.date)
+    ).all()
+
+    if not stocks:
+        return {}
+
+    latest = stocks[-1]
+    earliest = stocks[0]
+    high = max(stocks, key=lambda x: x.high)
+    low = min(stocks, key=lambda x: x.low)
+
     return {
-        "date": stock.date.strftime("%Y-%m-%d"),
-        "open": float(stock.open),
-        "close": float(stock.close),
-        "high": float(stock.high),
-        "low": float(stock.low),
-        "volume": stock.volume,
-        "change": round(((stock.close - stock.open) / stock.open) * 100, 2)
+        "current_price": latest.close,
+        "change_30d": round(((latest.close - earliest.close) / earliest.close) * 100, 2),
+        "high_30d": high.high,
+        "low_30d": low.low,
+        "volume_30d": sum(s.volume or 0 for s in stocks),
+        "last_updated": latest.date.strftime("%Y-%m-%d")
     }
 
+@refresher("stocks")
+def refresh_stock_summaries(event):
+    """Recompute 30-day summaries of affected companies if the load touched that window"""
+    thirty_days_ago = (datetime.now() - timedelta(days=30)).date()
+    if event.date_to and event.date_to < thirty_days_ago:
+        return
+    for company_id in event.company_ids:
+        cache.set(summary_key(company_id), compute_stock_summary(company_id), timeout=300)
+
 @stock_api.route("/stocks/<int:company_id>", methods=["GET"])
-@cache.cached(timeout=300, query_string=True)
+@cache.cached(timeout=300, make_cache_key=versioned_key("stocks", "company_id"))
 @limiter.limit("30/minute")
 def get_stocks(company_id):
     """Get stock prices for a company with optional date filters"""
@@ -53,28 +105,36 @@ def get_stocks(company_id):
         end_date = request.args.get("end_date")
         limit = request.args.get("limit", type=int)
         sort = request.args.get("sort", "asc")
+        interval = request.args.get("interval", "daily")
 
         # Validate date parameters
         validate_date_params(start_date, end_date)
-
-        # Build query
-        query = Stock.query.filter_by(company_id=company_id)
-
-        # Apply date filters
-        if start_date:
-            query = query.filter(Stock.date >= datetime.strptime(start_date, "%Y-%m-%d"))
-        if end_date:
-            query = query.filter(Stock.date <= datetime.strptime(end_date, "%Y-%m-%d"))
+        if interval not in INTERVALS:
+            raise APIError(f"interval must be one of {', '.join(INTERVALS)}", status_code=400)
+
+        # Daily bars, including archived history when the range reaches it
+        bars = daily_bars(
+            company_id,
+            datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None,
+            datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None,
+        )
+        if interval != "daily":
+            bars = rollup_bars(bars, interval)
+
+        # Build query in the serializer's column order
+        query = select(
+            iso_text(bars.c.date), bars.c.open, bars.c.close, bars.c.high, bars.c.low, bars.c.volume
+        )
 
         # Apply sorting
         sort_func = asc if sort == "asc" else desc
-        query = query.order_by(sort_func(Stock.date))
+        query = query.order_by(sort_func(bars.c.date))
 
         # Apply limit
         if limit:
             query = query.limit(limit)
 
-        stocks = query.all()
+        stocks = STOCK_ROWS.all(query)
 
         # Prepare response
         response = {
@@ -83,11 +143,12 @@ def get_stocks(company_id):
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "data": [serialize_stock(stock) for stock in stocks],
+            "data": stocks,
             "metadata": {
                 "count": len(stocks),
                 "start_date": start_date,
                 "end_date": end_date,
+                "interval": interval,
                 "sort": sort
             }
         }
@@ -102,16 +163,26 @@ def get_stocks(company_id):
         return jsonify({"error": "Internal server error"}), 500
 
 @stock_api.route("/stocks/<int:company_id>/latest", methods=["GET"])
-@cache.cached(timeout=60)
+@cache.cached(timeout=60, make_cache_key=versioned_key("stocks", "company_id"))
 @limiter.limit("60/minute")
 def get_latest_stock(company_id):
     """Get latest stock price for a company"""
     try:
         company = Company.query.get_or_404(company_id)
         
-        latest_stock = Stock.query.filter_by(company_id=company_id)\
-            .order_by(Stock.date.desc())\
-            .first()
+        latest_stock = STOCK_ROWS.first(
+            STOCK_ROWS.select()
+            .where(Stock.company_id == company_id)
+            .order_by(Stock.date.desc())
+        )
+        if not latest_stock:
+            # A company that stopped trading may only have archived bars
+            bars = daily_bars(company_id, archived=True)
+            latest_stock = STOCK_ROWS.first(
+                select(
+                    iso_text(bars.c.date), bars.c.open, bars.c.close, bars.c.high, bars.c.low, bars.c.volume
+                ).order_by(bars.c.date.desc())
+            )
 
         if not latest_stock:
             raise APIError("No stock data available", status_code=404)
@@ -122,7 +193,7 @@ def get_latest_stock(company_id):
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "latest_stock": serialize_stock(latest_stock)
+            "latest_stock": latest_stock
         }
 
         return jsonify(response), 200
@@ -135,43 +206,29 @@ def get_latest_stock(company_id):
         return jsonify({"error": "Internal server error"}), 500
 
 @stock_api.route("/stocks/<int:company_id>/summary", methods=["GET"])
-@cache.cached(timeout=300)
+@cache.cached(timeout=300, make_cache_key=versioned_key("stocks", "company_id"))
 @limiter.limit("30/minute")
 def get_stock_summary(company_id):
     """Get stock price summary for a company"""
     try:
         company = Company.query.get_or_404(company_id)
-        
-        # Get last 30 days of data
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        stocks = Stock.query.filter_by(company_id=company_id)\
-            .filter(Stock.date >= thirty_days_ago)\
-            .order_by(Stock.date.asc())\
-            .all()
-
-        if not stocks:
+
+        key = summary_key(company_id)
+        summary = cache.get(key)
+        if summary is None:
+            summary = compute_stock_summary(company_id)
+            cache.set(key, summary, timeout=300)
+
+        if not summary:
             raise APIError("No stock data available", status_code=404)
 
-        # Calculate summary statistics
-        latest = stocks[-1]
-        earliest = stocks[0]
-        high = max(stocks, key=lambda x: x.high)
-        low = min(stocks, key=lambda x: x.low)
-        
         response = {
             "company": {
                 "id": company.id,
                 "name": company.name,
                 "ticker": company.ticker
             },
-            "summary": {
-                "current_price": latest.close,
-                "change_30d": round(((latest.close - earliest.close) / earliest.close) * 100, 2),
-                "high_30d": high.high,
-                "low_30d": low.low,
-                "volume_30d": sum(s.volume for s in stocks),
-                "last_updated": latest.date.strftime("%Y-%m-%d")
-            }
+            "summary": summary
         }
 
         return jsonify(response), 200
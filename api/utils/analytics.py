@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+from flask import current_app
+
+from api.models.models import db
+from api.utils.refresh import refresher
+
+# DuckDB is optional; without it analytical queries run on the primary DB
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rows per read from the primary DB during a rebuild
+CHUNK_SIZE = 500_000
+
+STOCK_COLUMNS = "company_id, date, open, high, low, close, volume"
+
+# Hot and archived daily bars; a bar re-ingested after archival shadows its
+# archived copy (see api.utils.archive)
+ALL_BARS_SQL = (
+    f"SELECT {STOCK_COLUMNS} FROM stock UNION ALL "
+    f"SELECT {STOCK_COLUMNS} FROM stock_archive a WHERE NOT EXISTS "
+    f"(SELECT 1 FROM stock s WHERE s.company_id = a.company_id AND s.date = a.date)"
+)
+
+# Small tables are mirrored whole on every refresh
+TABLE_QUERIES = {
+    "company": "SELECT id, name, ticker, industry, sector FROM company",
+    "financials": "SELECT * FROM financials",
+    "macro_indicators": "SELECT * FROM macro_indicators",
+}
+DATE_COLUMNS = {"macro_indicators": "date"}
+
+
+class AnalyticsStore:
+    """Columnar mirror of the market data as Parquet files queried by DuckDB.
+
+    ``stock`` is split into one file per year; the small tables are one file
+    each. Writers rebuild a file next to the old one and atomically replace
+    it, so readers in other threads and processes always see a complete
+    file. Each reader thread gets its own in-memory DuckDB connection with
+    views over the files.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.stock_dir = os.path.join(self.root, "stock")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self._local = threading.local()
+
+    @property
+    def available(self):
+        """Whether DuckDB is installed and the mirror has been built"""
+        return duckdb is not None and os.path.exists(self.manifest_path)
+
+    def invalidate(self):
+        """Stop serving the mirror until the next rebuild"""
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+    def _path(self, table):
+        return os.path.join(self.root, f"{table}.parquet")
+
+    def _year_path(self, year):
+        return os.path.join(self.stock_dir, f"year={year}.parquet")
+
+    def connection(self):
+        """Per-thread DuckDB connection with views over the mirrored files"""
+        con = getattr(self._local, "connection", None)
+        if con is None:
+            con = duckdb.connect()
+            con.execute(
+                f"CREATE VIEW stock AS SELECT * FROM read_parquet('{self.stock_dir}/*.parquet')"
+            )
+            for table in TABLE_QUERIES:
+                con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{self._path(table)}')")
+            self._local.connection = con
+        return con
+
+    def query(self, sql, params=None):
+        return self.connection().execute(sql, params or {}).df()
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialise writers across processes (ingest service and web app)"""
+        os.makedirs(self.stock_dir, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _copy(self, con, select_sql, path):
+        tmp = f"{path}.tmp"
+        con.execute(f"COPY ({select_sql}) TO '{tmp}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+        os.replace(tmp, path)
+
+    def _write_table(self, con, source, table):
+        frame = pd.read_sql_query(TABLE_QUERIES[table], source)
+        con.register("frame", frame)
+        select_sql = "SELECT * FROM frame"
+        if table in DATE_COLUMNS:
+            column = DATE_COLUMNS[table]
+            select_sql = f"SELECT * REPLACE (CAST({column} AS DATE) AS {column}) FROM frame"
+        self._copy(con, select_sql, self._path(table))
+        con.unregister("frame")
+
+    def _bars_sql(self, source):
+        """Source of daily bars, including the archive once it exists"""
+        has_archive = source.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_archive'"
+        ).fetchone()
+        return f"SELECT * FROM ({ALL_BARS_SQL})" if has_archive else f"SELECT {STOCK_COLUMNS} FROM stock"
+
+    def _write_manifest(self):
+        with open(self.manifest_path, "w") as f:
+            json.dump({"refreshed_at": datetime.utcnow().isoformat()}, f)
+
+    def rebuild(self, database_path):
+        """Mirror every table from scratch by streaming the primary DB once"""
+        with self._write_lock():
+            source = sqlite3.connect(database_path)
+            con = duckdb.connect()
+            try:
+                con.execute(
+                    "CREATE TABLE bars (company_id INTEGER, date DATE, open DOUBLE, high DOUBLE,"
+                    " low DOUBLE, close DOUBLE, volume BIGINT)"
+                )
+                rows = 0
+                for chunk in pd.read_sql_query(
+                    self._bars_sql(source), source, chunksize=CHUNK_SIZE
+                ):
+                    con.register("chunk", chunk)
+                    con.execute(f"INSERT INTO bars SELECT {STOCK_COLUMNS} FROM chunk")
+                    con.unregister("chunk")
+                    rows += len(chunk)
+
+                for path in os.listdir(self.stock_dir):
+                    os.remove(os.path.join(self.stock_dir, path))
+                # An empty table still gets one file so the stock view can bind
+                years = [y for (y,) in con.execute("SELECT DISTINCT year(date) FROM bars").fetchall()]
+                years = years or [date.today().year]
+                for year in years:
+                    self._copy(
+                        con,
+                        f"SELECT * FROM bars WHERE year(date) = {int(year)} ORDER BY company_id, date",
+                        self._year_path(year),
+                    )
+                for table in TABLE_QUERIES:
+                    self._write_table(con, source, table)
+            finally:
+                con.close()
+                source.close()
+            self._write_manifest()
+        logger.info(f"Analytics mirror rebuilt: {rows} bars in {len(years)} yearly files")
+        return rows
+
+    def refresh(self, event, database_path):
+        """Bring the mirror up to date with one ingestion event"""
+        if event.dataset == "stocks" and not event.date_from:
+            # Bulk loads that do not report their date range
+            return self.rebuild(database_path)
+        with self._write_lock():
+            source = sqlite3.connect(database_path)
+            con = duckdb.connect()
+            try:
+                if event.dataset == "stocks" and event.company_ids and event.date_from:
+                    self._refresh_bars(con, source, event)
+                elif event.dataset == "financials":
+                    self._write_table(con, source, "financials")
+                elif event.dataset == "macro":
+                    self._write_table(con, source, "macro_indicators")
+                # Companies are few and may change with any load
+                self._write_table(con, source, "company")
+            finally:
+                con.close()
+                source.close()
+            self._write_manifest()
+
+    def _refresh_bars(self, con, source, event):
+        """Replace the event's companies x date range in the affected yearly files"""
+        date_from, date_to = _as_date(event.date_from), _as_date(event.date_to or event.date_from)
+        ids = pd.DataFrame({"company_id": event.company_ids})
+        con.register("ids", ids)
+        placeholders = ",".join("?" * len(event.company_ids))
+        bars_sql = self._bars_sql(source)
+        for year in range(date_from.year, date_to.year + 1):
+            start = max(date_from, date(year, 1, 1)).isoformat()
+            end = min(date_to, date(year, 12, 31)).isoformat()
+            delta = pd.read_sql_query(
+                f"{bars_sql} WHERE company_id IN ({placeholders}) AND date >= ? AND date <= ?",
+                source,
+                params=[*event.company_ids, start, end],
+            )
+            con.register("delta", delta)
+            new_rows = (
+                f"SELECT company_id, CAST(date AS DATE) AS date, open, high, low, close, "
+                f"CAST(volume AS BIGINT) AS volume FROM delta"
+            )
+            path = self._year_path(year)
+            if os.path.exists(path):
+                select_sql = (
+                    f"SELECT * FROM read_parquet('{path}') "
+                    f"WHERE NOT (date BETWEEN DATE '{start}' AND DATE '{end}' "
+                    f"AND company_id IN (SELECT company_id FROM ids)) "
+                    f"UNION ALL {new_rows} ORDER BY company_id, date"
+                )
+            else:
+                select_sql = f"{new_rows} ORDER BY company_id, date"
+            self._copy(con, select_sql, path)
+            con.unregister("delta")
+        con.unregister("ids")
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _database_path():
+    return db.engine.url.database
+
+
+def init_analytics(app):
+    """Attach the analytics mirror when enabled and DuckDB is installed"""
+    if not app.config["ANALYTICS_ENABLED"]:
+        return None
+    if duckdb is None:
+        logger.info("duckdb is not installed; analytics run on the primary database")
+        return None
+    store = AnalyticsStore(app.config["ANALYTICS_DIR"])
+    app.extensions["analytics"] = store
+    return store
+
+
+def get_store():
+    """The app's analytics store if it is ready to serve queries, else None"""
+    store = current_app.extensions.get("analytics")
+    return store if store is not None and store.available else None
+
+
+def run_query(sql, params=None):
+    """Run an analytical query on the mirror, falling back to the primary DB.
+
+    The SQL must be portable between DuckDB and SQLite and use ``$name``
+    parameters. Returns a DataFrame; date columns come back as dates from
+    the mirror and ISO strings from SQLite.
+    """
+    store = get_store()
+    if store is not None:
+        return store.query(sql, params)
+    result = db.session.connection().exec_driver_sql(sql, params or {})
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+@refresher("stocks", "financials", "macro", "companies")
+def refresh_analytics(event):
+    """Mirror the slice an ingestion changed into the analytics store"""
+    store = get_store()
+    if store is not None:
+        store.refresh(event, _database_path())
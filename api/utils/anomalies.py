@@ -0,0 +1,229 @@
+import logging
+import math
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api.models.models import db, BarStats, QuarantinedBar, Stock
+from api.utils.refresh import IngestionEvent, publish_ingestion
+from api.utils.writer import after_commit
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rolling statistics are exponentially weighted over roughly this many bars
+SPAN = 60
+ALPHA = 2 / (SPAN + 1)
+
+WARMUP_BARS = 20       # observations before return / volume checks apply
+RETURN_Z = 6.0         # log return z-score flagged as a bad tick
+MIN_SIGMA = 0.005      # volatility floor so very calm series are not over-flagged
+VOLUME_SPIKE = 10.0    # volume this many times the rolling average
+STALE_REPEATS = 5      # consecutive unchanged closes flagged as a stale feed
+
+STATE_COLUMNS = [c.name for c in BarStats.__table__.columns if c.name != "updated_at"]
+
+
+def _new_state(company_id):
+    return {
+        "company_id": company_id,
+        "last_date": None,
+        "last_close": None,
+        "pending_close": None,
+        "return_mean": 0.0,
+        "return_var": 0.0,
+        "volume_mean": None,
+        "observations": 0,
+        "repeats": 0,
+    }
+
+
+def _ohlc_consistent(open_, high, low, close, volume):
+    if any(v is None or v != v for v in (open_, high, low, close)):
+        return False
+    # A missing volume (an Excel chunk with no volume cells reads as None) is allowed
+    return (
+        0 < low <= high and low <= open_ <= high and low <= close <= high
+        and (volume is None or pd.isna(volume) or volume >= 0)
+    )
+
+
+def _return_z(state, close):
+    """z-score of the log return from ``state``'s last close, or None during warm-up"""
+    if not state["last_close"] or close <= 0 or state["observations"] < WARMUP_BARS:
+        return None
+    sigma = max(math.sqrt(state["return_var"]), MIN_SIGMA)
+    return (math.log(close / state["last_close"]) - state["return_mean"]) / sigma
+
+
+def _update(state, bar_date, close, volume):
+    """Fold an accepted bar into the rolling state (EWMA mean / variance)"""
+    if state["last_close"] and close > 0:
+        diff = math.log(close / state["last_close"]) - state["return_mean"]
+        increment = ALPHA * diff
+        state["return_mean"] += increment
+        state["return_var"] = (1 - ALPHA) * (state["return_var"] + diff * increment)
+        state["observations"] += 1
+    if volume is not None and volume == volume:
+        if state["volume_mean"] is None:
+            state["volume_mean"] = float(volume)
+        else:
+            state["volume_mean"] += ALPHA * (volume - state["volume_mean"])
+    state["last_date"] = bar_date
+    state["last_close"] = close
+    state["pending_close"] = None
+
+
+def check_bar(state, bar_date, open_, high, low, close, volume):
+    """Screen one bar against the company's rolling state.
+
+    Returns ``(reasons, return_z)``; an empty reasons list means the bar is
+    accepted and has been folded into the state. Bars dated on or before the
+    last screened bar (corrections, re-deliveries) only get the OHLC check and
+    leave the state untouched.
+    """
+    reasons = []
+    if not _ohlc_consistent(open_, high, low, close, volume):
+        return ["ohlc_inconsistent"], None
+    if state["last_date"] is not None and bar_date <= state["last_date"]:
+        return reasons, None
+
+    z = _return_z(state, close)
+    if z is not None and abs(z) > RETURN_Z:
+        # A jump that the next bar confirms (small move from the quarantined
+        # close) is a genuine level shift, not a bad tick: accept it
+        pending = state["pending_close"]
+        if pending and abs(math.log(close / pending)) <= RETURN_Z * max(math.sqrt(state["return_var"]), MIN_SIGMA):
+            state["last_close"] = pending
+            z = _return_z(state, close)
+        else:
+            reasons.append("return_outlier")
+            state["pending_close"] = close
+
+    if (
+        state["observations"] >= WARMUP_BARS and state["volume_mean"]
+        and volume is not None and volume > VOLUME_SPIKE * state["volume_mean"]
+    ):
+        reasons.append("volume_spike")
+
+    state["repeats"] = state["repeats"] + 1 if close == state["last_close"] else 0
+    if state["repeats"] >= STALE_REPEATS:
+        reasons.append("stale_price")
+
+    if not reasons:
+        _update(state, bar_date, close, volume)
+    return reasons, z
+
+
+def _seed_state(company_id):
+    """Build the state of a company without one from its most recent bars only"""
+    state = _new_state(company_id)
+    rows = db.session.execute(
+        select(Stock.date, Stock.close, Stock.volume)
+        .where(Stock.company_id == company_id)
+        .order_by(Stock.date.desc())
+        .limit(SPAN * 2)
+    ).all()
+    for bar_date, close, volume in reversed(rows):
+        if close:
+            _update(state, bar_date, close, volume)
+    return state
+
+
+def load_states(company_ids):
+    """Rolling state per company, seeding the ones screened for the first time"""
+    company_ids = [int(c) for c in company_ids]
+    states = {
+        row.company_id: {c: getattr(row, c) for c in STATE_COLUMNS}
+        for row in db.session.execute(
+            select(BarStats.__table__).where(BarStats.company_id.in_(company_ids))
+        )
+    }
+    for company_id in company_ids:
+        if company_id not in states:
+            states[company_id] = _seed_state(company_id)
+    return states
+
+
+def save_states(states):
+    """Upsert the rolling state, in the caller's transaction"""
+    if not states:
+        return
+    stmt = sqlite_insert(BarStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["company_id"],
+        set_={**{c: stmt.excluded[c] for c in STATE_COLUMNS if c != "company_id"},
+              "updated_at": datetime.utcnow()},
+    )
+    db.session.execute(stmt, list(states.values()))
+
+
+def screen_bars(df, source=None):
+    """Split a frame of incoming bars into accepted and quarantined rows.
+
+    The frame needs company_id, date and the OHLCV columns. Each company's
+    rolling state is loaded once, advanced bar by bar in date order and saved
+    back, so screening costs O(new bars) regardless of history length.
+    Quarantined bars are written to ``quarantined_bar``; the accepted frame is
+    returned for loading.
+    """
+    df = df.sort_values(["company_id", "date"])
+    states = load_states(df["company_id"].unique())
+    for column in ("open", "high", "low", "close", "volume"):
+        if column not in df.columns:
+            df = df.assign(**{column: None})
+
+    accepted = []
+    quarantined = []
+    for row in df[["company_id", "date", "open", "high", "low", "close", "volume"]].itertuples():
+        reasons, z = check_bar(
+            states[row.company_id], row.date, row.open, row.high, row.low, row.close, row.volume
+        )
+        accepted.append(not reasons)
+        if reasons:
+            quarantined.append({
+                "company_id": int(row.company_id),
+                "date": row.date,
+                "open": row.open,
+                "high": row.high,
+                "low": row.low,
+                "close": row.close,
+                "volume": None if pd.isna(row.volume) else int(row.volume),
+                "reasons": ",".join(reasons),
+                "return_z": None if z is None else round(z, 2),
+                "source": source,
+                "status": "pending",
+                "created_at": datetime.utcnow(),
+            })
+
+    save_states(states)
+    if quarantined:
+        db.session.execute(QuarantinedBar.__table__.insert(), quarantined)
+        logger.warning(f"Quarantined {len(quarantined)} bars from {source}")
+    return df[accepted], len(quarantined)
+
+
+def review_bar(bar, approve, user_id=None):
+    """Resolve a quarantined bar; approving it upserts the bar into ``stock``.
+
+    Runs inside a write job. An approval publishes an ingestion event once
+    the job has committed.
+    """
+    bar.status = "approved" if approve else "rejected"
+    bar.reviewed_at = datetime.utcnow()
+    bar.reviewed_by = user_id
+    if approve:
+        values = {
+            "company_id": bar.company_id, "date": bar.date, "open": bar.open, "high": bar.high,
+            "low": bar.low, "close": bar.close, "volume": bar.volume,
+        }
+        stmt = sqlite_insert(Stock.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["company_id", "date"],
+            set_={**{c: stmt.excluded[c] for c in ("open", "high", "low", "close", "volume")},
+                  "updated_at": datetime.utcnow()},
+        )
+        db.session.execute(stmt)
+        after_commit(publish_ingestion, IngestionEvent("stocks", [bar.company_id], bar.date, bar.date))
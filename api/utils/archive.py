@@ -0,0 +1,129 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, exists, func, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api.models.models import db, Company, Stock, StockArchive, StockArchiveRun
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Companies moved per transaction; keeps each write lock short for the API
+COMPANY_BATCH = 100
+
+BAR_COLUMNS = ["company_id", "date", "open", "close", "high", "low", "volume"]
+
+# Period start of each rollup interval as SQLite date expressions
+INTERVALS = {
+    "daily": None,
+    "weekly": lambda column: func.date(column, "weekday 0", "-6 days"),  # Monday
+    "monthly": lambda column: func.strftime("%Y-%m-01", column),
+}
+
+
+def horizon_cutoff(days, today=None):
+    """First day of the month ``days`` ago, so whole months are archived"""
+    return ((today or date.today()) - timedelta(days=days)).replace(day=1)
+
+
+def archive_cutoff():
+    """Date before which bars may live in the archive, or None before the first run"""
+    return db.session.execute(select(func.max(StockArchiveRun.cutoff))).scalar()
+
+
+def daily_bars(company_id, start=None, end=None, archived=None):
+    """One company's daily bars as a subquery, reaching into the archive when needed.
+
+    Columns are date, open, close, high, low and volume. Ranges that stay
+    after the archive cutoff only read ``stock``. A bar ingested into
+    ``stock`` after its date was archived shadows the archived copy until
+    the next archive run moves it. ``archived=True`` always includes the
+    archive instead of looking up the cutoff, which saves a query where
+    the range is narrow enough that probing the archive costs nothing.
+    """
+    def bars(table):
+        query = select(table.date, table.open, table.close, table.high, table.low, table.volume)
+        query = query.where(table.company_id == company_id)
+        if start is not None:
+            query = query.where(table.date >= start)
+        if end is not None:
+            query = query.where(table.date <= end)
+        return query
+
+    if archived is None:
+        cutoff = archive_cutoff()
+        archived = cutoff is not None and (start is None or start < cutoff)
+    if not archived:
+        return bars(Stock).subquery("bars")
+
+    archived = bars(StockArchive).where(~exists().where(
+        Stock.company_id == StockArchive.company_id, Stock.date == StockArchive.date
+    ))
+    return union_all(bars(Stock), archived).subquery("bars")
+
+
+def rollup_bars(bars, interval):
+    """Aggregate a daily bars subquery into weekly or monthly OHLCV bars.
+
+    Each bar is dated by the first day of its period; open and close come
+    from the first and last trading day in it.
+    """
+    period = INTERVALS[interval](bars.c.date)
+    window = {"partition_by": period, "order_by": bars.c.date, "rows": (None, None)}
+    ranked = select(
+        period.label("date"),
+        func.first_value(bars.c.open).over(**window).label("open"),
+        func.last_value(bars.c.close).over(**window).label("close"),
+        bars.c.high,
+        bars.c.low,
+        bars.c.volume,
+    ).subquery("ranked")
+    return select(
+        ranked.c.date,
+        func.max(ranked.c.open).label("open"),
+        func.max(ranked.c.close).label("close"),
+        func.max(ranked.c.high).label("high"),
+        func.min(ranked.c.low).label("low"),
+        func.sum(ranked.c.volume).label("volume"),
+    ).group_by(ranked.c.date).subquery("rollup")
+
+
+def archive_bars(cutoff):
+    """Move daily bars dated before ``cutoff`` from ``stock`` into ``stock_archive``.
+
+    The run is recorded first, so readers consult the archive for the whole
+    range before any bar moves. Bars then move a batch of companies per
+    transaction: each bar is copied and deleted atomically, so it is always
+    in exactly one table. Bars already archived are overwritten by the copy in
+    ``stock``, which is the newer one. Returns the finished run.
+    """
+    run = StockArchiveRun(cutoff=cutoff)
+    db.session.add(run)
+    db.session.commit()
+
+    company_ids = db.session.execute(select(Company.id).order_by(Company.id)).scalars().all()
+    moved = 0
+    for i in range(0, len(company_ids), COMPANY_BATCH):
+        low, high = company_ids[i], company_ids[min(i + COMPANY_BATCH, len(company_ids)) - 1]
+        in_batch = (Stock.company_id.between(low, high), Stock.date < cutoff)
+
+        stmt = sqlite_insert(StockArchive).from_select(
+            BAR_COLUMNS,
+            select(*(getattr(Stock, column) for column in BAR_COLUMNS)).where(*in_batch),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["company_id", "date"],
+            set_={column: stmt.excluded[column] for column in BAR_COLUMNS[2:]},
+        )
+        db.session.execute(stmt)
+        moved += db.session.execute(delete(Stock).where(*in_batch)).rowcount
+        db.session.commit()
+        logger.info(f"Archived bars of companies {low}-{high} ({moved} so far)")
+
+    run.rows_archived = moved
+    run.status = "finished"
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"Archived {moved} bars dated before {cutoff}")
+    return run
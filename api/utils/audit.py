@@ -0,0 +1,246 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import insert
+
+from api.models.models import db, CompanyAudit
+from api.utils.writer import after_commit, submit_write, write
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Sentinel telling the flush thread to write what is queued and exit
+_STOP = object()
+
+# Seconds to wait before each retry of a failed flush (a busy writer, say)
+FLUSH_RETRY_DELAYS = (0.5, 1.0, 2.0, 4.0, 8.0)
+
+
+def _jsonable(value):
+    """Details as JSON-ready values; dates and timestamps become ISO text"""
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def audit_row(company_id, action, user_id, details=None, timestamp=None):
+    return {
+        "company_id": company_id,
+        "action": action,
+        "user_id": user_id,
+        "details": details,
+        "timestamp": timestamp or datetime.utcnow(),
+    }
+
+
+def _insert_rows(rows):
+    """Write job: insert audit rows with one executemany.
+
+    If the batch fails (say a company was deleted after its row was
+    queued) the rows are retried one by one, each in its own savepoint, so
+    one bad row costs only itself. Returns the number written.
+    """
+    rows = [{**row, "details": _jsonable(row["details"])} for row in rows]
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(CompanyAudit.__table__), rows)
+        return len(rows)
+    except Exception as e:
+        logger.warning(f"Audit batch of {len(rows)} failed ({str(e)}); retrying row by row")
+
+    written = 0
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(CompanyAudit.__table__), [row])
+            written += 1
+        except Exception as e:
+            logger.error(f"Dropped audit row {row['action']} for company {row['company_id']}: {str(e)}")
+    return written
+
+
+class AuditQueue:
+    """Bounded in-memory buffer of audit rows, flushed in batches by a background thread.
+
+    Write jobs hand their audit rows over instead of inserting them, so a
+    CRUD request's transaction no longer carries the insert or the JSON
+    encoding of its details. Rows are handed over once the job commits, so
+    a change that rolls back leaves no audit row behind. The flush thread
+    takes up to ``batch_size`` rows, or whatever arrived within
+    ``flush_interval`` seconds, and writes them as one executemany job on
+    the single writer, where they share a commit with other API writes.
+
+    Queued rows are not durable until flushed: a crash loses at most the
+    last ``flush_interval`` seconds of them. Actions that cannot accept
+    that are written synchronously (see audit()). A flush the writer
+    cannot take (it timed out or failed) is retried after each of
+    FLUSH_RETRY_DELAYS; only if the last retry fails too are the rows
+    logged and counted as ``failed``. When the queue is full, record()
+    refuses the row and it is written as a write job of its own, so
+    producers never block (a blocked writer thread could never drain the
+    queue); ``overflowed`` in stats() shows how often that happens.
+    """
+
+    def __init__(self, app, max_size=10000, batch_size=500, flush_interval=1.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats = {
+            "queued": 0, "written": 0, "failed": 0, "retries": 0, "overflowed": 0, "sync": 0,
+            "batches": 0, "largest_batch": 0, "max_depth": 0, "last_flush_ms": None,
+        }
+
+    def record(self, row):
+        """Queue an audit row; False when the queue is full"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._stats["overflowed"] += 1
+            return False
+        self._stats["queued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return True
+
+    def count_sync(self):
+        """Count a row its caller wrote synchronously by choice"""
+        self._stats["sync"] += 1
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-flush", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout=10):
+        """Flush what is queued and stop the flush thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            **self._stats,
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "running": bool(self._thread and self._thread.is_alive()),
+        }
+
+    def _run(self):
+        while True:
+            row = self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            self._flush(batch)
+            if stopping:
+                # Rows queued behind the sentinel still get written
+                self._flush(self._drain())
+                return
+
+    def _drain(self):
+        rows = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if row is not _STOP:
+                rows.append(row)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        start = time.perf_counter()
+        for delay in (*FLUSH_RETRY_DELAYS, None):
+            try:
+                with self.app.app_context():
+                    written = write(_insert_rows, batch)
+                break
+            except Exception as e:
+                if delay is None:
+                    logger.error(f"Audit flush of {len(batch)} rows failed, dropping them: {str(e)}")
+                    self._stats["failed"] += len(batch)
+                    return
+                logger.warning(f"Audit flush of {len(batch)} rows failed ({str(e)}); retrying in {delay}s")
+                self._stats["retries"] += 1
+                time.sleep(delay)
+        self._stats["written"] += written
+        self._stats["failed"] += len(batch) - written
+        self._stats["batches"] += 1
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def init_audit_queue(app):
+    """Attach the audit buffer unless AUDIT_MODE is sync"""
+    if app.config["AUDIT_MODE"] != "async":
+        return None
+    audit_queue = AuditQueue(
+        app,
+        max_size=app.config["AUDIT_QUEUE_SIZE"],
+        batch_size=app.config["AUDIT_BATCH_SIZE"],
+        flush_interval=app.config["AUDIT_FLUSH_INTERVAL"],
+    )
+    app.extensions["audit_queue"] = audit_queue
+    return audit_queue
+
+
+def _queue_row(audit_queue, row):
+    """After-commit callback: queue the row, or write it on its own when the queue is full"""
+    if not audit_queue.record(row):
+        submit_write(_insert_rows, [row])
+
+
+def audit(company_id, action, user_id, details=None, sync=None):
+    """Record an audit row from inside a write job.
+
+    Rows for actions in AUDIT_SYNC_ACTIONS (or with ``sync=True``) are
+    inserted into the job's own transaction, so they commit or roll back
+    with the change they describe. Others go to the audit queue after the
+    job commits, and are dropped if it rolls back. Details may hold dates
+    and timestamps; they are converted when written.
+    """
+    row = audit_row(company_id, action, user_id, details)
+    audit_queue = current_app.extensions.get("audit_queue")
+    if sync is None:
+        sync = action in current_app.config["AUDIT_SYNC_ACTIONS"]
+    if not sync and audit_queue is not None:
+        after_commit(_queue_row, audit_queue, row)
+        return
+    if audit_queue is not None and sync:
+        audit_queue.count_sync()
+    db.session.execute(
+        insert(CompanyAudit.__table__), [{**row, "details": _jsonable(details)}]
+    )
+
+
+def audit_queue_stats():
+    audit_queue = current_app.extensions.get("audit_queue")
+    return audit_queue.stats() if audit_queue is not None else None
@@ -0,0 +1,15 @@
+from functools import wraps
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from api.models.models import User
+from api.utils.errors import APIError
+
+def admin_required(fn):
+    """Require a valid access token belonging to an active admin user"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        user = User.query.get(get_jwt_identity())
+        if not user or not user.is_active or user.role != 'admin':
+            raise APIError("Admin privileges required", status_code=403)
+        return fn(*args, **kwargs)
+    return wrapper
@@ -1,4 +1,9 @@
+from flask import g, has_request_context, request
 from flask_caching import Cache
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api.models.models import db, CacheGeneration
 
 cache = Cache(config={
     'CACHE_TYPE': 'simple',
@@ -8,4 +13,46 @@ cache = Cache(config={
 def init_cache(app):
     """Initialize caching"""
     cache.init_app(app)
-    return cache
\ No newline at end of file
+    return cache
+
+def generation(namespace, scope='all'):
+    """Current generation counter for a cache namespace scope.
+
+    Read once per request: every cache key built while serving it uses the
+    same generation, and only the first costs a query.
+    """
+    key = (namespace, str(scope))
+    seen = g.setdefault('cache_generations', {}) if has_request_context() else {}
+    if key not in seen:
+        seen[key] = db.session.execute(
+            select(CacheGeneration.generation).filter_by(namespace=namespace, scope=str(scope))
+        ).scalar() or 0
+    return seen[key]
+
+def bump_generation(namespace, scope='all'):
+    """Invalidate every cached view in a namespace scope in O(1).
+
+    Views keyed with versioned_key() embed the generation in their cache key,
+    so bumping it makes old entries unreachable; they then expire on their own.
+    The counter lives in the database, so a bump made by the ingest service
+    or another worker reaches every process. It is written in the caller's
+    transaction: call it from a write job so it commits with the change.
+    """
+    statement = sqlite_insert(CacheGeneration).values(namespace=namespace, scope=str(scope), generation=1)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['namespace', 'scope'],
+        set_={'generation': CacheGeneration.generation + 1},
+    ))
+
+def versioned_key(namespace, scope_arg=None):
+    """Build a make_cache_key for cached views that can be invalidated by scope.
+
+    ``scope_arg`` names the view argument (e.g. company_id) that scopes the
+    entry; without it the whole namespace shares one generation. The request
+    path and sorted query string are part of the key.
+    """
+    def make_cache_key(*args, **kwargs):
+        scope = kwargs.get(scope_arg, 'all') if scope_arg else 'all'
+        query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        return f'{namespace}:{scope}:g{generation(namespace, scope)}:{request.path}?{query}'
+    return make_cache_key
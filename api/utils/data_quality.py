@@ -0,0 +1,269 @@
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from sqlalchemy import text
+
+from api.models.models import db, Company, Financial, MacroIndicators
+from api.utils.archive import archive_cutoff
+from api.utils.cache import cache, generation
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Default thresholds (overridable through app config / CLI flags)
+GAP_DAYS = 5          # missing market days before a series counts as gappy
+STALE_DAYS = 7        # days a ticker may lag the latest market date
+OUTLIER_Z = 5.0       # close price z-score (within the company) flagged as an outlier
+MAX_OUTLIERS = 100    # outlier bars listed in the report
+
+# Bar queries read ``{bars}``: plain ``stock`` until the first archive run,
+# then stock plus the archived bars it does not shadow (see archive.daily_bars)
+ARCHIVED_BARS_SQL = """(
+    SELECT company_id, date, open, close, high, low, volume FROM stock
+    UNION ALL
+    SELECT a.company_id, a.date, a.open, a.close, a.high, a.low, a.volume
+    FROM stock_archive a
+    WHERE NOT EXISTS (SELECT 1 FROM stock s WHERE s.company_id = a.company_id AND s.date = a.date)
+)"""
+
+# Market calendar: every date any company traded (index-only on stock.date)
+CALENDAR_SQL = "SELECT DISTINCT date FROM {bars} ORDER BY date"
+
+# Per-company bar statistics in a single streaming pass over the bars
+BAR_STATS_SQL = """
+    SELECT company_id,
+           COUNT(*) AS bars,
+           MIN(date) AS first_date,
+           MAX(date) AS last_date,
+           SUM(NOT (low <= high AND close BETWEEN low AND high
+                    AND open BETWEEN low AND high)) AS inconsistent,
+           TOTAL(close) AS sum_close,
+           TOTAL(close * close) AS sum_sq_close,
+           MIN(close) AS min_close,
+           MAX(close) AS max_close,
+           COUNT(*) - COUNT(open) AS null_open,
+           COUNT(*) - COUNT(high) AS null_high,
+           COUNT(*) - COUNT(low) AS null_low,
+           COUNT(*) - COUNT(close) AS null_close,
+           COUNT(*) - COUNT(volume) AS null_volume
+    FROM {bars}
+    GROUP BY company_id
+"""
+
+# Bars per company and calendar year as index range counts on (company_id, date)
+BAR_COVERAGE_SQL = """
+    WITH RECURSIVE years(year) AS (
+        SELECT :first_year UNION ALL SELECT year + 1 FROM years WHERE year < :last_year
+    )
+    SELECT c.id, years.year,
+           (SELECT COUNT(*) FROM {bars} s
+            WHERE s.company_id = c.id
+              AND s.date >= years.year || '-01-01'
+              AND s.date < (years.year + 1) || '-01-01') AS bars
+    FROM company c, years
+"""
+
+# Outlier bars of one company, only run for companies whose range is suspicious
+OUTLIER_SQL = """
+    SELECT date, close FROM {bars}
+    WHERE company_id = :company_id
+      AND (close - :mean) * (close - :mean) > :z2 * :var
+"""
+
+FINANCIAL_COVERAGE_SQL = """
+    SELECT company_id, year, COUNT(*) AS periods,
+           SUM(period = 'Annual') AS annual
+    FROM financials
+    GROUP BY company_id, year
+"""
+
+NULL_RATE_TABLES = {
+    "financials": Financial,
+    "macro_indicators": MacroIndicators,
+}
+
+
+def dataset_version():
+    """Cheap fingerprint of the loaded data, used as the report cache key.
+
+    Combines the highest row id of each dataset (an index lookup, catches
+    inserts from any process), the ingestion ledger (catches upserts done by
+    the drop-folder service), the latest archive run (bars moved out of
+    ``stock``) and the dataset generation bumped by ingestion refreshers.
+    """
+    ids = db.session.execute(text("""
+        SELECT (SELECT MAX(id) FROM stock),
+               (SELECT MAX(id) FROM financials),
+               (SELECT MAX(id) FROM macro_indicators),
+               (SELECT MAX(id) FROM company),
+               (SELECT MAX(id) FROM ingested_file),
+               (SELECT MAX(id) FROM stock_archive_run)
+    """)).fetchone()
+    return "-".join(str(i or 0) for i in ids) + f"-g{generation('dataset')}"
+
+
+def _null_rates(table_name, model):
+    """Null fraction of every nullable column of a table in one scan"""
+    columns = [c.name for c in model.__table__.columns if c.nullable]
+    sums = ", ".join(f"SUM({c} IS NULL)" for c in columns)
+    row = db.session.execute(text(f"SELECT COUNT(*), {sums} FROM {table_name}")).fetchone()
+    total = row[0] or 0
+    return {
+        "rows": total,
+        "null_rates": {
+            column: round((nulls or 0) / total, 4) if total else None
+            for column, nulls in zip(columns, row[1:])
+        },
+    }
+
+
+def _as_date(value):
+    return datetime.strptime(value[:10], "%Y-%m-%d").date() if value else None
+
+
+def build_report(gap_days=GAP_DAYS, stale_days=STALE_DAYS, outlier_z=OUTLIER_Z):
+    """Compute the data quality report with a handful of set-based queries.
+
+    Stock metrics come from one streaming aggregate over the bars, archived
+    ones included; year coverage uses index range counts, gaps are measured
+    against the market calendar, and only companies whose close range is
+    suspicious are revisited to list outlier bars.
+    """
+    started = time.perf_counter()
+    bars_table = "stock" if archive_cutoff() is None else ARCHIVED_BARS_SQL
+    tickers = dict(db.session.query(Company.id, Company.ticker).all())
+    calendar = [d for (d,) in db.session.execute(text(CALENDAR_SQL.format(bars=bars_table)))]
+
+    companies = {}
+    stock_nulls = dict.fromkeys(["open", "high", "low", "close", "volume"], 0)
+    suspicious = []
+    for row in db.session.execute(text(BAR_STATS_SQL.format(bars=bars_table))):
+        # Market days inside the company's own date range it has no bar for
+        expected = bisect_right(calendar, row.last_date) - bisect_left(calendar, row.first_date)
+        mean = row.sum_close / row.bars
+        var = row.sum_sq_close / row.bars - mean * mean
+        companies[row.company_id] = {
+            "company_id": row.company_id,
+            "ticker": tickers.get(row.company_id),
+            "bars": row.bars,
+            "first_date": row.first_date,
+            "last_date": row.last_date,
+            "missing_days": expected - row.bars,
+            "inconsistent_bars": int(row.inconsistent or 0),
+            "outliers": 0,
+            "bars_by_year": {},
+            "financial_periods_by_year": {},
+        }
+        for column in stock_nulls:
+            stock_nulls[column] += getattr(row, f"null_{column}")
+        if var > 0 and max(row.max_close - mean, mean - row.min_close) ** 2 > outlier_z ** 2 * var:
+            suspicious.append((row.company_id, mean, var))
+
+    outliers = []
+    for company_id, mean, var in suspicious:
+        bars = db.session.execute(text(OUTLIER_SQL.format(bars=bars_table)), {
+            "company_id": company_id, "mean": mean, "var": var, "z2": outlier_z ** 2,
+        })
+        for bar_date, close in bars:
+            outliers.append({
+                "company_id": company_id,
+                "ticker": tickers.get(company_id),
+                "date": bar_date,
+                "close": close,
+                "z_score": round(abs(close - mean) / var ** 0.5, 2),
+            })
+            companies[company_id]["outliers"] += 1
+
+    if calendar:
+        coverage = db.session.execute(text(BAR_COVERAGE_SQL.format(bars=bars_table)), {
+            "first_year": int(calendar[0][:4]), "last_year": int(calendar[-1][:4]),
+        })
+        for company_id, year, bars in coverage:
+            if bars and company_id in companies:
+                companies[company_id]["bars_by_year"][year] = bars
+
+    missing_annual = []
+    for company_id, year, periods, annual in db.session.execute(text(FINANCIAL_COVERAGE_SQL)):
+        entry = companies.setdefault(company_id, {
+            "company_id": company_id,
+            "ticker": tickers.get(company_id),
+            "bars": 0,
+            "bars_by_year": {},
+            "financial_periods_by_year": {},
+        })
+        entry["financial_periods_by_year"][year] = periods
+        if not annual:
+            missing_annual.append({"company_id": company_id, "year": year})
+
+    market_date = _as_date(calendar[-1]) if calendar else None
+    stale = []
+    if market_date:
+        for entry in companies.values():
+            last = _as_date(entry.get("last_date"))
+            if last and (market_date - last).days > stale_days:
+                stale.append({
+                    "company_id": entry["company_id"],
+                    "ticker": entry["ticker"],
+                    "last_date": entry["last_date"],
+                    "days_behind": (market_date - last).days,
+                })
+
+    outliers.sort(key=lambda o: o["z_score"], reverse=True)
+    total_bars = sum(c.get("bars", 0) for c in companies.values())
+    gaps = [
+        {"company_id": c["company_id"], "ticker": c["ticker"], "missing_days": c["missing_days"]}
+        for c in companies.values() if c.get("missing_days", 0) > gap_days
+    ]
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "thresholds": {"gap_days": gap_days, "stale_days": stale_days, "outlier_z": outlier_z},
+        "summary": {
+            "companies": len(tickers),
+            "companies_with_bars": sum(1 for c in companies.values() if c.get("bars")),
+            "companies_without_bars": sorted(set(tickers) - {
+                c["company_id"] for c in companies.values() if c.get("bars")
+            }),
+            "market_date": market_date.isoformat() if market_date else None,
+            "market_days": len(calendar),
+            "total_bars": total_bars,
+            "series_with_gaps": len(gaps),
+            "inconsistent_bars": sum(c.get("inconsistent_bars", 0) for c in companies.values()),
+            "outliers": len(outliers),
+            "stale_tickers": len(stale),
+        },
+        "coverage": sorted(companies.values(), key=lambda c: c["company_id"]),
+        "gaps": sorted(gaps, key=lambda g: g["missing_days"], reverse=True),
+        "stale_tickers": sorted(stale, key=lambda s: s["days_behind"], reverse=True),
+        "missing_annual_financials": missing_annual,
+        "outliers": outliers[:MAX_OUTLIERS],
+        "null_rates": {
+            "stock": {
+                "rows": total_bars,
+                "null_rates": {
+                    column: round(nulls / total_bars, 4) if total_bars else None
+                    for column, nulls in stock_nulls.items()
+                },
+            },
+            **{name: _null_rates(name, model) for name, model in NULL_RATE_TABLES.items()},
+        },
+    }
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Data quality report built in {report['duration_ms']}ms")
+    return report
+
+
+def get_report(force=False, **thresholds):
+    """Return the report for the current dataset version, cached until data changes"""
+    version = dataset_version()
+    key = "data_quality:{}:{}".format(
+        version, ",".join(f"{k}={v}" for k, v in sorted(thresholds.items()))
+    )
+    report = None if force else cache.get(key)
+    if report is None:
+        report = build_report(**thresholds)
+        report["dataset_version"] = version
+        cache.set(key, report, timeout=24 * 3600)
+    return report
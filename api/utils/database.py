@@ -0,0 +1,149 @@
+import logging
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from api.models.models import db
+from api.models.session import READER_BIND
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Per-connection SQLite settings by environment. WAL lets readers keep
+# serving from the last committed snapshot while an ingest writes, and
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+# Negative cache_size is in KiB.
+SQLITE_PROFILES = {
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "development": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "testing": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "temp_store": "MEMORY",
+        "busy_timeout": 1000,
+    },
+}
+
+# journal_mode is stored in the database file; the rest is per connection
+REPORTED_PRAGMAS = ["journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout"]
+
+
+def _is_file_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def configure_engine(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS for the selected profile.
+
+    Must run before db.init_app(). File databases get a thread-safe
+    connection pool sized for multi-threaded serving; in-memory databases
+    keep Flask-SQLAlchemy's defaults.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if not _is_file_sqlite(uri):
+        return
+    profile = SQLITE_PROFILES.get(app.config["DB_PROFILE"], SQLITE_PROFILES["production"])
+    options = {
+        "pool_size": app.config["DB_POOL_SIZE"],
+        "max_overflow": app.config["DB_MAX_OVERFLOW"],
+        "pool_timeout": app.config["DB_POOL_TIMEOUT"],
+        "connect_args": {
+            # Pooled connections move between request threads
+            "check_same_thread": False,
+            "timeout": profile.get("busy_timeout", 5000) / 1000,
+        },
+    }
+    # Explicit settings in the config win over the profile
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    if app.config["DB_READ_ROUTING"]:
+        # Separate read-only pool for GET requests; in WAL mode its readers
+        # never block the writer and are never blocked by it
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(READER_BIND, {
+            "url": f"sqlite:///file:{make_url(uri).database}?mode=ro&uri=true",
+            "pool_size": app.config["DB_READ_POOL_SIZE"],
+            "max_overflow": app.config["DB_READ_MAX_OVERFLOW"],
+            "pool_timeout": app.config["DB_POOL_TIMEOUT"],
+            "connect_args": options["connect_args"],
+        })
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_sqlite(app):
+    """Apply the profile's pragmas to every new SQLite connection.
+
+    Must run after db.init_app(). The profile is picked by the DB_PROFILE
+    setting (production / development / testing).
+    """
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+    name = app.config["DB_PROFILE"]
+    if name not in SQLITE_PROFILES:
+        logger.warning(f"Unknown DB_PROFILE {name}, using production")
+        name = "production"
+    pragmas = SQLITE_PROFILES[name]
+    in_memory = not _is_file_sqlite(app.config["SQLALCHEMY_DATABASE_URI"])
+
+    def pragma_listener(read_only):
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma, value in pragmas.items():
+                    # WAL and mmap do not apply to in-memory databases, and
+                    # read-only connections cannot change the journal mode
+                    if pragma == "journal_mode" and read_only:
+                        continue
+                    if in_memory and pragma in ("journal_mode", "mmap_size"):
+                        continue
+                    cursor.execute(f"PRAGMA {pragma}={value}")
+            finally:
+                cursor.close()
+        return apply_pragmas
+
+    with app.app_context():
+        for key, engine in db.engines.items():
+            event.listen(engine, "connect", pragma_listener(key == READER_BIND))
+    app.extensions["db_profile"] = name
+
+
+def _engine_settings(engine):
+    settings = {}
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for pragma in REPORTED_PRAGMAS:
+                settings[pragma] = conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+    pool = engine.pool
+    settings["pool"] = {
+        "class": type(pool).__name__,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "size": pool.size() if hasattr(pool, "size") else None,
+    }
+    return settings
+
+
+def effective_settings():
+    """Settings SQLite actually applied on pooled connections, plus pool state"""
+    settings = {"profile": current_app.extensions.get("db_profile")}
+    settings.update(_engine_settings(db.engine))
+    reader = db.engines.get(READER_BIND)
+    if reader is not None:
+        settings["reader"] = _engine_settings(reader)
+    return settings
@@ -0,0 +1,298 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from api.utils.ingestion import file_sha256
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# A build whose state file has not moved on for this long died with its process
+BUILD_TIMEOUT = 3600
+# Seconds between looks at the state of a build running in another process
+FOLLOW_INTERVAL = 0.2
+
+
+class ExportJob:
+    """One export artifact being built, or built, in the export folder"""
+
+    def __init__(self, job_id, spec, path, filename):
+        self.id = job_id
+        self.spec = spec
+        self.path = path
+        self.filename = filename
+        self.status = "queued"  # queued/running/finished/failed
+        self.error = None
+        self.size = None
+        self.rows = None
+        self.sha256 = None
+        self.future = None  # resolves once the build finishes or fails
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    @property
+    def state_path(self):
+        return f"{os.path.splitext(self.path)[0]}.json"
+
+    def to_state(self):
+        """Everything another process needs to serve or follow the job"""
+        return {**self.to_dict(), "spec": self.spec, "file": os.path.basename(self.path)}
+
+    @classmethod
+    def from_state(cls, state, folder):
+        job = cls(state["id"], state["spec"], os.path.join(folder, state["file"]), state["filename"])
+        for key in ("status", "error", "size", "rows", "sha256"):
+            setattr(job, key, state[key])
+        job.created_at = datetime.fromisoformat(state["created_at"])
+        if state["finished_at"]:
+            job.finished_at = datetime.fromisoformat(state["finished_at"])
+        return job
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "dataset": self.spec["dataset"],
+            "format": self.spec["format"],
+            "filters": self.spec["filters"],
+            "filename": self.filename,
+            "size": self.size,
+            "rows": self.rows,
+            "sha256": self.sha256,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class ExportJobs:
+    """Background builder for download files, with identical jobs deduplicated.
+
+    A job is identified by its spec (dataset, format, filters) and the data
+    version it was submitted at. Submitting a spec that is queued, running or
+    finished at the current version returns the existing job, so every
+    client asking for the same export shares one build and one file. Once
+    the data changes the version moves on, the next submit builds a fresh
+    file, and the superseded one is deleted when its replacement is ready.
+
+    The version is the database-backed cache generation of the dataset, so
+    loads committed by the ingest service or another worker move it too.
+    Each job's state is kept in ``<id>.json`` next to its artifact in the
+    export folder, so every worker (and a restarted app) can report on and
+    serve a job whichever one took the request. The worker that creates the
+    state file builds the export; a worker asked for the same job meanwhile
+    follows the state file. Files are built next to their final path and
+    renamed into place, and files older than ``ttl`` seconds are swept on
+    submit.
+    """
+
+    def __init__(self, app, folder, workers=2, ttl=86400):
+        self.app = app
+        self.folder = folder
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._jobs = {}
+        self._current = {}  # spec digest -> (version, job id) of the newest finished build
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _digest(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def submit(self, spec, version, filename, build):
+        """Queue ``build(path)`` for a spec unless the same export already exists.
+
+        ``version`` is the data generation the export reads. ``build`` runs in
+        an application context on a worker thread, writes the file to the
+        path it is given and returns the number of rows written. Returns the
+        job; ``job.future`` can be waited on.
+        """
+        spec_digest = self._digest(spec)
+        job_id = self._digest(spec, version)[:32]
+        extension = os.path.splitext(filename)[1]
+        with self._lock:
+            self._sweep()
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != "failed":
+                return job
+
+            job = self._load(job_id)
+            if job is not None and self._reusable(job):
+                return self._track(job)
+            if job is not None:
+                # Failed, abandoned or its file swept: build it again
+                self._remove(job.state_path)
+
+            job = ExportJob(job_id, spec, os.path.join(self.folder, f"{job_id}{extension}"), filename)
+            if not self._claim(job):
+                # Another worker claimed the build first
+                return self._track(self._load(job_id) or job)
+            self._jobs[job_id] = job
+            job.future = self._pool.submit(self._run, job, spec_digest, version, build)
+        return job
+
+    def get(self, job_id):
+        """The job with this id, whichever worker took it, or None"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == "finished":
+            return job
+        return self._load(job_id) or job
+
+    def _load(self, job_id):
+        try:
+            with open(os.path.join(self.folder, f"{job_id}.json")) as f:
+                return ExportJob.from_state(json.load(f), self.folder)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, job):
+        """Replace the job's state file atomically"""
+        tmp_path = f"{job.state_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job.to_state(), f)
+        os.replace(tmp_path, job.state_path)
+
+    def _claim(self, job):
+        """Create the job's state file, unless another worker already has"""
+        try:
+            fd = os.open(job.state_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            json.dump(job.to_state(), f)
+        return True
+
+    def _abandoned(self, job):
+        try:
+            return time.time() - os.path.getmtime(job.state_path) > BUILD_TIMEOUT
+        except OSError:
+            return True
+
+    def _reusable(self, job):
+        if job.status == "finished":
+            return os.path.exists(job.path)
+        return job.status in ("queued", "running") and not self._abandoned(job)
+
+    def _track(self, job):
+        """Serve a job another worker built, or follow the build it is running"""
+        self._jobs[job.id] = job
+        if job.status == "finished":
+            job.future = Future()
+            job.future.set_result(None)
+        else:
+            job.future = self._pool.submit(self._follow, job)
+        return job
+
+    def _follow(self, job):
+        while job.status in ("queued", "running"):
+            time.sleep(FOLLOW_INTERVAL)
+            state = self._load(job.id)
+            if state is None or (state.status in ("queued", "running") and self._abandoned(state)):
+                job.status = "failed"
+                job.error = "Export build was abandoned"
+                job.finished_at = datetime.utcnow()
+                return
+            for key in ("status", "error", "size", "rows", "sha256", "finished_at"):
+                setattr(job, key, getattr(state, key))
+
+    def bundle_id(self, members):
+        """Id of a zip of ``(name, job id)`` members.
+
+        Job ids carry the data version each member reads, so a bundle of the
+        same exports gets a new id as soon as any of their data changes; the
+        stale zip is left for the sweep.
+        """
+        return self._digest(members)[:32]
+
+    def bundle_path(self, bundle_id):
+        return os.path.join(self.folder, f"{bundle_id}.zip")
+
+    def _run(self, job, spec_digest, version, build):
+        job.status = "running"
+        self._save(job)
+        # Keep the extension; writers pick the file type from it
+        root, extension = os.path.splitext(job.path)
+        tmp_path = f"{root}.{uuid.uuid4().hex[:8]}.tmp{extension}"
+        start = time.perf_counter()
+        try:
+            with self.app.app_context():
+                job.rows = build(tmp_path)
+            job.sha256 = file_sha256(tmp_path)
+            os.replace(tmp_path, job.path)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self._save(job)
+            logger.warning(f"Export job {job.id} ({job.spec['dataset']}) failed: {str(e)}")
+            return
+
+        job.size = os.path.getsize(job.path)
+        job.finished_at = datetime.utcnow()
+        job.status = "finished"
+        self._save(job)
+        logger.info(
+            f"Export job {job.id} ({job.spec['dataset']}) built {job.size} bytes "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        with self._lock:
+            previous = self._current.get(spec_digest)
+            if previous is None or previous[0] <= version:
+                self._current[spec_digest] = (version, job.id)
+                if previous is not None and previous[1] != job.id:
+                    self._drop(previous[1])
+
+    def _drop(self, job_id):
+        job = self._jobs.pop(job_id, None) or self._load(job_id)
+        if job is not None:
+            # Downloads already reading the file keep their open handle
+            self._remove(job.path)
+            self._remove(job.state_path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _sweep(self):
+        """Forget expired jobs and delete files nothing refers to any more"""
+        expired = datetime.utcnow() - timedelta(seconds=self.ttl)
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < expired:
+                self._drop(job_id)
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.split(".")[0] not in self._jobs and os.path.getmtime(path) < cutoff:
+                self._remove(path)
+
+
+def init_export_jobs(app):
+    """Attach the background export builder"""
+    jobs = ExportJobs(
+        app,
+        app.config["EXPORT_FOLDER"],
+        workers=app.config["EXPORT_WORKERS"],
+        ttl=app.config["EXPORT_TTL_SECONDS"],
+    )
+    app.extensions["export_jobs"] = jobs
+    return jobs
+
+
+def export_jobs():
+    return current_app.extensions["export_jobs"]
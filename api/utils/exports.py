@@ -0,0 +1,411 @@
+import contextlib
+import csv
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import zipfile
+from datetime import date, datetime
+
+from flask import Response, send_file, stream_with_context
+
+from api.models.models import db
+from api.utils.errors import APIError
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric
+
+# pyarrow is optional; without it Parquet and Arrow downloads are unavailable
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# xlsxwriter is optional; without it Excel downloads are unavailable
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor and encoded per chunk of a streamed export
+EXPORT_CHUNK_ROWS = 5000
+
+# Rows per Parquet row group / Arrow record batch. Readers decode only the
+# columns they select, a group at a time, so groups stay small enough to
+# skip through but large enough to compress well
+COLUMNAR_BATCH_ROWS = 100_000
+
+MIMETYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "ndjson": "application/x-ndjson",
+}
+
+ZIP_MIMETYPE = "application/zip"
+
+# Column widths are estimated from the header and this many leading rows
+EXCEL_WIDTH_SAMPLE_ROWS = 1000
+EXCEL_MAX_COLUMN_WIDTH = 60
+EXCEL_MAX_ROWS = 1_048_576
+
+# Arrow type aliases for SQLAlchemy column types, most specific first
+ARROW_TYPES = [
+    (Boolean, "bool"),
+    (Integer, "int64"),
+    (Float, "float64"),
+    (Numeric, "float64"),
+    (DateTime, "timestamp[us]"),
+    (Date, "date32"),
+]
+
+
+def iter_chunks(statement, chunk_size=EXPORT_CHUNK_ROWS):
+    """Execute ``statement`` and yield its rows in lists of ``chunk_size``.
+
+    The rows come off one open cursor as they are needed, so memory holds a
+    single chunk however large the result is.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    yield from result.partitions()
+
+
+def encode_csv(header, chunks):
+    """Yield the CSV encoding of a header row followed by chunks of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(serialize, chunks):
+    """Yield newline-delimited JSON, one object per row, a chunk at a time.
+
+    ``serialize`` turns a chunk of rows into dicts, e.g. RowSerializer.serialize.
+    """
+    for rows in chunks:
+        yield "".join(
+            json.dumps(record, default=str) + "\n" for record in serialize(rows)
+        ).encode("utf-8")
+
+
+class _StreamSink:
+    """Write-only file that hands its bytes back as they are written.
+
+    Parquet writers only append and never seek, so the file can be sent
+    while it is built: ``tell`` keeps counting the full file for the
+    offsets in the footer while ``drain`` empties the buffer.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def arrow_schema(labels, columns):
+    """``(label, type alias)`` pairs for selected columns, for encode_columnar().
+
+    Columns read through iso_text() keep the type of the column they wrap,
+    so stored ISO text is cast back to dates and timestamps.
+    """
+    schema = []
+    for label, column in zip(labels, columns):
+        column_type = getattr(column, "clause", column).type
+        alias = next(
+            (alias for sql_type, alias in ARROW_TYPES if isinstance(column_type, sql_type)), "string"
+        )
+        schema.append((label, alias))
+    return schema
+
+
+def _columnar_writer(file_format, sink, schema):
+    if file_format == "parquet":
+        return pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+    options = pyarrow.ipc.IpcWriteOptions(compression="zstd")
+    return pyarrow.ipc.new_file(sink, schema, options=options)
+
+
+def encode_columnar(file_format, schema, chunks, batch_rows=COLUMNAR_BATCH_ROWS):
+    """Yield a zstd-compressed Parquet or Arrow IPC file built from chunks of row tuples.
+
+    ``schema`` is a list of ``(name, type alias)`` pairs in row order, with
+    Arrow aliases such as ``"string"``, ``"date32"`` or ``"float64"``.
+    Values are converted to those types with Arrow casts, so ISO date text
+    becomes ``date32``. Rows are written ``batch_rows`` at a time as one
+    Parquet row group or Arrow record batch, and each is sent as soon as it
+    is written.
+    """
+    if pyarrow is None:
+        raise APIError(f"{file_format} output requires pyarrow", status_code=400)
+
+    arrow_schema = pyarrow.schema(
+        [(name, pyarrow.type_for_alias(type_name)) for name, type_name in schema]
+    )
+    sink = _StreamSink()
+    writer = _columnar_writer(file_format, pyarrow.PythonFile(sink, mode="w"), arrow_schema)
+
+    def table(rows):
+        columns = zip(*rows)
+        return pyarrow.table(
+            [pyarrow.array(values).cast(field.type) for values, field in zip(columns, arrow_schema)],
+            schema=arrow_schema,
+        )
+
+    pending = []
+    for rows in chunks:
+        pending.extend(rows)
+        if len(pending) >= batch_rows:
+            writer.write_table(table(pending))
+            pending = []
+            yield sink.drain()
+    if pending:
+        writer.write_table(table(pending))
+    writer.close()
+    yield sink.drain()
+
+
+def encode_zip(members, block_size=1 << 20):
+    """Yield a zip archive of ``(name, source, compress)`` members as it is written.
+
+    ``source`` is bytes or a binary file open for reading. ``members`` is read lazily, so a
+    generator can wait for each file to be ready before handing it over and
+    the archive goes out member by member. The stream is never seeked: sizes
+    and checksums follow each member in a data descriptor, with zip64 fields
+    so members may exceed 4GB. Files that are already compressed (Parquet,
+    Arrow, xlsx) should be stored rather than deflated again.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        for name, source, compress in members:
+            info = zipfile.ZipInfo(name, datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with archive.open(info, "w", force_zip64=True) as member:
+                if isinstance(source, bytes):
+                    member.write(source)
+                else:
+                    for block in iter(lambda: source.read(block_size), b""):
+                        member.write(block)
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _excel_sheet_name(name, used):
+    """Excel sheet names are at most 31 characters, unique, without []:*?/\\"""
+    base = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet"
+    candidate, suffix = base, 1
+    while candidate.lower() in used:
+        suffix += 1
+        candidate = f"{base[:31 - len(str(suffix)) - 1]}_{suffix}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def write_xlsx(target, sheets, empty_message="No data found"):
+    """Write sheets of rows into an .xlsx workbook in xlsxwriter's constant-memory mode.
+
+    ``sheets`` is an iterable of ``(name, schema, chunks)`` with ``schema``
+    as for encode_columnar(). Each row is flushed to a temporary file as
+    soon as the next one starts, so memory holds one chunk whatever the
+    size of the export. Widths come from the header and a sample of the
+    first rows, since columns have to be set up before the first row in
+    this mode. Date and timestamp text is written as real Excel dates.
+    Sheets without rows are left out; if every sheet is empty this raises
+    a 404.
+    """
+    if xlsxwriter is None:
+        raise APIError("Excel output requires xlsxwriter", status_code=400)
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    complete = False
+    try:
+        if not _write_sheets(workbook, sheets):
+            raise APIError(empty_message, status_code=404)
+        complete = True
+    finally:
+        # Always closed, so xlsxwriter's per-sheet temporary files go away
+        try:
+            workbook.close()
+        except Exception:
+            if complete:
+                raise
+        if not complete and isinstance(target, (str, os.PathLike)):
+            # No half-written workbook is left behind
+            with contextlib.suppress(OSError):
+                os.remove(target)
+    return target
+
+
+def _write_sheets(workbook, sheets):
+    """Add a worksheet per non-empty sheet; returns the sheet names used"""
+    header_format = workbook.add_format({"bold": True})
+    type_formats = {
+        "date32": workbook.add_format({"num_format": "yyyy-mm-dd"}),
+        "timestamp[us]": workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"}),
+    }
+    sheet_names = set()
+    for name, schema, chunks in sheets:
+        first = next(chunks, None)
+        if not first:
+            chunks.close()
+            continue
+        worksheet = workbook.add_worksheet(_excel_sheet_name(name, sheet_names))
+
+        writers = []
+        for column, (label, type_name) in enumerate(schema):
+            sample = [
+                len(str(row[column])) for row in first[:EXCEL_WIDTH_SAMPLE_ROWS] if row[column] is not None
+            ]
+            width = min(max([len(label), *sample]) + 2, EXCEL_MAX_COLUMN_WIDTH)
+            worksheet.set_column(column, column, width, type_formats.get(type_name))
+            if type_name == "date32":
+                writers.append(lambda r, c, v: worksheet.write_datetime(r, c, date.fromisoformat(v)))
+            elif type_name == "timestamp[us]":
+                writers.append(lambda r, c, v: worksheet.write_datetime(r, c, datetime.fromisoformat(v)))
+            elif type_name in ("int64", "float64"):
+                writers.append(worksheet.write_number)
+            elif type_name == "bool":
+                writers.append(worksheet.write_boolean)
+            else:
+                writers.append(worksheet.write_string)
+        worksheet.write_row(0, 0, [label for label, _ in schema], header_format)
+        worksheet.freeze_panes(1, 0)
+
+        row_number = 0
+        for rows in _prepend(first, chunks):
+            if row_number + len(rows) >= EXCEL_MAX_ROWS:
+                chunks.close()
+                raise APIError(
+                    "Too many rows for an Excel sheet; use csv or parquet", status_code=400
+                )
+            for row in rows:
+                row_number += 1
+                for column, (write, value) in enumerate(zip(writers, row)):
+                    if value is not None:
+                        write(row_number, column, value)
+    return sheet_names
+
+
+def xlsx_response(sheets, filename, empty_message="No data found"):
+    """Excel attachment built by write_xlsx() in an anonymous temporary file.
+
+    The workbook is compressed only once every row is written, so unlike
+    the other formats it is built before the response starts; the file is
+    then sent from disk and removed when the response closes.
+    """
+    workbook_file = tempfile.TemporaryFile(suffix=".xlsx")
+    try:
+        write_xlsx(workbook_file, sheets, empty_message)
+    except Exception:
+        workbook_file.close()
+        raise
+    workbook_file.seek(0)
+    return send_file(
+        workbook_file, as_attachment=True, download_name=filename, mimetype=MIMETYPES["excel"]
+    )
+
+
+def _stream(encoded, chunks, filename, mimetype, empty_message):
+    first = next(chunks, None)
+    if not first:
+        chunks.close()
+        raise APIError(empty_message, status_code=404)
+
+    def generate():
+        try:
+            yield from encoded(_prepend(first, chunks))
+        finally:
+            chunks.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def csv_response(header, chunks, filename, empty_message="No data found"):
+    """Stream chunks of rows as a CSV attachment.
+
+    The first chunk is read before responding so an empty export is still a
+    404; the rest is encoded while the client downloads. The request context
+    (and with it the session and its cursor) stays open until the stream
+    ends.
+    """
+    return _stream(
+        lambda rows: encode_csv(header, rows), chunks, filename, MIMETYPES["csv"], empty_message
+    )
+
+
+def columnar_response(file_format, schema, chunks, filename, empty_message="No data found"):
+    """Stream chunks of rows as a Parquet or Arrow attachment, like csv_response"""
+    if pyarrow is None:
+        raise APIError(f"{file_format} output requires pyarrow", status_code=400)
+    return _stream(
+        lambda rows: encode_columnar(file_format, schema, rows),
+        chunks,
+        filename,
+        MIMETYPES[file_format],
+        empty_message,
+    )
+
+
+def ndjson_response(serialize, chunks, filename, empty_message="No data found"):
+    """Stream chunks of rows as an NDJSON attachment, like csv_response"""
+    return _stream(
+        lambda rows: encode_ndjson(serialize, rows), chunks, filename, MIMETYPES["ndjson"], empty_message
+    )
+
+
+def write_export(path, encoded, chunks, empty_message="No data found"):
+    """Write an encoded export, e.g. ``lambda rows: encode_csv(header, rows)``, to a file"""
+    first = next(chunks, None)
+    if not first:
+        chunks.close()
+        raise APIError(empty_message, status_code=404)
+    with open(path, "wb") as f:
+        for data in encoded(_prepend(first, chunks)):
+            f.write(data)
+
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
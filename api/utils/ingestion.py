@@ -0,0 +1,405 @@
+import csv
+import hashlib
+import logging
+import os
+from datetime import date, datetime
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api.models.models import (
+    db, Company, CompanyNews, Financial, IngestedFile, MacroIndicators, Stock
+)
+from api.utils.anomalies import screen_bars
+from api.utils.refresh import IngestionEvent, publish_ingestion
+from api.utils.validators import validate_financial_frame, validate_macro_frame
+from api.utils.writer import write
+
+# openpyxl is optional; without it only CSV files can be ingested
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rows per read/upsert batch; keeps memory flat for large end-of-day files
+CHUNK_SIZE = 50_000
+
+# Column signatures used to recognise a file's dataset from its header.
+# Checked in order, so the most specific signatures come first.
+DATASET_SIGNATURES = [
+    ("news", {"title", "content", "published_date"}),
+    ("financials", {"year", "period", "total_assets", "total_liabilities", "total_equity"}),
+    ("stocks", {"date", "open", "high", "low", "close", "volume"}),
+    ("macro", {"date", "gdp_growth", "inflation_rate", "interest_rate", "etb_usd"}),
+    ("companies", {"ticker", "name", "industry"}),
+]
+
+
+# Spreadsheet files read with openpyxl; anything else is read as CSV
+EXCEL_EXTENSIONS = (".xlsx",)
+
+
+class IngestionError(Exception):
+    """Raised when a file cannot be routed or loaded.
+
+    ``result`` is the ingestion result up to the failure, when chunks of
+    the file were already committed.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hex SHA-256 of a file, read a block at a time.
+
+    The content hash that recognises files already loaded; export jobs use
+    it for the checksum of their artifacts.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_excel(path):
+    return os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS
+
+
+def _excel_rows(path):
+    """Rows of the first worksheet as value tuples, streamed from the file"""
+    if openpyxl is None:
+        raise IngestionError("Excel files require openpyxl")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_header(path):
+    """Return the normalised column names of a CSV or Excel file"""
+    if _is_excel(path):
+        rows = _excel_rows(path)
+        header = next(rows, None) or []
+        rows.close()
+        return [str(column or "").strip().lower() for column in header]
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    return [column.strip().lower() for column in header]
+
+
+def sniff_dataset(path):
+    """Identify which dataset a file holds from its columns, or None"""
+    columns = set(read_header(path))
+    for dataset, signature in DATASET_SIGNATURES:
+        if signature <= columns:
+            return dataset
+    return None
+
+
+def _read_excel_chunks(path):
+    """Read the first worksheet in frames of CHUNK_SIZE rows.
+
+    openpyxl's read-only mode parses the sheet XML as it goes, so only one
+    chunk of rows is held at a time. The index counts data rows across
+    chunks, as with chunked CSV reads; blank rows keep their number.
+    """
+    rows = _excel_rows(path)
+    header = [str(column or "").strip().lower() for column in next(rows, None) or []]
+    chunk, start = [], 0
+    for row in rows:
+        chunk.append(row[:len(header)])
+        if len(chunk) >= CHUNK_SIZE:
+            yield _excel_frame(chunk, header, start)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield _excel_frame(chunk, header, start)
+
+
+def _excel_frame(rows, header, start):
+    df = pd.DataFrame(rows, columns=header, index=pd.RangeIndex(start, start + len(rows)))
+    return df.dropna(how="all")
+
+
+def _read_chunks(path):
+    """Read a CSV or Excel file in chunks with normalised column names"""
+    if _is_excel(path):
+        yield from _read_excel_chunks(path)
+        return
+    for chunk in pd.read_csv(path, encoding="utf-8-sig", chunksize=CHUNK_SIZE):
+        chunk.columns = [column.strip().lower() for column in chunk.columns]
+        yield chunk
+
+
+def _reject(result, df, errors):
+    """Count rows with an error message and drop them from the frame.
+
+    ``errors`` is a Series aligned with ``df`` holding a message or None.
+    When the caller asked for a report (``result["rejections"]``), each
+    rejected row is added to it as ``(row number, message)``, numbered as
+    in a spreadsheet: the header is row 1 and the first data row is row 2.
+    """
+    invalid = errors.notna()
+    if not invalid.any():
+        return df
+    result["rows_rejected"] += int(invalid.sum())
+    if result.get("rejections") is not None:
+        result["rejections"].extend(
+            (int(index) + 2, message) for index, message in errors[invalid].items()
+        )
+    return df[~invalid]
+
+
+def _records(df, table):
+    """Convert a frame to insert parameters limited to the table's columns"""
+    columns = [c for c in df.columns if c in table.c and c != "id"]
+    df = df[columns].astype(object).where(df[columns].notna(), None)
+    return columns, df.to_dict("records")
+
+
+def _upsert(table, records, columns, conflict_columns):
+    """INSERT ... ON CONFLICT DO UPDATE for one batch of records"""
+    if not records:
+        return
+    stmt = sqlite_insert(table)
+    update_columns = {
+        c: stmt.excluded[c] for c in columns if c not in conflict_columns
+    }
+    if "updated_at" in table.c:
+        update_columns["updated_at"] = datetime.utcnow()
+    stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=update_columns)
+    db.session.execute(stmt, records)
+
+
+def _resolve_company_ids(df, result):
+    """Map a ticker column onto company_id and drop rows for unknown companies"""
+    if "company_id" not in df.columns:
+        if "ticker" not in df.columns:
+            raise IngestionError("File has neither company_id nor ticker column")
+        tickers = dict(db.session.execute(select(Company.ticker, Company.id)).all())
+        df = df.assign(company_id=df["ticker"].str.strip().str.upper().map(tickers))
+
+    unknown = df["company_id"].isna()
+    if unknown.any():
+        logger.warning(f"Skipping {int(unknown.sum())} rows for unknown companies")
+        df = _reject(result, df, unknown.map({True: "Unknown company", False: None}))
+    return df.assign(company_id=df["company_id"].astype(int))
+
+
+def _track_range(result, dates, company_ids=None):
+    """Accumulate the slice of data (dates and companies) touched by a load"""
+    if company_ids is not None:
+        result["company_ids"].update(int(c) for c in company_ids.unique())
+    if len(dates):
+        low, high = dates.min(), dates.max()
+        result["date_from"] = min(d for d in (result["date_from"], low) if d is not None)
+        result["date_to"] = max(d for d in (result["date_to"], high) if d is not None)
+
+
+def load_companies(df, result):
+    """Upsert a chunk of company reference data keyed on ticker, keeping ids given in the file"""
+    missing = df[["name", "ticker", "industry"]].isna().any(axis=1)
+    if missing.any():
+        logger.warning(f"Skipping {int(missing.sum())} companies without name, ticker or industry")
+        df = _reject(
+            result, df, missing.map({True: "Missing name, ticker or industry", False: None})
+        )
+    df = df.assign(ticker=df["ticker"].str.strip().str.upper())
+    if "established_date" in df.columns:
+        df = df.assign(
+            established_date=pd.to_datetime(df["established_date"], errors="coerce").dt.date
+        )
+
+    columns, records = _records(df, Company.__table__)
+    # Price and financial files refer to companies by these ids
+    if "id" in df.columns and df["id"].notna().all():
+        for record, company_id in zip(records, df["id"]):
+            record["id"] = int(company_id)
+    _upsert(Company.__table__, records, columns, ["ticker"])
+    result["rows_loaded"] += len(records)
+
+
+def load_stocks(df, result):
+    """Screen a chunk of daily price bars and upsert the accepted ones keyed on (company_id, date)"""
+    df = _resolve_company_ids(df, result)
+    df = df.assign(date=pd.to_datetime(df["date"]).dt.date)
+    df, quarantined = screen_bars(df, source=result["file"])
+    result["rows_quarantined"] += quarantined
+    columns, records = _records(df, Stock.__table__)
+    _upsert(Stock.__table__, records, columns, ["company_id", "date"])
+    result["rows_loaded"] += len(records)
+    _track_range(result, df["date"], df["company_id"])
+
+
+def load_financials(df, result):
+    """Validate and upsert a chunk of financial statements keyed on (company_id, year, period)"""
+    df = _resolve_company_ids(df, result)
+    errors = validate_financial_frame(df)
+    invalid = errors.notna()
+    for index, message in errors[invalid].items():
+        logger.error(
+            f"{message} for company {df.at[index, 'company_id']}, year {df.at[index, 'year']}"
+        )
+    df = _reject(result, df, errors)
+
+    columns, records = _records(df, Financial.__table__)
+    _upsert(Financial.__table__, records, columns, ["company_id", "year", "period"])
+    result["rows_loaded"] += len(records)
+    _track_range(
+        result,
+        df["year"].map(lambda year: date(int(year), 1, 1)),
+        df["company_id"],
+    )
+
+
+def load_macro(df, result):
+    """Validate and upsert a chunk of macro indicators keyed on date"""
+    errors = validate_macro_frame(df)
+    invalid = errors.notna()
+    for index, message in errors[invalid].items():
+        logger.error(f"{message} for date {df.at[index, 'date']}")
+    df = _reject(result, df, errors)
+    df = df.assign(date=pd.to_datetime(df["date"]).dt.date)
+
+    columns, records = _records(df, MacroIndicators.__table__)
+    _upsert(MacroIndicators.__table__, records, columns, ["date"])
+    result["rows_loaded"] += len(records)
+    _track_range(result, df["date"])
+
+
+def load_news(df, result):
+    """Insert a chunk of company news items not already stored.
+
+    News has no natural key to upsert on, so items matching a stored
+    (company, published date, title) are skipped; retrying a file whose
+    earlier chunks committed does not duplicate them.
+    """
+    df = _resolve_company_ids(df, result)
+    df = df.assign(published_date=pd.to_datetime(df["published_date"]))
+    if len(df):
+        stored = set(db.session.execute(
+            select(CompanyNews.company_id, CompanyNews.published_date, CompanyNews.title).where(
+                CompanyNews.company_id.in_([int(c) for c in df["company_id"].unique()]),
+                CompanyNews.published_date >= df["published_date"].min().to_pydatetime(),
+                CompanyNews.published_date <= df["published_date"].max().to_pydatetime(),
+            )
+        ).all())
+        if stored:
+            keys = zip(df["company_id"], df["published_date"].dt.to_pydatetime(), df["title"])
+            df = df[[key not in stored for key in keys]]
+    columns, records = _records(df, CompanyNews.__table__)
+    if records:
+        db.session.execute(CompanyNews.__table__.insert(), records)
+    result["rows_loaded"] += len(records)
+    _track_range(result, df["published_date"].dt.date, df["company_id"])
+
+
+# Dataset -> loader of one chunk (a frame of at most CHUNK_SIZE rows)
+LOADERS = {
+    "companies": load_companies,
+    "stocks": load_stocks,
+    "financials": load_financials,
+    "macro": load_macro,
+    "news": load_news,
+}
+
+
+def _record_file(ledger_id, sha256, result, status, error):
+    """Write job: create or update the file's ``ingested_file`` ledger entry"""
+    ledger = db.session.get(IngestedFile, ledger_id) if ledger_id is not None else None
+    if ledger is None:
+        ledger = IngestedFile(sha256=sha256)
+        db.session.add(ledger)
+    ledger.filename = result["file"]
+    ledger.dataset = result["dataset"]
+    ledger.status = status
+    ledger.rows_loaded = result["rows_loaded"]
+    ledger.rows_rejected = result["rows_rejected"]
+    ledger.error = error
+    ledger.ingested_at = datetime.utcnow()
+
+
+def ingest_file(path, rejections=None):
+    """Load one CSV or Excel file into the database unless its content was loaded before.
+
+    The file is routed to a loader by sniffing its header and loaded a chunk
+    of CHUNK_SIZE rows at a time, each chunk a job on the single-writer
+    queue, so API writes queue between chunks instead of waiting for the
+    whole file or racing it for the lock. The file is then recorded in the
+    ``ingested_file`` ledger by content hash and an ingestion-completed
+    event is published to the refreshers. Only a ``loaded`` ledger entry
+    makes a file a duplicate; a file rejected before (a bad row fixed since,
+    or a locked database) is tried again and its entry updated. Chunks
+    committed before a failure stay loaded, and since every loader upserts
+    (or skips stored news) the retry is safe.
+    Must be called inside an application context. Returns a result dict with
+    the dataset, row counts (loaded / rejected / quarantined) and the company
+    ids / date range touched, or None when the file is a duplicate.
+    ``rejections``, a list or anything with ``extend``, receives a
+    ``(row number, message)`` pair for every rejected row.
+    """
+    sha256 = file_sha256(path)
+    filename = os.path.basename(path)
+
+    previous = db.session.execute(
+        select(IngestedFile.id, IngestedFile.status).filter_by(sha256=sha256)
+    ).first()
+    if previous is not None and previous.status == "loaded":
+        logger.info(f"Skipping {filename}: content already ingested")
+        return None
+
+    result = {
+        "file": filename,
+        "sha256": sha256,
+        "dataset": sniff_dataset(path),
+        "rows_loaded": 0,
+        "rows_rejected": 0,
+        "rows_quarantined": 0,
+        "rejections": rejections,
+        "company_ids": set(),
+        "date_from": None,
+        "date_to": None,
+    }
+
+    try:
+        if result["dataset"] is None:
+            raise IngestionError(f"Could not recognise dataset from columns of {filename}")
+        load_chunk = LOADERS[result["dataset"]]
+        for df in _read_chunks(path):
+            loaded = result["rows_loaded"]
+            try:
+                write(load_chunk, df, result)
+            except Exception:
+                result["rows_loaded"] = loaded
+                raise
+        status, error = "loaded", None
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error ingesting {filename}: {str(e)}")
+        status, error = "rejected", str(e)
+
+    write(_record_file, previous.id if previous is not None else None, sha256, result, status, error)
+
+    if error:
+        if result["rows_loaded"]:
+            # Chunks before the failure are committed; caches must see them
+            publish_ingestion(IngestionEvent.from_result(result))
+        raise IngestionError(error, result)
+
+    logger.info(
+        f"Ingested {filename} as {result['dataset']}: "
+        f"{result['rows_loaded']} loaded, {result['rows_rejected']} rejected, "
+        f"{result['rows_quarantined']} quarantined"
+    )
+
+    # Let caches and derived data catch up with the slice that changed
+    publish_ingestion(IngestionEvent.from_result(result))
+    return result
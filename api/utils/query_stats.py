@@ -0,0 +1,122 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+
+from api.models.models import db
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Collectors active in the current request / thread
+_collectors = ContextVar("query_stats_collectors", default=())
+
+
+class QueryStats:
+    """Query count, database time and statement shapes seen by one collector"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def most_repeated(self):
+        """(statement, times) of the most repeated statement shape"""
+        return self.shapes.most_common(1)[0] if self.shapes else (None, 0)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the queries issued inside the block into a QueryStats"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail when the block issues more than ``limit`` queries.
+
+    Meant for regression checks of endpoint query counts::
+
+        with assert_max_queries(3):
+            client.get("/api/v1/market/summary")
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statement, times = stats.most_repeated()
+        raise AssertionError(
+            f"{stats.count} queries issued, expected at most {limit}; "
+            f"most repeated ({times}x): {statement}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    # Statements are parameterised, so the SQL text is the statement shape
+    for stats in _collectors.get():
+        stats.record(statement, duration)
+
+
+def init_query_stats(app):
+    """Count queries per request; expose them as headers and warn on N+1 patterns.
+
+    With QUERY_STATS_HEADERS enabled (the default in debug) every response
+    carries a Server-Timing entry plus X-Query-Count / X-DB-Time headers.
+    A request that repeats one statement shape more than
+    QUERY_REPEAT_WARNING times is logged as a likely N+1 loop.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        _collectors.set(_collectors.get() + (g.query_stats,))
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+
+        statement, times = stats.most_repeated()
+        if times > app.config["QUERY_REPEAT_WARNING"]:
+            logger.warning(
+                f"{request.method} {request.path} issued {times} similar statements "
+                f"({stats.count} queries total): {' '.join(statement.split())[:200]}"
+            )
+
+        if app.config["QUERY_STATS_HEADERS"]:
+            db_ms = round(stats.duration * 1000, 2)
+            response.headers.add(
+                "Server-Timing", f'db;dur={db_ms};desc="{stats.count} queries"'
+            )
+            response.headers["X-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time"] = f"{db_ms}ms"
+            response.headers["X-Query-Max-Repeat"] = str(times)
+        return response
+
+    @app.teardown_request
+    def stop_query_stats(exc):
+        stats = g.pop("query_stats", None)
+        _collectors.set(tuple(c for c in _collectors.get() if c is not stats))
@@ -0,0 +1,86 @@
+import logging
+
+from api.utils.cache import bump_generation
+from api.utils.writer import write
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# (datasets, function) pairs; an empty dataset set matches every event
+_refreshers = []
+
+
+class IngestionEvent:
+    """Ingestion-completed event describing the slice of data that changed"""
+
+    def __init__(self, dataset, company_ids=(), date_from=None, date_to=None):
+        self.dataset = dataset
+        self.company_ids = sorted(set(company_ids))
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @classmethod
+    def from_result(cls, result):
+        """Build an event from an ingestion result dict"""
+        return cls(
+            result["dataset"],
+            result.get("company_ids", ()),
+            result.get("date_from"),
+            result.get("date_to"),
+        )
+
+    def __repr__(self):
+        return (
+            f"<IngestionEvent {self.dataset} companies={len(self.company_ids)} "
+            f"{self.date_from}..{self.date_to}>"
+        )
+
+
+def refresher(*datasets):
+    """Register a function to run after ingestion of the given datasets.
+
+    With no datasets the function runs after every ingestion. Refreshers
+    receive the IngestionEvent and should only touch the affected slice.
+    """
+    def decorator(func):
+        _refreshers.append((set(datasets), func))
+        return func
+    return decorator
+
+
+def publish_ingestion(event):
+    """Run every refresher registered for the event's dataset.
+
+    Must be called inside an application context, after the load committed.
+    A failing refresher is logged and does not stop the others.
+    """
+    logger.info(f"Publishing {event}")
+    for datasets, func in list(_refreshers):
+        if datasets and event.dataset not in datasets:
+            continue
+        try:
+            func(event)
+        except Exception as e:
+            logger.error(f"Refresher {func.__name__} failed for {event}: {str(e)}")
+
+
+def _bump_generations(scopes):
+    for namespace, scope in scopes:
+        bump_generation(namespace, scope)
+
+
+@refresher()
+def invalidate_caches(event):
+    """Invalidate cached API responses for the affected companies only"""
+    scopes = [("dataset", "all")]
+    if event.dataset == "stocks":
+        scopes += [("stocks", company_id) for company_id in event.company_ids]
+        scopes.append(("market", "all"))
+    elif event.dataset == "financials":
+        scopes += [("financials", company_id) for company_id in event.company_ids]
+    elif event.dataset == "macro":
+        scopes.append(("macro", "all"))
+    elif event.dataset == "companies":
+        scopes.append(("companies", "all"))
+    # Committed through the writer, so every process sees the new generations
+    write(_bump_generations, scopes)
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from sqlalchemy import String, select, type_coerce
+
+from api.models.models import db
+
+
+# Converter for DateTime columns
+isoformat = datetime.isoformat
+
+
+def iso_text(column):
+    """Read a Date column as the ISO text SQLite stores, skipping parse and format"""
+    return type_coerce(column, String)
+
+
+class RowSerializer:
+    """Table-driven serializer for read-only list endpoints.
+
+    ``fields`` is a sequence of ``(key, column)`` or ``(key, column, convert)``
+    entries. Reads select just those columns through SQLAlchemy Core and get
+    plain row tuples back, with no ORM instances, identity map or attribute
+    instrumentation, and each row becomes a dict in one ``zip``. ``convert``
+    runs only on non-null values. ``derived`` entries are ``(key, function)``
+    pairs computed from the finished record.
+
+    Writes keep using the ORM models.
+    """
+
+    def __init__(self, fields, derived=()):
+        self.keys = tuple(field[0] for field in fields)
+        self.columns = tuple(field[1] for field in fields)
+        self.converters = tuple(
+            (index, field[2]) for index, field in enumerate(fields) if len(field) > 2
+        )
+        self.derived = tuple(derived)
+
+    def select(self):
+        """A Core select of the serialized columns, ready for filters and ordering"""
+        return select(*self.columns)
+
+    def rows(self, statement):
+        return db.session.execute(statement).all()
+
+    def serialize(self, rows):
+        keys, converters, derived = self.keys, self.converters, self.derived
+        if not converters and not derived:
+            return [dict(zip(keys, row)) for row in rows]
+
+        records = []
+        for row in rows:
+            if converters:
+                row = list(row)
+                for index, convert in converters:
+                    if row[index] is not None:
+                        row[index] = convert(row[index])
+            record = dict(zip(keys, row))
+            for key, compute in derived:
+                record[key] = compute(record)
+            records.append(record)
+        return records
+
+    def all(self, statement):
+        """Execute ``statement`` and serialize every row"""
+        return self.serialize(self.rows(statement))
+
+    def first(self, statement):
+        """Serialize the first row of ``statement``, or None"""
+        row = db.session.execute(statement.limit(1)).first()
+        return self.serialize([row])[0] if row is not None else None
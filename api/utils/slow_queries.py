@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from api.models.models import db
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statements worth explaining; PRAGMA, BEGIN, DDL etc. are not
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_sql(statement):
+    """Collapse whitespace, literals and expanded IN lists to one statement shape"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _LITERALS.sub("?", sql)
+    return _PLACEHOLDER_LISTS.sub("?, ...", sql)
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def parameter_shape(parameters):
+    """Types of the bound parameters, without their values"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        shape = [type(value).__name__ for value in parameters[:20]]
+        if len(parameters) > 20:
+            shape.append(f"... {len(parameters)} total")
+        return shape
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Slow statements aggregated by fingerprint, keeping the most recent ones.
+
+    Holds at most ``size`` fingerprints; updating one moves it to the end and
+    the least recently seen fingerprint is evicted first.
+    """
+
+    def __init__(self, threshold_ms, size):
+        self.threshold = threshold_ms / 1000
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, statement, parameters, duration, endpoint, explain):
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        duration_ms = round(duration * 1000, 2)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                entry = {
+                    "fingerprint": key,
+                    "sql": normalized,
+                    "parameters": parameter_shape(parameters),
+                    "plan": None,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "endpoints": Counter(),
+                }
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + duration_ms, 2)
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_ms"] = duration_ms
+            entry["last_seen"] = datetime.utcnow().isoformat()
+            entry["endpoints"][endpoint] += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            # The plan only changes with the schema; explain each shape once
+            needs_plan = entry["plan"] is None
+
+        if needs_plan:
+            entry["plan"] = explain()
+        logger.warning(
+            f"Slow query {duration_ms}ms [{key}] in {endpoint}: {normalized[:300]} "
+            f"| params {entry['parameters']} | plan {entry['plan']}"
+        )
+
+    def entries(self):
+        """Aggregated entries, slowest total time first"""
+        with self._lock:
+            entries = [
+                {**entry, "endpoints": dict(entry["endpoints"]),
+                 "avg_ms": round(entry["total_ms"] / entry["count"], 2)}
+                for entry in self._entries.values()
+            ]
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _explain(connection, statement, parameters, executemany):
+    """Capture EXPLAIN QUERY PLAN on the connection that ran the statement"""
+    if connection.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"unavailable: {str(e)}"]
+    finally:
+        cursor.close()
+
+
+def init_slow_query_log(app):
+    """Log statements slower than SLOW_QUERY_MS with their plan and endpoint.
+
+    The only cost for statements under the threshold is a timer and one
+    comparison. Aggregates are kept in app.extensions["slow_query_log"].
+    """
+    log = SlowQueryLog(app.config["SLOW_QUERY_MS"], app.config["SLOW_QUERY_BUFFER_SIZE"])
+    app.extensions["slow_query_log"] = log
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["slow_query_start"].pop()
+        if duration < log.threshold:
+            return
+        endpoint = request.endpoint if has_request_context() else threading.current_thread().name
+        log.record(
+            statement, parameters, duration, endpoint,
+            lambda: _explain(conn, statement, parameters, executemany),
+        )
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    return log
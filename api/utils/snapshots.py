@@ -0,0 +1,90 @@
+import logging
+import os
+import shutil
+import sqlite3
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Sidecar files SQLite keeps next to a WAL database
+SIDECARS = ("-wal", "-shm", "-journal")
+
+
+def _remove_sidecars(path):
+    for suffix in SIDECARS:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _copy_with_backup_api(source_path, target_path):
+    """Page-level copy through the online backup API.
+
+    The copy runs as one step inside a single read transaction, so in WAL
+    mode it sees one consistent state of the source while writers carry on.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+def schema_revision(path):
+    """Alembic revision recorded in a database file, or None"""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return connection.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+    except sqlite3.Error:
+        return None
+    finally:
+        connection.close()
+
+
+def create_snapshot(database_path, snapshot_path):
+    """Save a consistent copy of a live database as one self-contained file.
+
+    Safe while the app and the ingest service are running. The snapshot is
+    written next to its destination and moved into place when complete, and
+    is switched out of WAL mode so it is a single file that can be copied
+    around as is.
+    """
+    tmp_path = f"{snapshot_path}.tmp"
+    for path in (tmp_path, *(tmp_path + suffix for suffix in SIDECARS)):
+        if os.path.exists(path):
+            os.remove(path)
+
+    _copy_with_backup_api(database_path, tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        connection.close()
+    os.replace(tmp_path, snapshot_path)
+    logger.info(f"Snapshot of {database_path} saved to {snapshot_path}")
+    return snapshot_path
+
+
+def restore_snapshot(snapshot_path, database_path, live=False):
+    """Replace a database with a snapshot.
+
+    By default the snapshot file is copied next to the database and renamed
+    over it, which is as fast as the disk allows but requires that nothing
+    has the database open: stop the app and the ingest service first, or
+    restore before creating the app in a test session. With ``live=True``
+    the pages are written through the backup API instead, so processes
+    holding connections see the restored data on their next transaction.
+    """
+    if not os.path.exists(snapshot_path):
+        raise FileNotFoundError(snapshot_path)
+
+    if live:
+        _copy_with_backup_api(snapshot_path, database_path)
+    else:
+        tmp_path = f"{database_path}.restore"
+        shutil.copyfile(snapshot_path, tmp_path)
+        _remove_sidecars(database_path)
+        os.replace(tmp_path, database_path)
+    logger.info(f"Restored {database_path} from {snapshot_path}")
+    return database_path
@@ -0,0 +1,179 @@
+import atexit
+import csv
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from api.utils.ingestion import IngestionError, ingest_file
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rejected rows returned with the upload status; the full list is in the report file
+REJECTION_SAMPLE_SIZE = 100
+
+
+class RejectionReport:
+    """CSV of ``(row, error)`` pairs written as the loader rejects rows.
+
+    Passed to ingest_file() as its ``rejections`` sink, so a file rejecting
+    every row still only holds one chunk of messages in memory. The first
+    ``sample_size`` are also kept for the status response.
+    """
+
+    def __init__(self, path, sample_size=REJECTION_SAMPLE_SIZE):
+        self.path = path
+        self.sample_size = sample_size
+        self.sample = []
+        self.count = 0
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["row", "error"])
+
+    def extend(self, rejections):
+        for row, message in rejections:
+            self._writer.writerow([row, message])
+            if len(self.sample) < self.sample_size:
+                self.sample.append({"row": row, "error": message})
+            self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+class Upload:
+    """One uploaded file, spooled to disk and waiting for or past ingestion"""
+
+    def __init__(self, upload_id, folder, filename, dataset, user_id=None):
+        self.id = upload_id
+        self.folder = folder
+        self.filename = filename
+        self.dataset = dataset
+        self.user_id = user_id
+        self.status = "queued"  # queued/running/loaded/duplicate/rejected
+        self.error = None
+        self.result = None
+        self.report = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    @property
+    def path(self):
+        return os.path.join(self.folder, self.filename)
+
+    @property
+    def report_path(self):
+        return os.path.join(self.folder, "rejections.csv")
+
+    def to_dict(self):
+        result = self.result or {}
+        return {
+            "id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "dataset": self.dataset,
+            "rows_loaded": result.get("rows_loaded"),
+            "rows_rejected": result.get("rows_rejected"),
+            "rows_quarantined": result.get("rows_quarantined"),
+            "rejections": self.report.sample if self.report else [],
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class Uploads:
+    """Ingests uploaded files on a background thread.
+
+    The request only spools the file into its own folder under
+    ``UPLOAD_FOLDER`` and queues it, so a large upload ties up an HTTP
+    worker for the transfer and no longer. Parsing, validation and the
+    batched upserts run through ingest_file(), the same path as the drop
+    folder, one file at a time; each chunk is its own job on the single
+    writer, so API writes are not held up for the whole file. A file that
+    fails part way reports the rows its earlier chunks loaded. The spooled
+    file is deleted once loaded; the rejection report is kept until the
+    upload expires after ``ttl`` seconds.
+    """
+
+    def __init__(self, app, folder, ttl=86400):
+        self.app = app
+        self.folder = folder
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload")
+        self._uploads = {}
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+
+    def create(self, filename, user_id=None):
+        """A new upload with an empty folder to spool ``filename`` into"""
+        upload_id = uuid.uuid4().hex
+        folder = os.path.join(self.folder, upload_id)
+        os.makedirs(folder)
+        return Upload(upload_id, folder, filename, None, user_id)
+
+    def submit(self, upload):
+        """Queue a spooled upload for ingestion"""
+        with self._lock:
+            self._sweep()
+            self._uploads[upload.id] = upload
+        self._pool.submit(self._run, upload)
+        return upload
+
+    def discard(self, upload):
+        shutil.rmtree(upload.folder, ignore_errors=True)
+
+    def get(self, upload_id):
+        return self._uploads.get(upload_id)
+
+    def _run(self, upload):
+        upload.status = "running"
+        upload.report = RejectionReport(upload.report_path)
+        start = time.perf_counter()
+        try:
+            with self.app.app_context():
+                upload.result = ingest_file(upload.path, rejections=upload.report)
+            upload.status = "duplicate" if upload.result is None else "loaded"
+        except IngestionError as e:
+            upload.status = "rejected"
+            upload.error = str(e)
+            upload.result = e.result
+        except Exception as e:
+            logger.error(f"Unexpected error ingesting upload {upload.id}: {str(e)}")
+            upload.status = "rejected"
+            upload.error = "Internal server error"
+        finally:
+            upload.report.close()
+            upload.finished_at = datetime.utcnow()
+            os.remove(upload.path)
+        logger.info(
+            f"Upload {upload.id} ({upload.filename}) {upload.status} "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    def _sweep(self):
+        """Forget expired uploads and delete their folders"""
+        expired = datetime.utcnow() - timedelta(seconds=self.ttl)
+        for upload_id, upload in list(self._uploads.items()):
+            if upload.finished_at is not None and upload.finished_at < expired:
+                del self._uploads[upload_id]
+                self.discard(upload)
+
+
+def init_uploads(app):
+    """Attach the background upload ingester"""
+    uploads = Uploads(app, app.config["UPLOAD_FOLDER"], ttl=app.config["UPLOAD_TTL_SECONDS"])
+    app.extensions["uploads"] = uploads
+    return uploads
+
+
+def uploads():
+    return current_app.extensions["uploads"]
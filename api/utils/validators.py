@@ -31,4 +31,93 @@ def validate_company_data(data):
         except:
             errors.append("Invalid website URL")
     
-    return errors
\ No newline at end of file
+    return errors
+
+def _empty_errors(df):
+    """Object Series aligned with df, initialised to None (no error)"""
+    errors = df.index.to_series(index=df.index).astype(object)
+    errors[:] = None
+    return errors
+
+
+def _apply_checks(df, required_fields, checks):
+    """Record the first failed check per row; checks are (message, mask) pairs"""
+    errors = _empty_errors(df)
+    missing = [field for field in required_fields if field not in df.columns]
+    if missing:
+        errors[:] = f"Missing required field: {missing[0]}"
+        return errors
+
+    # Apply in reverse so the first failing rule wins, matching the row-wise checks
+    for message, mask in reversed(checks(df)):
+        errors = errors.mask(mask.fillna(False).astype(bool), message)
+    return errors
+
+
+def validate_financial_frame(df):
+    """Vectorized financial statement validation.
+
+    Applies the same rules as the row-wise loader checks (balance sheet and
+    gross profit identities, asset composition, ratio ranges) to a whole
+    DataFrame at once. Returns a Series aligned with ``df`` holding the first
+    failed rule for each row, or None where the row is valid.
+    """
+    required_fields = [
+        "company_id", "year", "total_assets", "total_liabilities", "total_equity",
+        "gross_profit", "revenue", "cost_of_revenue", "total_current_assets",
+        "current_ratio", "return_on_equity",
+    ]
+
+    def checks(frame):
+        return [
+            ("Balance sheet doesn't balance",
+             (frame["total_assets"] - (frame["total_liabilities"] + frame["total_equity"])).round(2) != 0),
+            ("Gross profit calculation error",
+             (frame["gross_profit"] - (frame["revenue"] - frame["cost_of_revenue"])).round(2) != 0),
+            ("Current assets exceed total assets",
+             frame["total_current_assets"] > frame["total_assets"]),
+            ("Unusual current ratio",
+             (frame["current_ratio"] < 0) | (frame["current_ratio"] > 5)),
+            ("Unusual ROE",
+             (frame["return_on_equity"] < -100) | (frame["return_on_equity"] > 100)),
+        ]
+
+    return _apply_checks(df, required_fields, checks)
+
+
+# Historical ranges for Ethiopian macro series
+MACRO_RANGES = {
+    "gdp_growth": (-15, 15),
+    "inflation_rate": (0, 50),
+    "interest_rate": (0, 20),
+    "npl_ratio": (0, 15),
+    "etb_usd": (20, 150),
+    "fx_reserves": (1000, 10000),  # In millions USD
+}
+
+
+def validate_macro_frame(df):
+    """Vectorized macro indicator validation (ranges, trade balance, required fields)"""
+    required_fields = ["date", "gdp_growth", "inflation_rate", "interest_rate", "etb_usd"]
+
+    def checks(frame):
+        result = []
+        for field in required_fields:
+            result.append((f"Missing required field: {field}", frame[field].isna()))
+        for field, (min_val, max_val) in MACRO_RANGES.items():
+            if field in frame.columns:
+                values = frame[field].astype(float)
+                result.append((
+                    f"{field} out of range ({min_val}-{max_val})",
+                    values.notna() & ((values < min_val) | (values > max_val)),
+                ))
+        if {"exports", "imports", "trade_balance"} <= set(frame.columns):
+            calculated = (frame["exports"] - frame["imports"]).round(2)
+            result.append((
+                "Trade balance mismatch",
+                calculated.notna() & frame["trade_balance"].notna()
+                & (frame["trade_balance"].round(2) != calculated),
+            ))
+        return result
+
+    return _apply_checks(df, required_fields, checks)
@@ -0,0 +1,165 @@
+import logging
+import os
+import shutil
+import threading
+import time
+
+from api.utils.ingestion import IngestionError, ingest_file
+
+# inotify (via watchdog) is optional; fall back to polling without it
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Files still being written by the uploader (or editor temp files)
+PARTIAL_SUFFIXES = (".part", ".tmp", ".partial", ".crdownload", ".swp")
+
+
+def is_candidate(name):
+    """Whether a directory entry looks like a finished data file"""
+    return (
+        not name.startswith(".")
+        and not name.endswith(PARTIAL_SUFFIXES)
+        and name.lower().endswith(".csv")
+    )
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards create/modify/move events to the watcher's pending set"""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.touch(event.dest_path)
+
+
+class DropFolderWatcher:
+    """Watch a directory and ingest files once they stop changing.
+
+    Files are discovered through inotify events when watchdog is installed and
+    by periodic directory scans otherwise. A file is only handed to the loader
+    once its size and mtime have been stable for ``debounce`` seconds, so
+    partially written files are never read. Loaded files are moved to
+    ``processed/`` and failures to ``rejected/`` inside the watch directory.
+    """
+
+    def __init__(self, app, watch_dir, poll_interval=1.0, debounce=2.0, use_inotify=True):
+        self.app = app
+        self.watch_dir = os.path.abspath(watch_dir)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify and Observer is not None
+        self.processed_dir = os.path.join(self.watch_dir, "processed")
+        self.rejected_dir = os.path.join(self.watch_dir, "rejected")
+        self._pending = {}  # path -> (size, mtime, last change time)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        for folder in (self.watch_dir, self.processed_dir, self.rejected_dir):
+            os.makedirs(folder, exist_ok=True)
+
+    def touch(self, path):
+        """Mark a file as changed; it becomes ready after the debounce window"""
+        if os.path.dirname(os.path.abspath(path)) != self.watch_dir:
+            return
+        if not is_candidate(os.path.basename(path)):
+            return
+        with self._lock:
+            self._pending[path] = (None, None, time.monotonic())
+
+    def scan(self):
+        """Queue every candidate file currently in the watch directory"""
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and is_candidate(entry.name):
+                    with self._lock:
+                        if entry.path not in self._pending:
+                            self._pending[entry.path] = (None, None, time.monotonic())
+
+    def ready_files(self):
+        """Return pending files whose size and mtime stopped changing"""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (size, mtime, changed_at) in list(self._pending.items()):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    del self._pending[path]
+                    continue
+                if (stat.st_size, stat.st_mtime) != (size, mtime):
+                    self._pending[path] = (stat.st_size, stat.st_mtime, now)
+                elif now - changed_at >= self.debounce:
+                    del self._pending[path]
+                    ready.append(path)
+        return sorted(ready, key=os.path.getmtime)
+
+    def process(self, path):
+        """Ingest one settled file and move it out of the watch directory"""
+        name = os.path.basename(path)
+        try:
+            with self.app.app_context():
+                result = ingest_file(path)
+            target = self.processed_dir
+            if result is None:
+                logger.info(f"{name} was already ingested")
+        except IngestionError as e:
+            logger.warning(f"Rejected {name}: {str(e)}")
+            target = self.rejected_dir
+        except Exception as e:
+            logger.error(f"Unexpected error ingesting {name}: {str(e)}")
+            target = self.rejected_dir
+        shutil.move(path, os.path.join(target, name))
+
+    def run_once(self):
+        """Ingest everything currently in the folder, waiting for it to settle"""
+        self.scan()
+        while self._pending:
+            for path in self.ready_files():
+                self.process(path)
+            if self._pending:
+                time.sleep(min(self.poll_interval, self.debounce))
+
+    def run(self):
+        """Watch the folder until stop() is called"""
+        observer = None
+        if self.use_inotify:
+            observer = Observer()
+            observer.schedule(_EventHandler(self), self.watch_dir, recursive=False)
+            observer.start()
+            logger.info(f"Watching {self.watch_dir} with inotify")
+        else:
+            logger.info(f"Polling {self.watch_dir} every {self.poll_interval}s")
+
+        # Pick up files that arrived while the service was down
+        self.scan()
+        try:
+            while not self._stop.is_set():
+                if observer is None:
+                    self.scan()
+                for path in self.ready_files():
+                    self.process(path)
+                self._stop.wait(self.poll_interval)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,290 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+
+from api.models.models import db
+from api.utils.errors import APIError
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Callbacks registered with after_commit() by the write job running on this thread
+_local = threading.local()
+
+# Sentinel telling the writer thread to finish the queued work and exit
+_STOP = object()
+
+
+class _WriteJob:
+    __slots__ = ("fn", "args", "kwargs", "future", "after_commit")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.after_commit = []
+
+
+def _run_job(fn, args, kwargs, callbacks):
+    """Call a job, collecting what it registers with after_commit() in ``callbacks``"""
+    outer = getattr(_local, "after_commit", None)
+    _local.after_commit = callbacks
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _local.after_commit = outer
+
+
+def _run_callbacks(callbacks):
+    for fn, args in callbacks:
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"After-commit callback {getattr(fn, '__name__', fn)} failed: {str(e)}")
+
+
+class WriteQueue:
+    """Single writer thread that owns every API write to the SQLite database.
+
+    Jobs are callables that use ``db.session`` without committing. The writer
+    takes whatever is queued (up to ``batch_size`` jobs), runs each job in its
+    own SAVEPOINT inside one ``BEGIN IMMEDIATE`` transaction and commits once,
+    so concurrent small writes share one fsync and never race each other for
+    the write lock. A job that raises only rolls back its own savepoint; its
+    exception is delivered through its future. Futures resolve after the
+    commit, so a result always describes durable data.
+
+    The thread starts on first use, which keeps it out of CLI scripts and
+    makes it per process under forking servers. Other processes (the
+    ingest service) still share the file: while one holds the write lock the
+    writer keeps retrying BEGIN for up to ``lock_timeout`` seconds before
+    failing the batch.
+    """
+
+    def __init__(self, app, batch_size=100, lock_timeout=60.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.lock_timeout = lock_timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats = {"jobs": 0, "failed_jobs": 0, "batches": 0, "largest_batch": 0, "lock_retries": 0}
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)`` for the writer; returns a Future of its result"""
+        job = _WriteJob(fn, args, kwargs)
+        if threading.current_thread() is self._thread:
+            if getattr(_local, "after_commit", None) is not None:
+                # A job submitting more work joins the transaction it runs in
+                try:
+                    job.future.set_result(fn(*args, **kwargs))
+                except Exception as e:
+                    job.future.set_exception(e)
+            else:
+                # An after-commit callback writing more: the writer cannot
+                # wait on its own queue, so the job commits on its own now
+                try:
+                    self._write_batch([job])
+                except Exception as e:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            return job.future
+        self._ensure_started()
+        self._queue.put(job)
+        return job.future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout=10):
+        """Commit what is queued and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {**self._stats, "queued": self._queue.qsize(), "running": bool(self._thread and self._thread.is_alive())}
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            batch = [job]
+            stopping = False
+            # Group commit: everything that queued up during the last commit
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} jobs failed: {str(e)}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            if stopping:
+                return
+
+    def _begin_immediate(self):
+        """Take the write lock up front, retrying while another process holds it"""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while True:
+            try:
+                connection = db.session.connection()
+                if connection.dialect.name == "sqlite":
+                    connection.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except OperationalError as e:
+                db.session.rollback()
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise
+                self._stats["lock_retries"] += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
+
+    def _write_batch(self, batch):
+        outcomes = []
+        with self.app.app_context():
+            try:
+                self._begin_immediate()
+                for job in batch:
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        # Leaving the block flushes, which can still fail
+                        with db.session.begin_nested():
+                            result = _run_job(job.fn, job.args, job.kwargs, job.after_commit)
+                    except Exception as e:
+                        outcomes.append((job, None, e))
+                    else:
+                        outcomes.append((job, result, None))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+        self._stats["batches"] += 1
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        for job, result, error in outcomes:
+            if error is None:
+                self._stats["jobs"] += 1
+                if job.after_commit:
+                    with self.app.app_context():
+                        _run_callbacks(job.after_commit)
+                job.future.set_result(result)
+            else:
+                self._stats["failed_jobs"] += 1
+                job.future.set_exception(error)
+
+
+def init_write_queue(app):
+    """Attach the single-writer queue when enabled for a file database"""
+    if not app.config["WRITE_QUEUE_ENABLED"]:
+        return None
+    with app.app_context():
+        database = db.engine.url.database
+    if database in (None, "", ":memory:"):
+        # Each connection to an in-memory database is a separate database
+        return None
+    writer = WriteQueue(
+        app,
+        batch_size=app.config["WRITE_QUEUE_BATCH_SIZE"],
+        lock_timeout=app.config["WRITE_LOCK_TIMEOUT"],
+    )
+    app.extensions["write_queue"] = writer
+    return writer
+
+
+def submit_write(fn, *args, **kwargs):
+    """Run a write job on the app's writer thread; returns a Future.
+
+    ``fn`` uses ``db.session`` and must not commit. It runs without a request
+    context, so pass request data (user ids, payloads) as arguments, and
+    return plain values rather than ORM instances. Without a writer (disabled,
+    in-memory database) the job runs and commits inline.
+    """
+    writer = current_app.extensions.get("write_queue")
+    if writer is not None:
+        return writer.submit(fn, *args, **kwargs)
+
+    future = Future()
+    callbacks = []
+    try:
+        result = _run_job(fn, args, kwargs, callbacks)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        future.set_exception(e)
+    else:
+        _run_callbacks(callbacks)
+        future.set_result(result)
+    return future
+
+
+def after_commit(fn, *args):
+    """From inside a write job, call ``fn(*args)`` once the job has committed.
+
+    Callbacks run on the writer thread after the batch commit and before the
+    job's future resolves. They are dropped if the job raises (its savepoint
+    rolls back) or the batch fails, so they only ever follow durable changes.
+    """
+    callbacks = getattr(_local, "after_commit", None)
+    if callbacks is None:
+        raise RuntimeError("after_commit() must be called from a write job")
+    callbacks.append((fn, args))
+
+
+class WriteTimeout(APIError):
+    """A write job waited too long in the queue and was withdrawn unapplied"""
+
+    def __init__(self):
+        super().__init__(
+            "The database is busy and the change was not applied; please retry", status_code=503
+        )
+
+
+def write(fn, *args, **kwargs):
+    """Run a write job and wait for its committed result.
+
+    A job still queued after WRITE_QUEUE_TIMEOUT seconds (say behind another
+    process holding the write lock) is cancelled, so it can never commit
+    behind the caller's back, and WriteTimeout (503) is raised. A job the
+    writer has already started is waited for: its transaction already holds
+    the lock, so its outcome follows shortly.
+    """
+    future = submit_write(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=current_app.config["WRITE_QUEUE_TIMEOUT"])
+    except FutureTimeout:
+        if future.cancel():
+            logger.warning(f"Write job {getattr(fn, '__name__', fn)} timed out in the queue and was cancelled")
+            raise WriteTimeout()
+        return future.result()
+
+
+def write_queue_stats():
+    writer = current_app.extensions.get("write_queue")
+    return writer.stats() if writer is not None else None
@@ -15,6 +15,14 @@ from api.macro_api import macro_api
 from api.auth_api import auth_api
 from api.download_api import download_api
 from api.utils.errors import init_error_handlers
+from api.utils.database import configure_engine, init_sqlite, effective_settings
+from api.utils.query_stats import init_query_stats
+from api.utils.slow_queries import init_slow_query_log
+from api.utils.analytics import init_analytics
+from api.utils.writer import init_write_queue, write_queue_stats
+from api.utils.audit import init_audit_queue, audit_queue_stats
+from api.utils.export_jobs import init_export_jobs
+from api.utils.uploads import init_uploads
 import os
 import logging
 from datetime import timedelta
@@ -29,8 +37,32 @@ class Config:
     """Base configuration"""
 
     # Database
-    SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_PROFILE = os.getenv("DB_PROFILE", os.getenv("FLASK_ENV", "production"))
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_READ_ROUTING = os.getenv("DB_READ_ROUTING", "true").lower() in ("1", "true")
+    DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", 20))
+    DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", 20))
+
+    # Single writer thread with group commit for API writes
+    WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "true").lower() in ("1", "true")
+    WRITE_QUEUE_BATCH_SIZE = int(os.getenv("WRITE_QUEUE_BATCH_SIZE", 100))
+    WRITE_QUEUE_TIMEOUT = float(os.getenv("WRITE_QUEUE_TIMEOUT", 30))
+    WRITE_LOCK_TIMEOUT = float(os.getenv("WRITE_LOCK_TIMEOUT", 60))
+
+    # Company audit rows: "async" buffers them for a background batch writer,
+    # "sync" inserts each in its write's transaction. Actions listed in
+    # AUDIT_SYNC_ACTIONS are always written synchronously.
+    AUDIT_MODE = os.getenv("AUDIT_MODE", "async").lower()
+    AUDIT_SYNC_ACTIONS = {
+        action.strip().upper() for action in os.getenv("AUDIT_SYNC_ACTIONS", "DELETE").split(",") if action.strip()
+    }
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
 
     # JWT Settings
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-key")
@@ -39,7 +71,44 @@ class Config:
 
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
+    UPLOAD_FOLDER = os.getenv(
+        "UPLOAD_FOLDER",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads"),
+    )
+    # Data file uploads (POST /api/v1/admin/uploads) may exceed MAX_CONTENT_LENGTH
+    UPLOAD_MAX_CONTENT_LENGTH = int(os.getenv("UPLOAD_MAX_CONTENT_LENGTH", 64 * 1024 * 1024))
+    UPLOAD_TTL_SECONDS = int(os.getenv("UPLOAD_TTL_SECONDS", 86400))
+
+    # Background export jobs (POST /api/v1/download/jobs)
+    EXPORT_FOLDER = os.getenv(
+        "EXPORT_FOLDER",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports"),
+    )
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", 2))
+    EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", 86400))
+
+    # Drop-folder ingestion
+    INGEST_WATCH_DIR = os.getenv(
+        "INGEST_WATCH_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "incoming"),
+    )
+    INGEST_POLL_INTERVAL = float(os.getenv("INGEST_POLL_INTERVAL", 1.0))
+    INGEST_DEBOUNCE_SECONDS = float(os.getenv("INGEST_DEBOUNCE_SECONDS", 2.0))
+
+    # Daily bars older than this move to stock_archive (archive_bars.py)
+    ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", 730))
+
+    # Columnar analytics mirror (needs duckdb; built with analytics_sync.py)
+    ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "true").lower() in ("1", "true")
+    ANALYTICS_DIR = os.getenv(
+        "ANALYTICS_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics"),
+    )
+
+    # Data quality report thresholds
+    DATA_QUALITY_GAP_DAYS = int(os.getenv("DATA_QUALITY_GAP_DAYS", 5))
+    DATA_QUALITY_STALE_DAYS = int(os.getenv("DATA_QUALITY_STALE_DAYS", 7))
+    DATA_QUALITY_OUTLIER_Z = float(os.getenv("DATA_QUALITY_OUTLIER_Z", 5.0))
 
     # CORS
     CORS_HEADERS = "Content-Type"
@@ -47,6 +116,12 @@ class Config:
     # Debug
     DEBUG = os.getenv("FLASK_ENV") == "development"
 
+    # Per-request query instrumentation
+    QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", str(DEBUG)).lower() in ("1", "true")
+    QUERY_REPEAT_WARNING = int(os.getenv("QUERY_REPEAT_WARNING", 10))
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+    SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 200))
+
     # Template and Static
     TEMPLATE_FOLDER = os.path.join(
         os.path.dirname(os.path.abspath(__file__)), "templates"
@@ -106,7 +181,16 @@ def create_app(config_object=Config):
 
     # Initialize extensions
     CORS(app)
+    configure_engine(app)
     db.init_app(app)
+    init_sqlite(app)
+    init_query_stats(app)
+    init_slow_query_log(app)
+    init_analytics(app)
+    init_write_queue(app)
+    init_audit_queue(app)
+    init_export_jobs(app)
+    init_uploads(app)
     bcrypt.init_app(app)
     jwt = JWTManager(app)
     migrate = Migrate(app, db)
@@ -154,6 +238,9 @@ def create_app(config_object=Config):
                 {
                     "status": "healthy",
                     "database": db_status,
+                    "database_settings": effective_settings(),
+                    "write_queue": write_queue_stats(),
+                    "audit_queue": audit_queue_stats(),
                     "environment": os.getenv("FLASK_ENV", "production"),
                 }
             ), 200
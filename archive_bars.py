@@ -0,0 +1,55 @@
+"""Move old daily bars out of the hot stock table.
+
+Bars dated before the first day of the month ARCHIVE_HORIZON_DAYS ago are
+moved to stock_archive, a compact table clustered on (company_id, date).
+The stocks API reads the archive transparently when a range reaches into
+it. Run it periodically (e.g. monthly from cron):
+
+    python archive_bars.py                     # use ARCHIVE_HORIZON_DAYS
+    python archive_bars.py --horizon-days 365
+    python archive_bars.py --dry-run           # only count what would move
+"""
+import argparse
+import time
+
+from sqlalchemy import func, select
+
+from app import create_app
+from api.models.models import db, Stock
+from api.utils.archive import archive_bars, archive_cutoff, horizon_cutoff
+
+
+def main():
+    app = create_app()
+
+    parser = argparse.ArgumentParser(description="Archive daily bars older than the horizon")
+    parser.add_argument("--horizon-days", type=int, default=app.config["ARCHIVE_HORIZON_DAYS"],
+                        help="keep this many days of daily bars in the stock table")
+    parser.add_argument("--dry-run", action="store_true", help="count the bars that would move")
+    args = parser.parse_args()
+
+    with app.app_context():
+        cutoff = horizon_cutoff(args.horizon_days)
+        previous = archive_cutoff()
+        if previous is not None and previous > cutoff:
+            # Never move the cutoff back; re-archive re-ingested old bars instead
+            cutoff = previous
+
+        pending = db.session.execute(
+            select(func.count()).select_from(Stock).where(Stock.date < cutoff)
+        ).scalar()
+        print(f"📦 {pending:,} daily bars dated before {cutoff}")
+        if args.dry_run or not pending:
+            return
+
+        print("🚀 Archiving...")
+        started = time.perf_counter()
+        run = archive_bars(cutoff)
+        print(f"✅ Archived {run.rows_archived:,} bars in {time.perf_counter() - started:.1f}s")
+
+        db.session.execute(db.text("ANALYZE stock"))
+        db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Bootstrap, snapshot and restore the market database.
+
+Builds the canonical schema from the models (stamped at the latest
+migration so `flask db upgrade` keeps working), loads seed CSVs through
+the ingestion pipeline, and saves / restores whole-database snapshots:
+
+    python bootstrap_db.py init --seed Data        # fresh schema + seed data
+    python bootstrap_db.py snapshot snapshots/market.db
+    python bootstrap_db.py restore snapshots/market.db          # app stopped
+    python bootstrap_db.py restore snapshots/market.db --live   # app running
+
+This replaces setup_db.py, create_db.py and ingest_data.py, whose
+hand-written tables (Company, Stock, Financials, ...) do not match the
+models. Point DATABASE_URL at another file to bootstrap a different
+database, e.g. for a test run.
+"""
+import argparse
+import os
+import sys
+import time
+
+from alembic.script import ScriptDirectory
+from flask_migrate import stamp
+
+from app import create_app
+from api.models.models import db
+from api.utils.analytics import AnalyticsStore
+from api.utils.ingestion import IngestionError, ingest_file, sniff_dataset
+from api.utils.snapshots import create_snapshot, restore_snapshot, schema_revision
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Seed files are loaded in dependency order: companies before their data
+SEED_ORDER = ["companies", "financials", "stocks", "macro", "news"]
+
+
+def migration_head(app):
+    config = app.extensions["migrate"].migrate.get_config(MIGRATIONS_DIR)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def seed(directory):
+    """Ingest every recognised CSV in a directory; returns rows loaded"""
+    files = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        dataset = sniff_dataset(path) if name.lower().endswith(".csv") else None
+        if dataset is None:
+            print(f"⏭️  Skipping {name}")
+            continue
+        files.append((SEED_ORDER.index(dataset), path))
+
+    rows = 0
+    for _, path in sorted(files):
+        try:
+            result = ingest_file(path)
+        except IngestionError as e:
+            print(f"❌ {os.path.basename(path)}: {str(e)}")
+            continue
+        if result is not None:
+            rows += result["rows_loaded"]
+            print(f"✅ {result['file']}: {result['rows_loaded']:,} {result['dataset']} rows")
+    return rows
+
+
+def init(app, database_path, args):
+    if os.path.exists(database_path) and os.path.getsize(database_path) and not args.force:
+        print(f"❌ {database_path} already exists; use --force to replace it")
+        sys.exit(1)
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(database_path + suffix):
+            os.remove(database_path + suffix)
+
+    db.create_all()
+    stamp(directory=MIGRATIONS_DIR)
+    print(f"✅ Schema created at revision {migration_head(app)}")
+    if args.seed:
+        print(f"🚀 Loading seed data from {args.seed}...")
+        rows = seed(args.seed)
+        print(f"✅ Loaded {rows:,} rows")
+
+
+def snapshot(app, database_path, args):
+    os.makedirs(os.path.dirname(os.path.abspath(args.path)), exist_ok=True)
+    print(f"🚀 Saving snapshot of {database_path}...")
+    started = time.perf_counter()
+    create_snapshot(database_path, args.path)
+    size = os.path.getsize(args.path) / 1024 ** 2
+    print(f"✅ Saved {args.path} ({size:,.0f} MB) in {time.perf_counter() - started:.1f}s")
+
+
+def restore(app, database_path, args):
+    revision, head = schema_revision(args.path), migration_head(app)
+    print(f"🚀 Restoring {database_path} from {args.path}...")
+    started = time.perf_counter()
+    restore_snapshot(args.path, database_path, live=args.live)
+    print(f"✅ Restored in {time.perf_counter() - started:.1f}s")
+
+    # The columnar mirror describes the old data until it is rebuilt
+    AnalyticsStore(app.config["ANALYTICS_DIR"]).invalidate()
+    if app.config["ANALYTICS_ENABLED"]:
+        print("ℹ️  Analytics mirror invalidated; run analytics_sync.py to rebuild it")
+    if revision is None:
+        print(f"⚠️  Snapshot has no migration revision; if its schema is current run `flask db stamp {head}`")
+    elif revision != head:
+        print(f"⚠️  Snapshot is at revision {revision}, migrations at {head}; run `flask db upgrade`")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap, snapshot and restore the market database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="create the schema from the models")
+    init_parser.add_argument("--seed", help="directory of CSV files to load after creating the schema")
+    init_parser.add_argument("--force", action="store_true", help="replace an existing database")
+    init_parser.set_defaults(func=init)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="save a consistent copy of the database")
+    snapshot_parser.add_argument("path", help="snapshot file to write")
+    snapshot_parser.set_defaults(func=snapshot)
+
+    restore_parser = subparsers.add_parser("restore", help="replace the database with a snapshot")
+    restore_parser.add_argument("path", help="snapshot file to restore")
+    restore_parser.add_argument("--live", action="store_true",
+                                help="restore through the backup API while the app is running")
+    restore_parser.set_defaults(func=restore)
+
+    args = parser.parse_args()
+    app = create_app()
+    with app.app_context():
+        args.func(app, db.engine.url.database, args)
+
+
+if __name__ == "__main__":
+    main()
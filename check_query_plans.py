@@ -0,0 +1,113 @@
+"""Check that the hot endpoint queries are served by index seeks.
+
+Runs EXPLAIN QUERY PLAN for the query shapes behind the stock, market,
+financials, news, macro, audit and admin endpoints and fails when any of them
+scans a table or sorts through a temporary b-tree:
+
+    python check_query_plans.py            # exit status 1 on a regression
+    python check_query_plans.py --verbose  # print every plan
+
+The same checks run with the test suite (tests/test_query_plans.py)
+against a freshly created schema.
+"""
+import argparse
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import desc, func, select, text
+
+from app import create_app
+from api.models.models import (
+    db, CompanyAudit, CompanyNews, Financial, MacroIndicators, QuarantinedBar, Stock, StockArchive
+)
+
+SAMPLE_DATE = date(2024, 6, 28)
+
+# (endpoint, statement) pairs mirroring the queries the endpoints issue
+HOT_QUERIES = [
+    ("stocks: date range", select(Stock).where(
+        Stock.company_id == 1, Stock.date >= date(2024, 1, 1), Stock.date <= SAMPLE_DATE
+    ).order_by(desc(Stock.date)).limit(100)),
+    ("stocks: latest bar", select(Stock).where(Stock.company_id == 1)
+        .order_by(desc(Stock.date)).limit(1)),
+    ("stocks: 30-day summary", select(Stock).where(
+        Stock.company_id == 1, Stock.date >= date(2024, 6, 1)
+    ).order_by(Stock.date)),
+    ("stocks: archived range", select(StockArchive).where(
+        StockArchive.company_id == 1, StockArchive.date >= date(2015, 1, 1),
+        StockArchive.date <= date(2016, 1, 1)
+    ).order_by(StockArchive.date)),
+    ("market: bar as of date", select(Stock).where(
+        Stock.company_id == 1, Stock.date <= SAMPLE_DATE
+    ).order_by(desc(Stock.date)).limit(1)),
+    ("market: latest date", select(func.max(Stock.date))),
+    ("market: previous date", select(Stock.date).where(Stock.date < SAMPLE_DATE)
+        .order_by(desc(Stock.date)).limit(1)),
+    ("financials: list", select(Financial).where(Financial.company_id == 1)
+        .order_by(Financial.year, Financial.period)),
+    ("financials: latest", select(Financial).where(Financial.company_id == 1)
+        .order_by(desc(Financial.year), desc(Financial.period)).limit(1)),
+    ("financials: latest annual", select(Financial).where(
+        Financial.company_id == 1, Financial.period == "Annual"
+    ).order_by(desc(Financial.year)).limit(1)),
+    ("financials: year range", select(Financial).where(
+        Financial.company_id == 1, Financial.year >= 2020, Financial.year <= 2024
+    )),
+    ("news: company feed", select(CompanyNews).where(
+        CompanyNews.company_id == 1, CompanyNews.published_date >= datetime(2024, 1, 1)
+    ).order_by(desc(CompanyNews.published_date)).limit(20)),
+    ("macro: date range", select(MacroIndicators).where(
+        MacroIndicators.date >= date(2020, 1, 1), MacroIndicators.date <= SAMPLE_DATE
+    )),
+    ("audit: company log", select(CompanyAudit).where(CompanyAudit.company_id == 1)
+        .order_by(desc(CompanyAudit.timestamp), desc(CompanyAudit.id)).limit(101)),
+    ("audit: user log, next page", select(CompanyAudit).where(
+        CompanyAudit.user_id == 1, CompanyAudit.timestamp <= datetime(2024, 6, 28)
+    ).order_by(desc(CompanyAudit.timestamp), desc(CompanyAudit.id)).limit(101)),
+    ("audit: time range", select(CompanyAudit).where(
+        CompanyAudit.timestamp >= datetime(2024, 1, 1), CompanyAudit.timestamp < datetime(2024, 2, 1)
+    ).order_by(CompanyAudit.timestamp, CompanyAudit.id)),
+    ("admin: quarantine queue", select(QuarantinedBar).where(QuarantinedBar.status == "pending")
+        .order_by(desc(QuarantinedBar.id)).limit(50)),
+]
+
+
+def query_plan(statement):
+    """EXPLAIN QUERY PLAN detail lines for a statement"""
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan):
+    """Plan steps that read a whole table or sort outside an index"""
+    return [
+        step for step in plan
+        if step.startswith("SCAN") or "TEMP B-TREE" in step
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check hot query plans use index seeks")
+    parser.add_argument("--verbose", action="store_true", help="print every query plan")
+    args = parser.parse_args()
+
+    app = create_app()
+    failures = 0
+    with app.app_context():
+        for name, statement in HOT_QUERIES:
+            plan = query_plan(statement)
+            problems = plan_problems(plan)
+            failures += bool(problems)
+            print(f"{'❌' if problems else '✅'} {name}")
+            for step in (plan if args.verbose else problems):
+                print(f"     {step}")
+
+    if failures:
+        print(f"\n❌ {failures} of {len(HOT_QUERIES)} hot queries do not use an index seek")
+        sys.exit(1)
+    print(f"\n✅ All {len(HOT_QUERIES)} hot queries use index seeks")
+
+
+if __name__ == "__main__":
+    main()
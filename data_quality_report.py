@@ -0,0 +1,80 @@
+"""Data quality report for the market database.
+
+    python data_quality_report.py                 # print the report
+    python data_quality_report.py --json          # print the raw report as JSON
+    python data_quality_report.py --stale-days 3  # tighten a threshold
+"""
+import argparse
+import json
+
+from app import create_app
+from api.utils.data_quality import get_report
+
+
+def print_report(report):
+    """Print a human readable summary of a data quality report"""
+    summary = report["summary"]
+    print("\n📊 Data Quality Report")
+    print("=" * 50)
+    print(f"Dataset version: {report.get('dataset_version')}")
+    print(f"Market date: {summary['market_date']}")
+    print(f"Built in: {report['duration_ms']}ms")
+
+    print("\n📋 Coverage:")
+    print(f"Companies with price data: {summary['companies_with_bars']} of {summary['companies']}")
+    print(f"Total daily bars: {summary['total_bars']:,}")
+    if summary["companies_without_bars"]:
+        print(f"Companies without bars: {summary['companies_without_bars']}")
+    if report["missing_annual_financials"]:
+        print(f"Company-years missing annual financials: {len(report['missing_annual_financials'])}")
+
+    print("\n🕳️  Gaps in daily series:")
+    print(f"Series missing more than {report['thresholds']['gap_days']} market days: {summary['series_with_gaps']}")
+    for gap in report["gaps"][:10]:
+        print(f"  {gap['ticker']}: {gap['missing_days']} market days without a bar")
+
+    print("\n⏳ Stale tickers:")
+    for stale in report["stale_tickers"][:10]:
+        print(f"  {stale['ticker']}: last bar {stale['last_date']} ({stale['days_behind']} days behind)")
+    if not report["stale_tickers"]:
+        print("  None")
+
+    print("\n⚠️  Outliers:")
+    print(f"Inconsistent OHLC bars: {summary['inconsistent_bars']}")
+    print(f"Close price outliers (|z| > {report['thresholds']['outlier_z']}): {summary['outliers']}")
+    for outlier in report["outliers"][:10]:
+        print(f"  {outlier['ticker']} {outlier['date']}: close {outlier['close']} (z={outlier['z_score']})")
+
+    print("\n🔍 Null rates:")
+    for table, stats in report["null_rates"].items():
+        nulls = {column: rate for column, rate in stats["null_rates"].items() if rate}
+        print(f"{table} ({stats['rows']:,} rows): "
+              + (", ".join(f"{c} {r:.1%}" for c, r in nulls.items()) or "no nulls"))
+
+
+def main():
+    app = create_app()
+
+    parser = argparse.ArgumentParser(description="Print the data quality report")
+    parser.add_argument("--gap-days", type=int, default=app.config["DATA_QUALITY_GAP_DAYS"])
+    parser.add_argument("--stale-days", type=int, default=app.config["DATA_QUALITY_STALE_DAYS"])
+    parser.add_argument("--outlier-z", type=float, default=app.config["DATA_QUALITY_OUTLIER_Z"])
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    with app.app_context():
+        report = get_report(
+            force=True,
+            gap_days=args.gap_days,
+            stale_days=args.stale_days,
+            outlier_z=args.outlier_z,
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
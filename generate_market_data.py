@@ -0,0 +1,397 @@
+"""Synthetic market data generator for load testing.
+
+Produces companies, daily price bars (geometric random walks), quarterly and
+annual financials that satisfy the loader's accounting identities, monthly
+macro indicators and news items. Everything is vectorized with NumPy and
+seeded, so the same arguments always produce the same data:
+
+    python generate_market_data.py --companies 4000 --years 10 --format parquet
+    python generate_market_data.py --companies 50 --years 2 --format csv --out-dir incoming
+    python generate_market_data.py --companies 200 --years 5 --format db
+
+CSV output uses the column layout the drop-folder ingestion service expects.
+"""
+import argparse
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+INDUSTRIES = {
+    "Banking": "Financial Services",
+    "Insurance": "Financial Services",
+    "Telecommunications": "Communication",
+    "Beverages": "Consumer Goods",
+    "Cement": "Industrials",
+    "Agriculture": "Consumer Goods",
+    "Airlines": "Industrials",
+    "Energy": "Utilities",
+}
+
+NEWS_CATEGORIES = ["Company", "Industry", "Regulatory"]
+NEWS_HEADLINES = [
+    "{name} reports quarterly results",
+    "{name} announces dividend",
+    "{name} expands operations",
+    "Regulator reviews {name} filing",
+    "{name} appoints new CEO",
+]
+
+PERIODS = ["Q1", "Q2", "Q3", "Q4", "Annual"]
+
+
+def make_ticker(index):
+    """Unique 4-letter ticker for a company index (AAAA, AAAB, ...)"""
+    letters = []
+    for _ in range(4):
+        index, remainder = divmod(index, 26)
+        letters.append(chr(ord("A") + remainder))
+    return "".join(reversed(letters))
+
+
+def trading_days(years, end_date=None):
+    """Business days covering the requested number of years"""
+    end_date = pd.Timestamp(end_date or date.today())
+    return pd.bdate_range(end=end_date, periods=int(years * 252))
+
+
+def generate_companies(rng, n_companies, first_id=1):
+    """Company profiles with unique tickers"""
+    industries = list(INDUSTRIES)
+    picks = rng.integers(0, len(industries), n_companies)
+    ids = np.arange(first_id, first_id + n_companies)
+    established = pd.to_datetime("1960-01-01") + pd.to_timedelta(
+        rng.integers(0, 60 * 365, n_companies), unit="D"
+    )
+    return pd.DataFrame({
+        "id": ids,
+        "name": [f"Synthetic Company {i:05d}" for i in ids],
+        "ticker": [make_ticker(i) for i in ids],
+        "industry": [industries[p] for p in picks],
+        "sector": [INDUSTRIES[industries[p]] for p in picks],
+        "description": "Synthetic company generated for load testing",
+        "website": [f"https://company{i}.example.com" for i in ids],
+        "established_date": established.date,
+    })
+
+
+def generate_bars(rng, company_ids, days):
+    """Daily OHLCV bars for a block of companies as one DataFrame.
+
+    Closes follow a geometric random walk per company; opens gap from the
+    previous close and highs/lows bracket both, so every bar is consistent.
+    """
+    n_companies, n_days = len(company_ids), len(days)
+    base = rng.uniform(10, 500, (n_companies, 1))
+    drift = rng.normal(0.0002, 0.0002, (n_companies, 1))
+    vol = rng.uniform(0.005, 0.03, (n_companies, 1))
+
+    returns = drift + vol * rng.standard_normal((n_companies, n_days))
+    close = base * np.exp(np.cumsum(returns, axis=1))
+    previous = np.concatenate([base, close[:, :-1]], axis=1)
+    open_ = previous * (1 + 0.25 * vol * rng.standard_normal((n_companies, n_days)))
+    top = np.maximum(open_, close)
+    bottom = np.minimum(open_, close)
+    high = top * (1 + np.abs(0.5 * vol * rng.standard_normal((n_companies, n_days))))
+    low = bottom * (1 - np.abs(0.5 * vol * rng.standard_normal((n_companies, n_days))))
+    volume = rng.lognormal(8.5, 0.6, (n_companies, n_days)).astype(np.int64)
+
+    return pd.DataFrame({
+        "company_id": np.repeat(np.asarray(company_ids), n_days),
+        "date": np.tile(days.values.astype("datetime64[D]"), n_companies),
+        "open": open_.ravel().round(2),
+        "high": high.ravel().round(2),
+        "low": low.ravel().round(2),
+        "close": close.ravel().round(2),
+        "volume": volume.ravel(),
+    })
+
+
+def generate_financials(rng, company_ids, years):
+    """Quarterly and annual statements satisfying the balance sheet identities.
+
+    Derived lines are computed from rounded components, so
+    assets == liabilities + equity and gross profit == revenue - cost of
+    revenue hold exactly, and ratios stay inside the validator's ranges.
+    """
+    company_ids = np.asarray(company_ids)
+    n = len(company_ids) * len(years) * len(PERIODS)
+    scale = np.where(np.array(PERIODS) == "Annual", 1.0, 0.25)
+
+    grid = pd.MultiIndex.from_product(
+        [company_ids, years, PERIODS], names=["company_id", "year", "period"]
+    ).to_frame(index=False)
+    size = np.repeat(rng.uniform(5e7, 5e9, len(company_ids)), len(years) * len(PERIODS))
+    factor = np.tile(scale, len(company_ids) * len(years)) * rng.uniform(0.9, 1.1, n)
+
+    revenue = (size * factor).round(2)
+    cost_of_revenue = (revenue * rng.uniform(0.5, 0.8, n)).round(2)
+    gross_profit = (revenue - cost_of_revenue).round(2)
+    operating_expenses = (gross_profit * rng.uniform(0.3, 0.7, n)).round(2)
+    operating_income = (gross_profit - operating_expenses).round(2)
+    interest_expense = (operating_income * rng.uniform(0.05, 0.2, n)).round(2)
+    profit_before_tax = (operating_income - interest_expense).round(2)
+    net_income = (profit_before_tax * 0.7).round(2)
+
+    total_assets_target = size * 4 * rng.uniform(0.8, 1.2, n)
+    total_liabilities = (total_assets_target * rng.uniform(0.3, 0.7, n)).round(2)
+    total_equity = (total_assets_target - total_liabilities).round(2)
+    total_assets = (total_liabilities + total_equity).round(2)
+
+    total_current_assets = (total_assets * rng.uniform(0.1, 0.4, n)).round(2)
+    cash_equivalents = (total_current_assets * 0.4).round(2)
+    accounts_receivable = (total_current_assets * 0.35).round(2)
+    inventory = (total_current_assets - cash_equivalents - accounts_receivable).round(2)
+    fixed_assets = (total_assets - total_current_assets).round(2)
+    total_current_liabilities = np.minimum(
+        total_current_assets / rng.uniform(0.8, 3.0, n), total_liabilities * 0.9
+    ).round(2)
+    accounts_payable = (total_current_liabilities * 0.4).round(2)
+    short_term_debt = (total_current_liabilities - accounts_payable).round(2)
+    long_term_debt = (total_liabilities - total_current_liabilities).round(2)
+
+    operating_cash_flow = (net_income * rng.uniform(0.9, 1.4, n)).round(2)
+    investing_cash_flow = (-operating_cash_flow * rng.uniform(0.2, 0.6, n)).round(2)
+    financing_cash_flow = (-operating_cash_flow * rng.uniform(0.1, 0.4, n)).round(2)
+    net_cash_flow = (operating_cash_flow + investing_cash_flow + financing_cash_flow).round(2)
+
+    return grid.assign(
+        revenue=revenue,
+        cost_of_revenue=cost_of_revenue,
+        gross_profit=gross_profit,
+        operating_expenses=operating_expenses,
+        operating_income=operating_income,
+        interest_expense=interest_expense,
+        profit_before_tax=profit_before_tax,
+        net_income=net_income,
+        cash_equivalents=cash_equivalents,
+        accounts_receivable=accounts_receivable,
+        inventory=inventory,
+        total_current_assets=total_current_assets,
+        fixed_assets=fixed_assets,
+        total_assets=total_assets,
+        accounts_payable=accounts_payable,
+        short_term_debt=short_term_debt,
+        total_current_liabilities=total_current_liabilities,
+        long_term_debt=long_term_debt,
+        total_liabilities=total_liabilities,
+        total_equity=total_equity,
+        operating_cash_flow=operating_cash_flow,
+        investing_cash_flow=investing_cash_flow,
+        financing_cash_flow=financing_cash_flow,
+        net_cash_flow=net_cash_flow,
+        current_ratio=(total_current_assets / total_current_liabilities).round(2),
+        debt_to_equity=(total_liabilities / total_equity).round(2),
+        return_on_equity=(net_income / total_equity * 100).round(2),
+        return_on_assets=(net_income / total_assets * 100).round(2),
+        profit_margin=(net_income / revenue * 100).round(2),
+    )
+
+
+def _walk(rng, n, start, step, low, high):
+    """Bounded random walk used for macro series"""
+    return np.clip(start + np.cumsum(rng.normal(0, step, n)), low, high).round(2)
+
+
+def generate_macro(rng, years, end_date=None):
+    """Monthly macro indicators inside the validator's historical ranges"""
+    dates = pd.date_range(end=pd.Timestamp(end_date or date.today()), periods=int(years * 12), freq="MS")
+    n = len(dates)
+    etb_usd = _walk(rng, n, 55, 0.8, 25, 145)
+    exports = _walk(rng, n, 450, 15, 200, 900)
+    imports = _walk(rng, n, 1250, 30, 600, 2500)
+    return pd.DataFrame({
+        "date": dates.date,
+        "gdp_growth": _walk(rng, n, 6.5, 0.2, -5, 14),
+        "inflation_rate": _walk(rng, n, 20, 0.6, 1, 45),
+        "food_inflation": _walk(rng, n, 24, 0.8, 1, 60),
+        "interest_rate": _walk(rng, n, 7, 0.15, 1, 18),
+        "exports": exports,
+        "imports": imports,
+        "trade_balance": (exports - imports).round(2),
+        "fx_reserves": _walk(rng, n, 2500, 60, 1100, 9500),
+        "etb_usd": etb_usd,
+        "etb_eur": (etb_usd * 1.08).round(4),
+        "etb_gbp": (etb_usd * 1.27).round(4),
+        "etb_jpy": (etb_usd / 150).round(4),
+        "total_deposits": _walk(rng, n, 1.45e6, 1e4, 1e6, 5e6),
+        "total_loans": _walk(rng, n, 8.5e5, 8e3, 5e5, 4e6),
+        "npl_ratio": _walk(rng, n, 3.4, 0.1, 0.5, 12),
+        "money_supply_m1": _walk(rng, n, 9.5e5, 8e3, 5e5, 4e6),
+        "money_supply_m2": _walk(rng, n, 1.85e6, 1.5e4, 1e6, 8e6),
+    })
+
+
+def generate_news(rng, companies, per_company, days):
+    """News items spread over the bar history"""
+    n = len(companies) * per_company
+    if n == 0:
+        return pd.DataFrame(columns=["company_id", "title", "content", "source", "published_date", "category", "url"])
+    owners = np.repeat(np.arange(len(companies)), per_company)
+    names = companies["name"].to_numpy()[owners]
+    headline = rng.integers(0, len(NEWS_HEADLINES), n)
+    published = days.values[rng.integers(0, len(days), n)] + pd.to_timedelta(rng.integers(6, 18, n), unit="h").values
+    titles = [NEWS_HEADLINES[h].format(name=name) for h, name in zip(headline, names)]
+    return pd.DataFrame({
+        "company_id": companies["id"].to_numpy()[owners],
+        "title": titles,
+        "content": [f"{title}. Synthetic article generated for load testing." for title in titles],
+        "source": "Synthetic Wire",
+        "published_date": published,
+        "category": np.array(NEWS_CATEGORIES)[rng.integers(0, len(NEWS_CATEGORIES), n)],
+        "url": [f"https://news.example.com/{i}" for i in range(n)],
+    })
+
+
+class FileSink:
+    """Writes each dataset to CSV or Parquet files, appending bar blocks"""
+
+    def __init__(self, out_dir, file_format):
+        self.out_dir = out_dir
+        self.file_format = file_format
+        self._writers = {}
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.out_dir, f"{name}.{self.file_format}")
+
+    def write(self, name, df):
+        if self.file_format == "parquet":
+            self._write_parquet(name, df)
+        else:
+            path = self._path(name)
+            first = name not in self._writers
+            df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+            self._writers[name] = path
+
+    def _write_parquet(self, name, df):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Parquet output requires pyarrow (pip install pyarrow)")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if name not in self._writers:
+            self._writers[name] = pq.ParquetWriter(self._path(name), table.schema, compression="zstd")
+        self._writers[name].write_table(table)
+
+    def close(self):
+        for writer in self._writers.values():
+            if hasattr(writer, "close"):
+                writer.close()
+
+
+class DatabaseSink:
+    """Bulk-inserts datasets into the application database"""
+
+    TABLES = {
+        "companies": "company",
+        "stocks": "stock",
+        "financials": "financials",
+        "macro": "macro_indicators",
+        "news": "company_news",
+    }
+
+    def __init__(self, app):
+        from api.models.models import db
+
+        self.app = app
+        self.db = db
+        self._context = app.app_context()
+        self._context.push()
+        db.create_all()
+        self.connection = db.engine.raw_connection()
+        self.touched = {}
+
+    def write(self, name, df):
+        # Store dates the way SQLAlchemy does on SQLite (ISO text), vectorized
+        df = df.copy()
+        for column in df.columns:
+            if df[column].dtype.kind == "M":
+                values = df[column].to_numpy()
+                if (values == values.astype("datetime64[D]")).all():
+                    df[column] = np.datetime_as_string(values, unit="D")
+                else:
+                    df[column] = np.char.replace(np.datetime_as_string(values, unit="us"), "T", " ")
+        df = df.astype(object).where(df.notna(), None)
+        columns = ", ".join(df.columns)
+        placeholders = ", ".join("?" for _ in df.columns)
+        self.connection.cursor().executemany(
+            f"INSERT INTO {self.TABLES[name]} ({columns}) VALUES ({placeholders})",
+            df.itertuples(index=False, name=None),
+        )
+        self.connection.commit()
+        if "company_id" in df.columns:
+            self.touched.setdefault(name, set()).update(df["company_id"].unique().tolist())
+
+    def close(self):
+        from api.utils.refresh import IngestionEvent, publish_ingestion
+
+        self.connection.close()
+        for dataset, company_ids in self.touched.items():
+            publish_ingestion(IngestionEvent(dataset, company_ids))
+        publish_ingestion(IngestionEvent("macro"))
+        self._context.pop()
+
+
+def first_company_id(app):
+    """Next free company id, so generated data never collides with real rows"""
+    from sqlalchemy import func
+    from api.models.models import db, Company
+
+    with app.app_context():
+        db.create_all()
+        return (db.session.query(func.max(Company.id)).scalar() or 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic market data for load testing")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--years", type=float, default=5, help="years of daily bars and macro history")
+    parser.add_argument("--news-per-company", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", help="last trading day (YYYY-MM-DD, default today)")
+    parser.add_argument("--format", choices=["db", "csv", "parquet"], default="parquet")
+    parser.add_argument("--out-dir", default="synthetic_data")
+    parser.add_argument("--block-size", type=int, default=500,
+                        help="companies generated per block; bounds memory use")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    days = trading_days(args.years, args.end_date)
+    years = sorted(set(days.year))
+
+    if args.format == "db":
+        from app import create_app
+
+        app = create_app()
+        companies = generate_companies(rng, args.companies, first_company_id(app))
+        sink = DatabaseSink(app)
+    else:
+        companies = generate_companies(rng, args.companies)
+        sink = FileSink(args.out_dir, args.format)
+
+    print(f"🚀 Generating {args.companies} companies x {len(days)} trading days "
+          f"({args.companies * len(days):,} bars)")
+    started = time.perf_counter()
+
+    try:
+        sink.write("companies", companies)
+        company_ids = companies["id"].to_numpy()
+        for start in range(0, len(company_ids), args.block_size):
+            block = company_ids[start:start + args.block_size]
+            sink.write("stocks", generate_bars(rng, block, days))
+            sink.write("financials", generate_financials(rng, block, years))
+        sink.write("macro", generate_macro(rng, args.years, args.end_date))
+        sink.write("news", generate_news(rng, companies, args.news_per_company, days))
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Done in {elapsed:.1f}s ({args.companies * len(days) / elapsed:,.0f} bars/s)")
+
+
+if __name__ == "__main__":
+    main()
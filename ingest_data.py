@@ -1,3 +1,5 @@
+# Deprecated: creates tables that do not match the models; use
+# `python bootstrap_db.py init --seed Data` instead.
 import pandas as pd
 import sqlite3
 
@@ -0,0 +1,55 @@
+"""Drop-folder ingestion service.
+
+Watches a directory for end-of-day stock, financial, macro and news CSV files
+and loads each one as soon as it has finished arriving:
+
+    python ingest_watch.py                    # watch Config.INGEST_WATCH_DIR
+    python ingest_watch.py --dir /data/eod    # watch another directory
+    python ingest_watch.py --once             # load what is there and exit
+"""
+import argparse
+import logging
+
+from app import create_app
+from api.utils.watcher import DropFolderWatcher
+
+
+def main():
+    app = create_app()
+
+    parser = argparse.ArgumentParser(description="Watch a folder and ingest market data files")
+    parser.add_argument("--dir", default=app.config["INGEST_WATCH_DIR"],
+                        help="directory to watch")
+    parser.add_argument("--poll-interval", type=float, default=app.config["INGEST_POLL_INTERVAL"],
+                        help="seconds between checks for settled files")
+    parser.add_argument("--debounce", type=float, default=app.config["INGEST_DEBOUNCE_SECONDS"],
+                        help="seconds a file must stay unchanged before it is loaded")
+    parser.add_argument("--polling", action="store_true",
+                        help="scan the directory instead of using inotify")
+    parser.add_argument("--once", action="store_true",
+                        help="ingest the files currently in the directory and exit")
+    args = parser.parse_args()
+
+    watcher = DropFolderWatcher(
+        app,
+        args.dir,
+        poll_interval=args.poll_interval,
+        debounce=args.debounce,
+        use_inotify=not args.polling,
+    )
+
+    print(f"🚀 Ingesting files from {watcher.watch_dir}")
+    if args.once:
+        watcher.run_once()
+        print("✅ Drop folder drained")
+        return
+
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logging.info("Ingestion service stopped")
+        print("👋 Ingestion service stopped")
+
+
+if __name__ == "__main__":
+    main()
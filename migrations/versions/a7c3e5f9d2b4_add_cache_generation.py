@@ -0,0 +1,30 @@
+"""add cache generation counters shared across processes
+
+Revision ID: a7c3e5f9d2b4
+Revises: f2a9c4e7b1d8
+Create Date: 2026-10-19 17:12:44.902316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e5f9d2b4'
+down_revision = 'f2a9c4e7b1d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_generation',
+    sa.Column('namespace', sa.String(length=50), nullable=False),
+    sa.Column('scope', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('namespace', 'scope'),
+    sqlite_with_rowid=False
+    )
+
+
+def downgrade():
+    op.drop_table('cache_generation')
@@ -0,0 +1,50 @@
+"""add ingested file ledger and upsert keys
+
+Revision ID: b7d2e4f1a9c3
+Revises: 6ea04d361463
+Create Date: 2026-10-19 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f1a9c3'
+down_revision = '6ea04d361463'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ingested_file',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('dataset', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows_loaded', sa.Integer(), nullable=True),
+    sa.Column('rows_rejected', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('ingested_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingested_file_sha256', 'ingested_file', ['sha256'], unique=True)
+    op.create_index('ix_ingested_file_dataset', 'ingested_file', ['dataset'], unique=False)
+    op.create_index('ix_ingested_file_ingested_at', 'ingested_file', ['ingested_at'], unique=False)
+
+    # The models declare these natural keys but the initial migration did not
+    # create them; the ingestion upserts (ON CONFLICT) depend on them
+    op.create_index('unique_stock_date', 'stock', ['company_id', 'date'], unique=True)
+    op.create_index('unique_financial_period', 'financials', ['company_id', 'year', 'period'], unique=True)
+    op.create_index('unique_macro_date', 'macro_indicators', ['date'], unique=True)
+
+
+def downgrade():
+    op.drop_index('unique_macro_date', table_name='macro_indicators')
+    op.drop_index('unique_financial_period', table_name='financials')
+    op.drop_index('unique_stock_date', table_name='stock')
+    op.drop_index('ix_ingested_file_ingested_at', table_name='ingested_file')
+    op.drop_index('ix_ingested_file_dataset', table_name='ingested_file')
+    op.drop_index('ix_ingested_file_sha256', table_name='ingested_file')
+    op.drop_table('ingested_file')
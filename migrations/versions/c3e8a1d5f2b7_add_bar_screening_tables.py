@@ -0,0 +1,62 @@
+"""add bar screening state and quarantine tables
+
+Revision ID: c3e8a1d5f2b7
+Revises: b7d2e4f1a9c3
+Create Date: 2026-10-19 15:02:17.530418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a1d5f2b7'
+down_revision = 'b7d2e4f1a9c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bar_stats',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('last_date', sa.Date(), nullable=True),
+    sa.Column('last_close', sa.Float(), nullable=True),
+    sa.Column('pending_close', sa.Float(), nullable=True),
+    sa.Column('return_mean', sa.Float(), nullable=True),
+    sa.Column('return_var', sa.Float(), nullable=True),
+    sa.Column('volume_mean', sa.Float(), nullable=True),
+    sa.Column('observations', sa.Integer(), nullable=True),
+    sa.Column('repeats', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id')
+    )
+    op.create_table('quarantined_bar',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('open', sa.Float(precision=2), nullable=True),
+    sa.Column('close', sa.Float(precision=2), nullable=True),
+    sa.Column('high', sa.Float(precision=2), nullable=True),
+    sa.Column('low', sa.Float(precision=2), nullable=True),
+    sa.Column('volume', sa.Integer(), nullable=True),
+    sa.Column('reasons', sa.String(length=100), nullable=False),
+    sa.Column('return_z', sa.Float(), nullable=True),
+    sa.Column('source', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_quarantined_bar_company_id', 'quarantined_bar', ['company_id'], unique=False)
+    op.create_index('ix_quarantined_bar_status', 'quarantined_bar', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_quarantined_bar_status', table_name='quarantined_bar')
+    op.drop_index('ix_quarantined_bar_company_id', table_name='quarantined_bar')
+    op.drop_table('quarantined_bar')
+    op.drop_table('bar_stats')
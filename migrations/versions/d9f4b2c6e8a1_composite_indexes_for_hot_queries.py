@@ -0,0 +1,54 @@
+"""composite indexes for hot query shapes
+
+Revision ID: d9f4b2c6e8a1
+Revises: c3e8a1d5f2b7
+Create Date: 2026-10-19 15:40:06.284917
+
+Designed from EXPLAIN QUERY PLAN of the endpoint queries (see
+check_query_plans.py):
+
+- stock: unique_stock_date (company_id, date) already serves every
+  per-company range / latest-bar query; ix_stock_date is kept (and created
+  on databases built from the initial migration) for market-wide MAX(date)
+  and trading calendar lookups.
+- financials: (company_id, period, year) serves the latest-annual and
+  year-over-year lookups; the single-column year / period indexes are never
+  chosen for company-scoped queries and are dropped.
+- company_news: (company_id, published_date) replaces the published_date
+  index.
+- macro_indicators: ix_macro_indicators_date duplicates unique_macro_date.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f4b2c6e8a1'
+down_revision = 'c3e8a1d5f2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Indexes declared with index=True may or may not exist depending on
+    # whether the database was built by create_all() or the migrations
+    op.execute('CREATE INDEX IF NOT EXISTS ix_stock_date ON stock (date)')
+    op.create_index('ix_financials_company_period_year', 'financials', ['company_id', 'period', 'year'], unique=False)
+    op.create_index('ix_company_news_company_published', 'company_news', ['company_id', 'published_date'], unique=False)
+
+    op.execute('DROP INDEX IF EXISTS ix_financials_year')
+    op.execute('DROP INDEX IF EXISTS ix_financials_period')
+    op.execute('DROP INDEX IF EXISTS ix_company_news_published_date')
+    op.execute('DROP INDEX IF EXISTS ix_macro_indicators_date')
+    op.execute('ANALYZE')
+
+
+def downgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_macro_indicators_date ON macro_indicators (date)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_company_news_published_date ON company_news (published_date)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_financials_period ON financials (period)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_financials_year ON financials (year)')
+
+    op.drop_index('ix_company_news_company_published', table_name='company_news')
+    op.drop_index('ix_financials_company_period_year', table_name='financials')
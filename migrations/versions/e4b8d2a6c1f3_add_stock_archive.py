@@ -0,0 +1,45 @@
+"""add stock archive and archive run tables
+
+Revision ID: e4b8d2a6c1f3
+Revises: d9f4b2c6e8a1
+Create Date: 2026-10-19 15:41:08.214963
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2a6c1f3'
+down_revision = 'd9f4b2c6e8a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_archive',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('open', sa.Float(precision=2), nullable=True),
+    sa.Column('close', sa.Float(precision=2), nullable=True),
+    sa.Column('high', sa.Float(precision=2), nullable=True),
+    sa.Column('low', sa.Float(precision=2), nullable=True),
+    sa.Column('volume', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'date'),
+    sqlite_with_rowid=False
+    )
+    op.create_table('stock_archive_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cutoff', sa.Date(), nullable=False),
+    sa.Column('rows_archived', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('stock_archive_run')
+    op.drop_table('stock_archive')
@@ -0,0 +1,50 @@
+"""company audit indexes for the audit query API
+
+Revision ID: f2a9c4e7b1d8
+Revises: e4b8d2a6c1f3
+Create Date: 2026-10-19 16:02:37.540218
+
+The /audit endpoints filter by company or user and page newest first by
+(timestamp, id). Each index ends in timestamp and, being on a rowid table,
+implicitly in id, so a page is an index seek plus LIMIT rows whatever the
+size of the table. ix_company_audit_timestamp serves unfiltered and
+action-only queries.
+
+No earlier revision creates company_audit (databases built with
+create_all() have it), so it is created here when missing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c4e7b1d8'
+down_revision = 'e4b8d2a6c1f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('company_audit'):
+        op.create_table('company_audit',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_company_audit_company_timestamp', 'company_audit', ['company_id', 'timestamp'], unique=False)
+    op.create_index('ix_company_audit_user_timestamp', 'company_audit', ['user_id', 'timestamp'], unique=False)
+    op.create_index('ix_company_audit_timestamp', 'company_audit', ['timestamp'], unique=False)
+    op.execute('ANALYZE company_audit')
+
+
+def downgrade():
+    op.drop_index('ix_company_audit_timestamp', table_name='company_audit')
+    op.drop_index('ix_company_audit_user_timestamp', table_name='company_audit')
+    op.drop_index('ix_company_audit_company_timestamp', table_name='company_audit')
@@ -0,0 +1,90 @@
+"""Shared fixtures: an app on a scratch SQLite file seeded with a few companies"""
+import time
+from datetime import date
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import Config, create_app
+from api.models.models import db, Company, User
+from api.utils.query_stats import assert_max_queries
+
+COMPANIES = [
+    ("WGB", "Wegagen Bank"),
+    ("ETC", "Ethio Telecom"),
+    ("CBE", "Commercial Bank of Ethiopia"),
+    ("DAS", "Dashen Bank"),
+    ("AWB", "Awash Bank"),
+]
+
+
+@pytest.fixture
+def config(tmp_path):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        RATELIMIT_ENABLED = False
+        ANALYTICS_ENABLED = False
+        ANALYTICS_DIR = str(tmp_path / "analytics")
+        QUERY_STATS_HEADERS = True
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+        EXPORT_FOLDER = str(tmp_path / "exports")
+        INGEST_WATCH_DIR = str(tmp_path / "incoming")
+
+    return TestConfig
+
+
+@pytest.fixture
+def app(config):
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        for company_id, (ticker, name) in enumerate(COMPANIES, 1):
+            db.session.add(Company(
+                id=company_id, ticker=ticker, name=name, industry="Banking", sector="Financials",
+                established_date=date(1990, 1, 1),
+            ))
+        db.session.add(User(id=1, username="admin", email="admin@example.com", password="secret", role="admin"))
+        db.session.add(User(id=2, username="analyst", email="analyst@example.com", password="secret", role="user"))
+        db.session.commit()
+    yield app
+    # The audit queue flushes through the writer, so it stops first
+    for name in ("audit_queue", "write_queue"):
+        if name in app.extensions:
+            app.extensions[name].stop()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+
+@pytest.fixture
+def user_headers(app):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='2')}"}
+
+
+@pytest.fixture
+def max_queries():
+    """Query budget for a block: ``with max_queries(3): client.get(url)``"""
+    return assert_max_queries
+
+
+@pytest.fixture
+def poll(client):
+    """GET a background job's status URL until it leaves queued/running"""
+    def poll(url, headers=None, timeout=10, client=client):
+        deadline = time.monotonic() + timeout
+        while True:
+            body = client.get(url, headers=headers).get_json()
+            if body["status"] not in ("queued", "running") or time.monotonic() > deadline:
+                return body
+            time.sleep(0.05)
+    return poll
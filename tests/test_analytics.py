@@ -0,0 +1,96 @@
+"""DuckDB/Parquet mirror: analytical endpoints answer the same as on SQLite"""
+from datetime import date, timedelta
+
+import pytest
+
+from api.models.models import db, Stock
+from api.utils.analytics import get_store, run_query
+from api.utils.cache import cache
+from api.utils.ingestion import ingest_file
+
+pytest.importorskip("duckdb")
+
+END = date(2025, 4, 30)
+ENDPOINTS = [
+    "/api/v1/market/trends?days=20",
+    "/api/v1/market/sectors?days=20",
+    "/api/v1/market/correlations?tickers=WGB,ETC,CBE&days=20",
+]
+
+
+@pytest.fixture
+def config(config, tmp_path):
+    class AnalyticsConfig(config):
+        ANALYTICS_ENABLED = True
+        ANALYTICS_DIR = str(tmp_path / "analytics")
+
+    return AnalyticsConfig
+
+
+@pytest.fixture
+def bars(app):
+    """Three companies with different trends over five weeks"""
+    with app.app_context():
+        for offset in range(35):
+            day = END - timedelta(days=34 - offset)
+            for company_id, step in ((1, 0.1), (2, -0.05), (3, 0.02 * (-1) ** offset)):
+                close = round(10 + step * offset, 2)
+                db.session.add(Stock(company_id=company_id, date=day, open=close, high=close + 0.2,
+                                     low=close - 0.2, close=close, volume=1000 + offset))
+        db.session.commit()
+
+
+def responses(client):
+    return [client.get(url).get_json() for url in ENDPOINTS]
+
+
+def rebuild(app):
+    store = app.extensions["analytics"]
+    with app.app_context():
+        return store.rebuild(db.engine.url.database)
+
+
+def test_mirror_answers_like_sqlite(app, client, bars):
+    with app.app_context():
+        assert get_store() is None
+    on_sqlite = responses(client)
+
+    assert rebuild(app) == 3 * 35
+    with app.app_context():
+        assert get_store() is not None
+        # The data did not change, so the cached responses would still be served
+        cache.clear()
+    on_duckdb = responses(client)
+
+    assert on_duckdb == on_sqlite
+    assert len(on_sqlite[0]["trends"]) == 21
+    assert [s["companies"] for s in on_sqlite[1]["sectors"]] == [3]
+
+
+def test_run_query_dates_and_params(app, bars):
+    sql = (
+        "SELECT company_id, COUNT(*) AS bars, MAX(close) AS top FROM stock "
+        "WHERE date >= $start GROUP BY company_id ORDER BY company_id"
+    )
+    params = {"start": (END - timedelta(days=9)).isoformat()}
+    with app.app_context():
+        on_sqlite = run_query(sql, params)
+    rebuild(app)
+    with app.app_context():
+        on_duckdb = run_query(sql, params)
+
+    assert on_sqlite.astype(float).values.tolist() == on_duckdb.astype(float).values.tolist()
+    assert on_sqlite["bars"].tolist() == [10, 10, 10]
+
+
+def test_ingestion_refreshes_the_mirror(app, bars, tmp_path):
+    rebuild(app)
+    path = tmp_path / "bars.csv"
+    path.write_text(f"ticker,date,open,high,low,close,volume\nWGB,{END},13.3,13.6,13.1,13.5,900\n")
+
+    with app.app_context():
+        assert ingest_file(str(path))["rows_loaded"] == 1
+        frame = run_query("SELECT close, volume FROM stock WHERE company_id = 1 AND date = $day",
+                          {"day": END.isoformat()})
+
+    assert frame.values.tolist() == [[13.5, 900]]
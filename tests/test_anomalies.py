@@ -0,0 +1,103 @@
+"""Ingest-time bar screening, the quarantine and its review"""
+from datetime import date, timedelta
+
+import pytest
+
+from api.models.models import db, QuarantinedBar, Stock
+from api.utils import anomalies
+from api.utils.ingestion import ingest_file
+
+START = date(2025, 1, 1)
+CLEAN_BARS = 30
+
+
+def bar_line(day, close, volume=1000):
+    return f"WGB,{START + timedelta(days=day)},{close},{close + 0.5},{close - 0.5},{close},{volume}\n"
+
+
+@pytest.fixture
+def bars_file(tmp_path):
+    """Thirty calm bars, then a close five times the last one"""
+    lines = [bar_line(day, 10 + 0.1 * (day % 5)) for day in range(CLEAN_BARS)]
+    lines.append(bar_line(CLEAN_BARS, 50))
+    path = tmp_path / "bars.csv"
+    path.write_text("ticker,date,open,high,low,close,volume\n" + "".join(lines))
+    return str(path)
+
+
+@pytest.fixture
+def events(monkeypatch):
+    published = []
+    monkeypatch.setattr(anomalies, "publish_ingestion", published.append)
+    return published
+
+
+def outlier_date():
+    return START + timedelta(days=CLEAN_BARS)
+
+
+def test_outlier_is_quarantined_and_clean_bars_load(app, bars_file):
+    with app.app_context():
+        result = ingest_file(bars_file)
+
+        assert (result["rows_loaded"], result["rows_quarantined"]) == (CLEAN_BARS, 1)
+        assert Stock.query.count() == CLEAN_BARS
+        assert Stock.query.filter_by(date=outlier_date()).count() == 0
+        bar = QuarantinedBar.query.one()
+        assert (bar.date, bar.close, bar.status) == (outlier_date(), 50, "pending")
+        assert "return_outlier" in bar.reasons.split(",")
+
+
+def test_missing_volume_is_screened_not_an_error():
+    state = anomalies._new_state(1)
+    assert anomalies.check_bar(state, START, 10, 11, 9, 10.5, None) == ([], None)
+    assert anomalies.check_bar(state, START + timedelta(days=1), 10, 11, 9, 10.5, float("nan")) == ([], None)
+    assert anomalies.check_bar(state, START + timedelta(days=2), 10, 11, 9, 10.5, -1)[0] == ["ohlc_inconsistent"]
+
+
+def test_approve_upserts_the_bar_and_publishes(app, client, admin_headers, bars_file, events):
+    with app.app_context():
+        ingest_file(bars_file)
+        bar_id = QuarantinedBar.query.one().id
+
+    response = client.post(f"/api/v1/admin/quarantine/{bar_id}/approve", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "approved"
+    with app.app_context():
+        assert Stock.query.filter_by(company_id=1, date=outlier_date()).one().close == 50
+    assert [(e.dataset, e.company_ids, e.date_from) for e in events] == [("stocks", [1], outlier_date())]
+    again = client.post(f"/api/v1/admin/quarantine/{bar_id}/approve", headers=admin_headers)
+    assert again.status_code == 409
+
+
+def test_reject_leaves_stock_untouched(app, client, admin_headers, bars_file, events):
+    with app.app_context():
+        ingest_file(bars_file)
+        bar_id = QuarantinedBar.query.one().id
+
+    response = client.post(f"/api/v1/admin/quarantine/{bar_id}/reject", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "rejected"
+    with app.app_context():
+        assert Stock.query.count() == CLEAN_BARS
+        assert db.session.get(QuarantinedBar, bar_id).reviewed_by == 1
+    assert events == []
+    assert client.post("/api/v1/admin/quarantine/999/reject", headers=admin_headers).status_code == 404
+
+
+def test_xlsx_without_volumes_loads(app, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["ticker", "date", "open", "high", "low", "close", "volume"])
+    for day in range(3):
+        close = 10 + 0.1 * day
+        sheet.append(["WGB", START + timedelta(days=day), close, close + 0.5, close - 0.5, close, None])
+    path = tmp_path / "bars.xlsx"
+    workbook.save(path)
+
+    with app.app_context():
+        assert ingest_file(str(path))["rows_loaded"] == 3
+        assert [bar.volume for bar in Stock.query.all()] == [None, None, None]
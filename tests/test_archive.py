@@ -0,0 +1,93 @@
+"""Archived daily bars read back transparently across the cutoff"""
+from datetime import date, timedelta
+
+import pytest
+
+from api.models.models import db, Stock, StockArchive
+from api.utils.archive import archive_bars
+from api.utils.cache import cache
+from api.utils.ingestion import ingest_file
+
+TODAY = date.today()
+FIRST_DAY = TODAY - timedelta(days=59)
+CUTOFF = TODAY - timedelta(days=19)
+
+
+@pytest.fixture
+def bars(app):
+    """Sixty days of bars for WGB and ETC; ETC stopped trading before the cutoff"""
+    with app.app_context():
+        for offset in range(60):
+            day = FIRST_DAY + timedelta(days=offset)
+            close = round(10 + 0.1 * offset + 0.3 * (offset % 4), 2)
+            db.session.add(Stock(company_id=1, date=day, open=close - 0.2, high=close + 0.5,
+                                 low=close - 0.5, close=close, volume=1000 + offset))
+            if offset < 30:
+                db.session.add(Stock(company_id=2, date=day, open=20.0, high=21.0, low=19.0,
+                                     close=20.0 + offset % 2, volume=500))
+        db.session.commit()
+
+
+def archive(app):
+    with app.app_context():
+        run = archive_bars(CUTOFF)
+        # Archiving does not change the data, so cached responses stay valid;
+        # drop them to read through the archive
+        cache.clear()
+        return run.rows_archived
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/stocks/1",
+    "/api/v1/stocks/1?interval=weekly",
+    "/api/v1/stocks/1?interval=monthly",
+    f"/api/v1/stocks/1?start_date={TODAY - timedelta(days=40)}&end_date={TODAY - timedelta(days=10)}",
+    "/api/v1/stocks/1?sort=desc&limit=25",
+    "/api/v1/stocks/1/summary",
+    "/api/v1/stocks/1/latest",
+    "/api/v1/stocks/2/latest",
+])
+def test_reads_are_unchanged_by_archiving(app, client, bars, url):
+    before = get(client, url)
+
+    assert archive(app) == 40 + 30
+    assert get(client, url) == before
+
+
+def test_archived_bars_are_in_the_archive(app, bars):
+    archive(app)
+    with app.app_context():
+        assert Stock.query.filter(Stock.date < CUTOFF).count() == 0
+        assert StockArchive.query.filter_by(company_id=1).count() == 40
+
+
+def test_reingested_bar_shadows_its_archived_copy(app, client, bars, tmp_path):
+    archive(app)
+    day = CUTOFF - timedelta(days=5)
+    path = tmp_path / "bars.csv"
+    path.write_text(f"ticker,date,open,high,low,close,volume\nWGB,{day},13,14,12.5,13.5,777\n")
+    with app.app_context():
+        assert ingest_file(str(path))["rows_loaded"] == 1
+
+    data = get(client, f"/api/v1/stocks/1?start_date={day}&end_date={day}")["data"]
+    assert [(bar["close"], bar["volume"]) for bar in data] == [(13.5, 777)]
+    assert len(get(client, "/api/v1/stocks/1")["data"]) == 60
+
+
+def test_summary_reads_archived_days_in_its_window(app, client, bars):
+    archive(app)
+
+    summary = get(client, "/api/v1/stocks/1/summary")["summary"]
+
+    # The 30-day window starts eleven days before the cutoff
+    with app.app_context():
+        window_start = TODAY - timedelta(days=30)
+        archived = StockArchive.query.filter(StockArchive.company_id == 1, StockArchive.date >= window_start)
+        hot = Stock.query.filter_by(company_id=1)
+        assert summary["volume_30d"] == sum(b.volume for b in archived) + sum(b.volume for b in hot)
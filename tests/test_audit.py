@@ -0,0 +1,76 @@
+"""Company audit log: rows follow committed changes only; keyset paging"""
+from datetime import datetime, timedelta
+
+from api.models.models import db, CompanyAudit
+from api.utils import audit
+from api.utils.writer import WriteTimeout
+
+
+def audit_actions(app, company_id):
+    # Queued rows and jobs are written when the threads stop
+    for name in ("audit_queue", "write_queue"):
+        app.extensions[name].stop()
+    with app.app_context():
+        return [a for (a,) in db.session.query(CompanyAudit.action).filter_by(company_id=company_id)]
+
+
+def test_update_is_audited_after_commit(app, client, admin_headers):
+    response = client.put("/api/v1/companies/1", json={"name": "Wegagen"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert audit_actions(app, 1) == ["UPDATE"]
+
+
+def test_failed_update_leaves_no_audit_row(app, client, admin_headers):
+    response = client.put("/api/v1/companies/1", json={"name": None}, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert audit_actions(app, 1) == []
+
+
+def test_full_queue_writes_the_row_on_its_own(app, client, admin_headers, monkeypatch):
+    monkeypatch.setattr(app.extensions["audit_queue"], "record", lambda row: False)
+    response = client.put("/api/v1/companies/1", json={"name": "Wegagen"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert audit_actions(app, 1) == ["UPDATE"]
+
+
+def test_failed_flush_is_retried(app, client, admin_headers, monkeypatch):
+    write, failures = audit.write, [WriteTimeout(), WriteTimeout()]
+
+    def busy_writer(fn, *args):
+        if failures:
+            raise failures.pop()
+        return write(fn, *args)
+
+    monkeypatch.setattr(audit, "write", busy_writer)
+    monkeypatch.setattr(audit, "FLUSH_RETRY_DELAYS", (0, 0, 0))
+    response = client.put("/api/v1/companies/1", json={"name": "Wegagen"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert audit_actions(app, 1) == ["UPDATE"]
+    stats = app.extensions["audit_queue"].stats()
+    assert (stats["retries"], stats["written"], stats["failed"]) == (2, 1, 0)
+
+
+def test_audit_pages_by_cursor(app, client, admin_headers, user_headers):
+    start = datetime(2025, 1, 1)
+    with app.app_context():
+        # Two rows share a timestamp, so the id breaks the tie
+        for minute in (0, 1, 1, 2, 3):
+            db.session.add(CompanyAudit(
+                company_id=1, action="UPDATE", user_id=1, details={}, timestamp=start + timedelta(minutes=minute),
+            ))
+        db.session.commit()
+
+    pages, url = [], "/api/v1/audit?company_id=1&limit=2"
+    while url:
+        body = client.get(url, headers=admin_headers).get_json()
+        pages.append([row["id"] for row in body["data"]])
+        cursor = body["metadata"]["next_cursor"]
+        url = f"/api/v1/audit?company_id=1&limit=2&cursor={cursor}" if cursor else None
+
+    assert pages == [[5, 4], [3, 2], [1]]
+    assert client.get("/api/v1/audit", headers=user_headers).status_code == 403
+    assert client.get("/api/v1/audit?cursor=nope", headers=admin_headers).status_code == 400
@@ -0,0 +1,109 @@
+"""bootstrap_db.py: canonical schema, seeding, snapshots and restores"""
+import sqlite3
+from argparse import Namespace
+
+import pytest
+
+import bootstrap_db
+from app import create_app
+from api.models.models import db, Company, Stock
+from api.utils.snapshots import create_snapshot, restore_snapshot, schema_revision
+
+
+def count(path, table):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def fresh(config, tmp_path):
+    """An app on an empty database file that init may replace"""
+    path = tmp_path / "fresh.db"
+    app = create_app(type("FreshConfig", (config,), {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"}))
+    yield app, str(path)
+    app.extensions["write_queue"].stop()
+
+
+def test_init_stamps_head_and_seeds_in_dependency_order(fresh, tmp_path):
+    app, path = fresh
+    seed_dir = tmp_path / "seed"
+    seed_dir.mkdir()
+    # Sorted by name the bars come first; they must still load after their company
+    (seed_dir / "a_bars.csv").write_text(
+        "ticker,date,open,high,low,close,volume\nNEW,2025-04-10,10,11,9,10.5,100\n"
+    )
+    (seed_dir / "b_companies.csv").write_text("ticker,name,industry\nNEW,New Company,Banking\n")
+    (seed_dir / "notes.txt").write_text("not data")
+
+    with app.app_context():
+        bootstrap_db.init(app, path, Namespace(seed=str(seed_dir), force=False))
+        head = bootstrap_db.migration_head(app)
+        assert Stock.query.join(Company).filter(Company.ticker == "NEW").count() == 1
+
+    assert schema_revision(path) == head
+
+
+def test_init_refuses_to_replace_a_database(app, config):
+    path = config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")
+    with app.app_context(), pytest.raises(SystemExit):
+        bootstrap_db.init(app, path, Namespace(seed=None, force=False))
+    assert count(path, "company") == 5
+
+
+def test_snapshot_is_one_consistent_file(app, config, tmp_path):
+    path = config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")
+    snapshot = tmp_path / "snapshots" / "market.db"
+    snapshot.parent.mkdir()
+
+    create_snapshot(path, str(snapshot))
+
+    assert count(str(snapshot), "company") == 5
+    connection = sqlite3.connect(snapshot)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    connection.close()
+    assert sorted(p.name for p in snapshot.parent.iterdir()) == ["market.db"]
+    # create_all does not stamp a revision
+    assert schema_revision(str(snapshot)) is None
+
+
+def test_restore_round_trip(tmp_path, app, config):
+    path = config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")
+    snapshot = str(tmp_path / "market.db")
+    create_snapshot(path, snapshot)
+
+    target = str(tmp_path / "restored.db")
+    restore_snapshot(snapshot, target)
+    assert count(target, "company") == 5
+    assert count(target, "user") == 2
+
+
+def test_live_restore_is_seen_by_open_connections(app, client, admin_headers, config, tmp_path):
+    path = config.SQLALCHEMY_DATABASE_URI.removeprefix("sqlite:///")
+    snapshot = str(tmp_path / "market.db")
+    create_snapshot(path, snapshot)
+    assert client.put("/api/v1/companies/1", json={"name": "Renamed"}, headers=admin_headers).status_code == 200
+
+    restore_snapshot(snapshot, path, live=True)
+
+    with app.app_context():
+        assert db.session.get(Company, 1).name == "Wegagen Bank"
+
+
+def test_restore_reports_a_stale_revision(fresh, tmp_path, capsys):
+    app, path = fresh
+    with app.app_context():
+        bootstrap_db.init(app, path, Namespace(seed=None, force=True))
+    snapshot = str(tmp_path / "old.db")
+    create_snapshot(path, snapshot)
+    connection = sqlite3.connect(snapshot)
+    connection.execute("UPDATE alembic_version SET version_num = 'abc123'")
+    connection.commit()
+    connection.close()
+
+    with app.app_context():
+        bootstrap_db.restore(app, path, Namespace(path=snapshot, live=True))
+
+    assert "at revision abc123" in capsys.readouterr().out
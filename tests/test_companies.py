@@ -0,0 +1,36 @@
+"""Company write endpoints: batch upsert"""
+from api.models.models import db, Company
+
+
+def test_batch_upsert_creates_updates_and_reports_invalid(app, client, admin_headers):
+    response = client.post("/api/v1/companies/batch", headers=admin_headers, json=[
+        {"name": "Bank of Abyssinia", "ticker": "BOA", "industry": "Banking", "established_date": "1996-02-15"},
+        {"name": "Wegagen Bank S.C.", "ticker": "WGB", "industry": "Banking"},
+        {"name": "No Ticker", "industry": "Banking"},
+    ])
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["counts"] == {"created": 1, "updated": 1, "invalid": 1}
+    assert [r["status"] for r in body["results"]] == ["created", "updated", "invalid"]
+    with app.app_context():
+        assert db.session.get(Company, 1).name == "Wegagen Bank S.C."
+        created = db.session.get(Company, body["company_ids"][0])
+        assert created.ticker == "BOA"
+        assert created.established_date.isoformat() == "1996-02-15"
+
+
+def test_batch_blank_established_date_is_a_per_item_error(app, client, admin_headers):
+    response = client.post("/api/v1/companies/batch", headers=admin_headers, json=[
+        {"name": "Bank of Abyssinia", "ticker": "BOA", "industry": "Banking", "established_date": ""},
+        {"name": "Zemen Bank", "ticker": "ZB", "industry": "Banking", "established_date": None},
+        {"name": "Nib Bank", "ticker": "NIB", "industry": "Banking"},
+    ])
+
+    assert response.status_code == 201
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == ["invalid", "invalid", "created"]
+    assert results[0]["errors"] == ["Invalid established_date format. Use YYYY-MM-DD"]
+    with app.app_context():
+        assert db.session.query(Company).filter_by(ticker="NIB").count() == 1
+        assert db.session.query(Company).filter_by(ticker="BOA").count() == 0
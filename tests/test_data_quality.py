@@ -0,0 +1,39 @@
+"""Data quality report over live and archived bars"""
+from datetime import date, timedelta
+
+from api.models.models import db, Stock
+from api.utils.archive import archive_bars
+from api.utils.data_quality import dataset_version, get_report
+
+
+def test_archived_bars_are_not_gaps(app):
+    start = date(2024, 1, 1)
+    with app.app_context():
+        for day in range(60):
+            db.session.add(Stock(
+                company_id=1, date=start + timedelta(days=day),
+                open=10 + day % 4, high=12 + day % 4, low=9 + day % 4, close=11 + day % 4, volume=1000,
+            ))
+        db.session.commit()
+        before = get_report()
+        version = dataset_version()
+
+        archive_bars(date(2024, 2, 1))
+
+        assert dataset_version() != version
+        after = get_report()
+        assert after["summary"]["total_bars"] == before["summary"]["total_bars"] == 60
+        assert after["summary"]["market_days"] == 60
+        assert after["summary"]["series_with_gaps"] == 0
+        assert after["coverage"][0]["first_date"] == "2024-01-01"
+
+
+def test_company_writes_move_the_dataset_version(app, client, admin_headers):
+    with app.app_context():
+        version = dataset_version()
+
+    response = client.put("/api/v1/companies/1", json={"name": "Wegagen"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    with app.app_context():
+        assert dataset_version() != version
@@ -0,0 +1,60 @@
+"""SQLite engine profiles: the pragmas every pooled connection actually runs with"""
+import pytest
+
+from app import create_app
+from api.utils.database import effective_settings
+
+
+def make_app(config, **settings):
+    return create_app(type("ProfileConfig", (config,), settings))
+
+
+@pytest.mark.parametrize("profile", ["production", "development"])
+def test_file_profiles_run_in_wal(config, profile):
+    app = make_app(config, DB_PROFILE=profile)
+    with app.app_context():
+        settings = effective_settings()
+
+    assert settings["profile"] == profile
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["temp_store"] == 2  # MEMORY
+    assert settings["busy_timeout"] == 5000
+    assert settings["cache_size"] == {"production": -64000, "development": -16000}[profile]
+    assert settings["pool"]["class"] == "QueuePool"
+    assert settings["pool"]["size"] == config.DB_POOL_SIZE
+    # The read-only pool shares the file's journal mode and its own pragmas
+    assert settings["reader"]["journal_mode"] == "wal"
+    assert settings["reader"]["cache_size"] == settings["cache_size"]
+    assert settings["reader"]["pool"]["size"] == config.DB_READ_POOL_SIZE
+
+
+def test_testing_profile_trades_durability_for_speed(config):
+    app = make_app(config, DB_PROFILE="testing")
+    with app.app_context():
+        settings = effective_settings()
+
+    assert (settings["journal_mode"], settings["synchronous"], settings["busy_timeout"]) == ("memory", 0, 1000)
+
+
+def test_unknown_profile_falls_back_to_production(config):
+    app = make_app(config, DB_PROFILE="staging")
+    with app.app_context():
+        settings = effective_settings()
+
+    assert settings["profile"] == "production"
+    assert settings["cache_size"] == -64000
+
+
+def test_explicit_engine_options_win(config):
+    app = make_app(config, DB_PROFILE="production", SQLALCHEMY_ENGINE_OPTIONS={"pool_size": 3})
+    with app.app_context():
+        assert effective_settings()["pool"]["size"] == 3
+
+
+def test_health_reports_settings(config):
+    app = make_app(config, DB_PROFILE="production", DB_READ_ROUTING=False)
+    body = app.test_client().get("/health").get_json()
+
+    assert body["database_settings"]["journal_mode"] == "wal"
+    assert "reader" not in body["database_settings"]
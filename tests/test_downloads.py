@@ -0,0 +1,218 @@
+"""Direct download endpoints"""
+import csv
+import io
+from datetime import date, timedelta
+
+import pytest
+
+from api.models.models import db, Financial, MacroIndicators, Stock
+
+START = date(2025, 4, 7)  # a Monday
+
+
+@pytest.fixture
+def market(app):
+    """Ten weekdays of bars for WGB and ETC, two annual statements and three months of macro data"""
+    with app.app_context():
+        for offset in range(14):
+            day = START + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            for company_id, base in ((1, 10.0), (2, 20.0)):
+                close = base + offset / 10
+                db.session.add(Stock(company_id=company_id, date=day, open=close - 0.25, high=close + 0.5,
+                                     low=close - 0.5, close=close, volume=100 * (offset + 1)))
+        for year, revenue in ((2023, 1000.5), (2024, None)):
+            db.session.add(Financial(company_id=1, year=year, period="Annual", revenue=revenue,
+                                     net_income=100.25, total_assets=5000.0))
+        for month in (1, 2, 3):
+            db.session.add(MacroIndicators(
+                date=date(2025, month, 1), gdp_growth=6.1, inflation_rate=20.0 + month, interest_rate=7.0,
+                etb_usd=56.0 + month, etb_eur=61.0, etb_gbp=71.0, etb_jpy=0.38,
+            ))
+        db.session.commit()
+
+
+def csv_rows(response):
+    assert response.status_code == 200, response.get_json()
+    return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+
+def test_stocks_csv_is_ordered_by_ticker_then_date(client, market):
+    rows = csv_rows(client.get("/api/v1/download/stocks?tickers=WGB,ETC"))
+
+    assert rows[0] == ["Ticker", "Date", "Open", "High", "Low", "Close", "Volume"]
+    assert len(rows) == 1 + 2 * 10
+    assert [row[0] for row in rows[1:]] == ["ETC"] * 10 + ["WGB"] * 10
+    assert rows[1] == ["ETC", "2025-04-07", "19.75", "20.5", "19.5", "20.0", "100"]
+    assert [row[1] for row in rows[11:]] == sorted(row[1] for row in rows[11:])
+
+
+def test_stocks_filters_and_rollups(client, market):
+    rows = csv_rows(client.get("/api/v1/download/stocks?tickers=WGB&start_date=2025-04-08&end_date=2025-04-09"))
+    assert [row[1] for row in rows[1:]] == ["2025-04-08", "2025-04-09"]
+
+    weekly = csv_rows(client.get("/api/v1/download/stocks?tickers=WGB&interval=weekly"))
+    # Monday-dated weeks: open of the Monday, close of the Friday, summed volume
+    assert weekly[1:] == [
+        ["WGB", "2025-04-07", "9.75", "10.9", "9.5", "10.4", str(100 * (1 + 2 + 3 + 4 + 5))],
+        ["WGB", "2025-04-14", "10.45", "11.6", "10.2", "11.1", str(100 * (8 + 9 + 10 + 11 + 12))],
+    ]
+
+
+@pytest.mark.parametrize("query, status", [
+    ("tickers=WGB,NOPE", 400),
+    ("interval=hourly", 400),
+    ("start_date=2025-04-10&end_date=2025-04-01", 400),
+    ("tickers=CBE", 404),
+])
+def test_stocks_rejects_bad_requests(client, market, query, status):
+    assert client.get(f"/api/v1/download/stocks?{query}").status_code == status
+
+
+def read_columnar(response, file_format):
+    pa = pytest.importorskip("pyarrow")
+    assert response.status_code == 200, response.get_json()
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(pa.BufferReader(response.data))
+    import pyarrow.ipc
+
+    return pyarrow.ipc.open_file(pa.BufferReader(response.data)).read_all()
+
+
+COLUMNAR = ["parquet", "arrow"]
+
+
+@pytest.mark.parametrize("file_format", COLUMNAR)
+def test_stocks_columnar_is_typed(client, market, file_format):
+    table = read_columnar(client.get(f"/api/v1/download/stocks?format={file_format}"), file_format)
+
+    assert [(field.name, str(field.type)) for field in table.schema] == [
+        ("Ticker", "string"), ("Date", "date32[day]"), ("Open", "double"), ("High", "double"),
+        ("Low", "double"), ("Close", "double"), ("Volume", "int64"),
+    ]
+    assert table.num_rows == 20
+    assert table.slice(0, 1).to_pylist() == [{
+        "Ticker": "ETC", "Date": START, "Open": 19.75, "High": 20.5, "Low": 19.5, "Close": 20.0, "Volume": 100,
+    }]
+
+
+@pytest.mark.parametrize("file_format", COLUMNAR)
+def test_companies_columnar_is_typed(client, file_format):
+    table = read_columnar(client.get(f"/api/v1/download/companies?format={file_format}"), file_format)
+
+    types = {field.name: str(field.type) for field in table.schema}
+    assert (types["ID"], types["Ticker"], types["Established Date"]) == ("int64", "string", "date32[day]")
+    assert table.column("Established Date").to_pylist() == [date(1990, 1, 1)] * 5
+
+
+@pytest.mark.parametrize("file_format", COLUMNAR)
+def test_financials_columnar_keeps_nulls(client, market, file_format):
+    table = read_columnar(client.get(f"/api/v1/download/financials/1?format={file_format}"), file_format)
+
+    types = {field.name: str(field.type) for field in table.schema}
+    assert (types["Year"], types["Period"], types["Revenue"]) == ("int64", "string", "double")
+    assert table.column("Revenue").to_pylist() == [1000.5, None]
+    assert table.column("Net Income").to_pylist() == [100.25, 100.25]
+
+
+@pytest.mark.parametrize("file_format", COLUMNAR)
+def test_macro_columnar_selects_variables(client, market, file_format):
+    url = f"/api/v1/download/macro?format={file_format}&variables=etb_usd,inflation_rate&date_from=2025-02-01"
+    table = read_columnar(client.get(url), file_format)
+
+    assert [(field.name, str(field.type)) for field in table.schema] == [
+        ("date", "date32[day]"), ("etb_usd", "double"), ("inflation_rate", "double"),
+    ]
+    assert table.to_pylist() == [
+        {"date": date(2025, 2, 1), "etb_usd": 58.0, "inflation_rate": 22.0},
+        {"date": date(2025, 3, 1), "etb_usd": 59.0, "inflation_rate": 23.0},
+    ]
+
+
+def test_columnar_matches_csv(client, market):
+    rows = csv_rows(client.get("/api/v1/download/stocks"))
+    table = read_columnar(client.get("/api/v1/download/stocks?format=parquet"), "parquet")
+
+    assert [
+        [str(value) for value in record.values()] for record in table.to_pylist()
+    ] == rows[1:]
+
+
+@pytest.mark.parametrize("url, status", [
+    ("/api/v1/download/macro?format=parquet&variables=nope", 400),
+    ("/api/v1/download/financials/99?format=arrow", 404),
+])
+def test_columnar_errors_are_json(client, url, status):
+    response = client.get(url)
+    assert response.status_code == status
+    assert "error" in response.get_json()
+
+
+def read_workbook(response):
+    openpyxl = pytest.importorskip("openpyxl")
+    assert response.status_code == 200, response.get_json()
+    assert response.mimetype == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return openpyxl.load_workbook(io.BytesIO(response.data))
+
+
+def sheet_values(sheet):
+    return [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def test_stocks_excel_has_a_sheet_per_ticker(client, market):
+    workbook = read_workbook(client.get("/api/v1/download/stocks?format=excel&tickers=WGB,ETC"))
+
+    assert workbook.sheetnames == ["ETC", "WGB"]
+    rows = sheet_values(workbook["WGB"])
+    assert rows[0] == ["Date", "Open", "High", "Low", "Close", "Volume"]
+    assert len(rows) == 1 + 10
+    # Dates and numbers are real cells, not text
+    assert rows[1][0].date() == START
+    assert rows[1][1:] == [9.75, 10.5, 9.5, 10.0, 100]
+    assert workbook["WGB"].freeze_panes == "A2"
+
+
+def test_stocks_excel_ticker_limit(client, market, monkeypatch):
+    monkeypatch.setattr("api.download_api.STOCK_EXCEL_MAX_TICKERS", 1)
+
+    response = client.get("/api/v1/download/stocks?format=excel&tickers=WGB,ETC")
+
+    assert response.status_code == 400
+    assert "limited to 1 tickers" in response.get_json()["error"]
+
+
+def test_companies_excel(client):
+    workbook = read_workbook(client.get("/api/v1/download/companies?format=excel&sector=Financials"))
+
+    rows = sheet_values(workbook["Data"])
+    assert rows[0][:3] == ["ID", "Name", "Ticker"]
+    assert [row[2] for row in rows[1:]] == ["WGB", "ETC", "CBE", "DAS", "AWB"]
+    assert rows[1][7].date() == date(1990, 1, 1)
+
+
+def test_financials_excel_leaves_nulls_blank(client, market):
+    workbook = read_workbook(client.get("/api/v1/download/financials/1?format=excel"))
+
+    rows = sheet_values(workbook["Data"])
+    revenue = rows[0].index("Revenue")
+    assert [row[revenue] for row in rows[1:]] == [1000.5, None]
+
+
+def test_macro_excel(client, market):
+    workbook = read_workbook(client.get("/api/v1/download/macro?format=excel&variables=etb_usd"))
+
+    rows = sheet_values(workbook["Data"])
+    assert rows[0] == ["date", "etb_usd"]
+    assert [(row[0].date(), row[1]) for row in rows[1:]] == [
+        (date(2025, 1, 1), 57.0), (date(2025, 2, 1), 58.0), (date(2025, 3, 1), 59.0),
+    ]
+
+
+def test_empty_excel_is_404(client, market):
+    response = client.get("/api/v1/download/macro?format=excel&date_from=2030-01-01")
+
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "No data found for the specified criteria"
@@ -0,0 +1,101 @@
+"""Export jobs and bundles"""
+import io
+import json
+import zipfile
+
+import pytest
+
+from app import create_app
+from api.utils import exports
+from api.utils.errors import APIError
+
+
+@pytest.mark.parametrize("url, body", [
+    ("/api/v1/download/jobs", {"dataset": "companies", "format": "ndjson"}),
+    ("/api/v1/download/bundle", {"members": [{"dataset": "companies", "format": "ndjson"}]}),
+])
+def test_unsupported_format_is_rejected(client, url, body):
+    response = client.post(url, json=body)
+
+    assert response.status_code == 400
+    assert "format must be one of csv, excel, parquet, arrow" in response.get_json()["error"]
+
+
+def test_export_job_builds_once_and_downloads(client, poll):
+    response = client.post("/api/v1/download/jobs", json={"dataset": "companies", "format": "csv"})
+    assert response.status_code in (200, 202)
+    job = poll(response.get_json()["status_url"])
+
+    assert job["status"] == "finished"
+    assert job["rows"] == 5
+    again = client.post("/api/v1/download/jobs", json={"dataset": "companies", "format": "csv"})
+    assert (again.status_code, again.get_json()["id"]) == (200, job["id"])
+    download = client.get(job["download_url"])
+    assert download.status_code == 200
+    assert b"Wegagen Bank" in download.data
+
+
+def test_export_jobs_are_shared_between_workers(app, config, client, poll):
+    # A second worker process: same database and export folder, own memory
+    other = create_app(config).test_client()
+    response = client.post("/api/v1/download/jobs", json={"dataset": "companies", "format": "csv"})
+    status_url = response.get_json()["status_url"]
+
+    job = poll(status_url, client=other)
+    assert job["status"] == "finished"
+    again = other.post("/api/v1/download/jobs", json={"dataset": "companies", "format": "csv"})
+    assert (again.status_code, again.get_json()["id"]) == (200, job["id"])
+    assert b"Wegagen Bank" in other.get(job["download_url"]).data
+
+
+def test_bundle_zips_members_with_manifest(client):
+    response = client.post("/api/v1/download/bundle", json={"members": [
+        {"dataset": "companies", "format": "csv"},
+        {"dataset": "companies", "format": "parquet"},
+    ]})
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    manifest = json.loads(archive.read("manifest.json"))
+    assert [m["format"] for m in manifest["members"]] == ["csv", "parquet"]
+    assert all("error" not in m and m["rows"] == 5 for m in manifest["members"])
+    assert sorted(archive.namelist()) == sorted([m["name"] for m in manifest["members"]] + ["manifest.json"])
+
+    # Complete bundles are kept and served again from disk
+    assert client.get(response.headers["Content-Location"]).data == response.data
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/download/companies", "/api/v1/download/financials/1", "/api/v1/download/macro",
+    "/api/v1/download/stocks?tickers=WGB",
+])
+def test_direct_download_rejects_unknown_format(client, url):
+    separator = "&" if "?" in url else "?"
+    response = client.get(f"{url}{separator}format=parquett")
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "format must be one of csv, excel, parquet, arrow"
+
+
+def sheet(rows):
+    chunks = (chunk for chunk in [rows] if chunk)
+    return ("Data", [("Name", "string"), ("Close", "float64")], chunks)
+
+
+@pytest.mark.parametrize("sheets, status", [
+    ([sheet([]), sheet([])], 404),
+    ([sheet([("WGB", 10.5), ("ETC", 20.0), ("CBE", 30.0)])], 400),
+])
+def test_failed_workbook_is_closed_and_removed(tmp_path, monkeypatch, sheets, status):
+    closed = []
+    close = exports.xlsxwriter.Workbook.close
+    monkeypatch.setattr(exports.xlsxwriter.Workbook, "close", lambda self: closed.append(close(self)))
+    monkeypatch.setattr(exports, "EXCEL_MAX_ROWS", 3)
+    path = tmp_path / "export.xlsx"
+
+    with pytest.raises(APIError) as error:
+        exports.write_xlsx(str(path), iter(sheets))
+
+    assert error.value.status_code == status
+    assert len(closed) == 1
+    assert not path.exists()
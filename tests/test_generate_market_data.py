@@ -0,0 +1,95 @@
+"""Synthetic market data generator: reproducible, consistent and loadable by ingestion"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_market_data as generator
+from api.models.models import Company, CompanyNews, Financial, MacroIndicators, Stock
+from api.utils.ingestion import ingest_file
+
+END_DATE = "2025-06-30"
+FIRST_ID = 100  # clear of the seeded companies
+
+
+def dataset(seed=7, companies=3, years=1):
+    rng = np.random.default_rng(seed)
+    days = generator.trading_days(years, END_DATE)
+    company_frame = generator.generate_companies(rng, companies, FIRST_ID)
+    ids = company_frame["id"].to_numpy()
+    return {
+        "companies": company_frame,
+        "stocks": generator.generate_bars(rng, ids, days),
+        "financials": generator.generate_financials(rng, ids, sorted(set(days.year))),
+        "macro": generator.generate_macro(rng, years, END_DATE),
+        "news": generator.generate_news(rng, company_frame, 2, days),
+    }
+
+
+def test_tickers_are_unique_and_four_letters():
+    tickers = [generator.make_ticker(i) for i in range(2000)]
+    assert tickers[:3] == ["AAAA", "AAAB", "AAAC"]
+    assert len(set(tickers)) == len(tickers)
+    assert all(len(t) == 4 and t.isalpha() for t in tickers)
+
+
+def test_same_seed_same_data():
+    first, second = dataset(), dataset()
+    for name in first:
+        pd.testing.assert_frame_equal(first[name], second[name])
+    assert not first["stocks"].equals(dataset(seed=8)["stocks"])
+
+
+def test_bars_are_consistent():
+    bars = dataset()["stocks"]
+    assert len(bars) == 3 * 252
+    assert bars["date"].max() == pd.Timestamp(END_DATE)
+    assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+    assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+    assert (bars["volume"] > 0).all()
+
+
+def test_financials_satisfy_identities():
+    financials = dataset()["financials"]
+    assert np.allclose(financials["total_assets"], financials["total_liabilities"] + financials["total_equity"])
+    assert np.allclose(financials["gross_profit"], financials["revenue"] - financials["cost_of_revenue"])
+    assert set(financials["period"]) == set(generator.PERIODS)
+
+
+def test_macro_has_every_exchange_rate():
+    macro = dataset()["macro"]
+    assert len(macro) == 12
+    assert macro[["etb_usd", "etb_eur", "etb_gbp", "etb_jpy"]].notna().all().all()
+    assert macro["etb_usd"].between(25, 145).all()
+
+
+def test_csv_output_loads_through_ingestion(app, tmp_path):
+    frames = dataset()
+    sink = generator.FileSink(str(tmp_path / "out"), "csv")
+    for name, df in frames.items():
+        sink.write(name, df)
+    sink.close()
+
+    with app.app_context():
+        results = {
+            name: ingest_file(str(tmp_path / "out" / f"{name}.csv"))
+            for name in ["companies", "stocks", "financials", "macro", "news"]
+        }
+        assert all(result["rows_rejected"] == 0 for result in results.values())
+        assert Company.query.filter(Company.id >= FIRST_ID).count() == 3
+        assert results["stocks"]["rows_quarantined"] == 0
+        assert Stock.query.count() == len(frames["stocks"])
+        assert Financial.query.count() == len(frames["financials"])
+        assert MacroIndicators.query.count() == 12
+        assert CompanyNews.query.count() == len(frames["news"])
+
+
+def test_parquet_output_appends_blocks(tmp_path):
+    pytest.importorskip("pyarrow")
+    frames = dataset()
+    sink = generator.FileSink(str(tmp_path), "parquet")
+    bars = frames["stocks"]
+    sink.write("stocks", bars.iloc[:100])
+    sink.write("stocks", bars.iloc[100:])
+    sink.close()
+
+    assert len(pd.read_parquet(tmp_path / "stocks.parquet")) == len(bars)
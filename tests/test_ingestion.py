@@ -0,0 +1,89 @@
+import pytest
+
+from api.models.models import CompanyNews, IngestedFile, Stock
+from api.utils import ingestion
+
+BARS = "ticker,date,open,high,low,close,volume\nWGB,2025-04-10,10,11,9,10.5,100\n"
+
+
+@pytest.fixture
+def bars_file(tmp_path):
+    path = tmp_path / "bars.csv"
+    path.write_text(BARS)
+    return str(path)
+
+
+def test_duplicate_content_is_skipped(app, bars_file):
+    with app.app_context():
+        assert ingestion.ingest_file(bars_file)["rows_loaded"] == 1
+        assert ingestion.ingest_file(bars_file) is None
+        assert Stock.query.count() == 1
+
+
+def test_rejected_file_is_retried(app, bars_file, monkeypatch):
+    def locked(path, result):
+        raise Exception("database is locked")
+
+    with app.app_context():
+        monkeypatch.setitem(ingestion.LOADERS, "stocks", locked)
+        with pytest.raises(ingestion.IngestionError):
+            ingestion.ingest_file(bars_file)
+        assert IngestedFile.query.one().status == "rejected"
+
+        monkeypatch.undo()
+        assert ingestion.ingest_file(bars_file)["rows_loaded"] == 1
+        ledger = IngestedFile.query.one()
+        assert (ledger.status, ledger.rows_loaded, ledger.error) == ("loaded", 1, None)
+        assert Stock.query.count() == 1
+
+
+def test_chunks_commit_separately(app, tmp_path, monkeypatch):
+    path = tmp_path / "bars.csv"
+    path.write_text("ticker,date,open,high,low,close,volume\n" + "".join(
+        f"WGB,2025-04-{day:02d},{10 + day / 10},{10.3 + day / 10},{9.9 + day / 10},{10.1 + day / 10},{100 + day}\n"
+        for day in range(1, 11)
+    ))
+    monkeypatch.setattr(ingestion, "CHUNK_SIZE", 4)
+    real = ingestion.LOADERS["stocks"]
+    calls = []
+
+    def fail_third_chunk(df, result):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise Exception("disk I/O error")
+        real(df, result)
+
+    with app.app_context():
+        monkeypatch.setitem(ingestion.LOADERS, "stocks", fail_third_chunk)
+        with pytest.raises(ingestion.IngestionError) as failure:
+            ingestion.ingest_file(str(path))
+        # The first two chunks stay committed and are reported
+        assert failure.value.result["rows_loaded"] == 8
+        assert Stock.query.count() == 8
+        assert IngestedFile.query.one().rows_loaded == 8
+
+        monkeypatch.setitem(ingestion.LOADERS, "stocks", real)
+        assert ingestion.ingest_file(str(path))["rows_loaded"] == 10
+        assert Stock.query.count() == 10
+
+
+def test_news_retry_does_not_duplicate(app, tmp_path, monkeypatch):
+    path = tmp_path / "news.csv"
+    path.write_text("ticker,title,content,published_date\n" + "".join(
+        f"WGB,Item {i},Body,2025-04-{i:02d} 09:00:00\n" for i in range(1, 7)
+    ))
+    monkeypatch.setattr(ingestion, "CHUNK_SIZE", 3)
+    real = ingestion.LOADERS["news"]
+
+    def fail_second_chunk(df, result):
+        if df.index[0] > 0:
+            raise Exception("database is locked")
+        real(df, result)
+
+    with app.app_context():
+        monkeypatch.setitem(ingestion.LOADERS, "news", fail_second_chunk)
+        with pytest.raises(ingestion.IngestionError):
+            ingestion.ingest_file(str(path))
+        monkeypatch.setitem(ingestion.LOADERS, "news", real)
+        assert ingestion.ingest_file(str(path))["rows_loaded"] == 3
+        assert CompanyNews.query.count() == 6
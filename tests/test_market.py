@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+from app import create_app
+from api.models.models import db, Stock
+from api.utils.ingestion import ingest_file
+
+
+def add_bars(app, day, closes):
+    with app.app_context():
+        for company_id, close in closes.items():
+            db.session.add(Stock(company_id=company_id, date=day, open=close, high=close, low=close,
+                                 close=close, volume=1000))
+        db.session.commit()
+
+
+def test_leaders_follow_loads_from_another_process(app, config, client, tmp_path):
+    add_bars(app, date(2025, 4, 9), {1: 10.0, 2: 20.0})
+    add_bars(app, date(2025, 4, 10), {1: 11.0, 2: 19.0})
+    leaders = client.get("/api/v1/market/leaders").get_json()
+    assert leaders["metadata"]["date"] == "2025-04-10"
+    assert [g["ticker"] for g in leaders["market_leaders"]["top_gainers"]][0] == "WGB"
+
+    # The drop-folder service is its own app with its own caches
+    bars = tmp_path / "bars.csv"
+    bars.write_text("ticker,date,open,high,low,close,volume\n"
+                    "WGB,2025-04-11,11,11,10,10.5,500\nETC,2025-04-11,19,21,19,21,500\n")
+    service = create_app(config)
+    with service.app_context():
+        assert ingest_file(str(bars))["rows_loaded"] == 2
+    service.extensions["write_queue"].stop()
+
+    leaders = client.get("/api/v1/market/leaders").get_json()
+    assert leaders["metadata"]["date"] == "2025-04-11"
+    assert leaders["market_leaders"]["top_gainers"][0]["ticker"] == "ETC"
+    assert leaders["market_leaders"]["top_gainers"][0]["price"] == 21.0
+
+
+def test_summary(app, client):
+    add_bars(app, date(2025, 4, 9), {1: 10.0, 2: 20.0})
+    add_bars(app, date(2025, 4, 10), {1: 11.0, 2: 19.0})
+    response = client.get("/api/v1/market/summary")
+    assert response.status_code == 200
+    summary = response.get_json()["summary"]
+    assert (summary["active_companies"], summary["gainers"], summary["losers"]) == (2, 1, 1)
+    assert summary["market_cap"] is None
+
+
+def test_stock_summary_follows_loads_from_another_process(app, config, client, tmp_path):
+    today = date.today()
+    add_bars(app, today - timedelta(days=2), {1: 10.0})
+    add_bars(app, today - timedelta(days=1), {1: 11.0})
+    assert client.get("/api/v1/stocks/1/summary").get_json()["summary"]["current_price"] == 11.0
+
+    bars = tmp_path / "bars.csv"
+    bars.write_text(f"ticker,date,open,high,low,close,volume\nWGB,{today},11,12.5,11,12,500\n")
+    service = create_app(config)
+    with service.app_context():
+        assert ingest_file(str(bars))["rows_loaded"] == 1
+    service.extensions["write_queue"].stop()
+
+    summary = client.get("/api/v1/stocks/1/summary").get_json()["summary"]
+    assert (summary["current_price"], summary["high_30d"], summary["last_updated"]) == (12.0, 12.5, today.isoformat())
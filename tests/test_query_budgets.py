@@ -0,0 +1,57 @@
+"""Per-endpoint query budgets, measured on a cold cache.
+
+Every company has bars, statements and macro rows behind it, so a loop that
+queries per company or per row blows the budget.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from api.models.models import db, Company, Financial, MacroIndicators, Stock
+
+BUDGETS = [
+    ("/api/v1/market/summary", 5),
+    ("/api/v1/market/leaders", 6),
+    ("/api/v1/market/trends?days=30", 3),
+    ("/api/v1/market/sectors?days=30", 3),
+    ("/api/v1/stocks/1", 4),
+    ("/api/v1/stocks/1/latest", 3),
+    ("/api/v1/stocks/1/summary", 3),
+    ("/api/v1/companies", 2),
+    ("/api/v1/companies/1", 1),
+    ("/api/v1/financials/1", 3),
+    ("/api/v1/financials/1/latest", 3),
+    ("/api/v1/macro/indicators", 2),
+    ("/api/v1/macro/latest", 2),
+]
+
+
+@pytest.fixture
+def market_data(app):
+    today = date.today()
+    with app.app_context():
+        for (company_id,) in db.session.query(Company.id).all():
+            for days_ago in range(20):
+                close = 10 + company_id + days_ago % 3
+                db.session.add(Stock(
+                    company_id=company_id, date=today - timedelta(days=days_ago),
+                    open=close - 0.5, high=close + 1, low=close - 1, close=close, volume=1000,
+                ))
+            for year in (2023, 2024):
+                db.session.add(Financial(
+                    company_id=company_id, year=year, period="Annual",
+                    revenue=100.0, net_income=10.0, total_assets=500.0,
+                ))
+        for month in range(1, 13):
+            db.session.add(MacroIndicators(
+                date=date(2024, month, 1), gdp_growth=6.0, inflation_rate=20.0, interest_rate=7.0,
+                etb_usd=56.0, etb_eur=61.0, etb_gbp=71.0, etb_jpy=0.38,
+            ))
+        db.session.commit()
+
+
+@pytest.mark.parametrize("url, budget", BUDGETS, ids=[url for url, _ in BUDGETS])
+def test_query_budget(client, market_data, max_queries, url, budget):
+    with max_queries(budget):
+        response = client.get(url)
+    assert response.status_code == 200, response.get_json()
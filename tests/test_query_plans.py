@@ -0,0 +1,12 @@
+"""Hot endpoint queries must be index seeks; see check_query_plans.py"""
+import pytest
+
+from check_query_plans import HOT_QUERIES, plan_problems, query_plan
+
+
+@pytest.mark.parametrize("statement", [statement for _, statement in HOT_QUERIES],
+                         ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_index(app, statement):
+    with app.app_context():
+        plan = query_plan(statement)
+    assert not plan_problems(plan), plan
@@ -0,0 +1,64 @@
+"""Read routing: safe requests read through the read-only pool, writes never do"""
+import pytest
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from api.models.models import db, Company
+from api.models.session import READER_BIND
+
+
+@pytest.fixture
+def statements(app):
+    """Statements run on each engine, keyed by bind"""
+    seen = {"writer": [], READER_BIND: []}
+    with app.app_context():
+        engines = {"writer": db.engine, READER_BIND: db.engines[READER_BIND]}
+    for key, engine in engines.items():
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args, key=key: seen[key].append(statement))
+    return seen
+
+
+def test_safe_requests_read_from_the_reader(app):
+    query = select(Company)
+    with app.test_request_context(method="GET"):
+        reader = db.engines[READER_BIND]
+        assert db.session.get_bind(clause=query) is reader
+        # DML is never routed, even inside a GET
+        assert db.session.get_bind(clause=insert(Company)) is db.engine
+    with app.test_request_context(method="POST"):
+        assert db.session.get_bind(clause=query) is db.engine
+    with app.app_context():
+        assert db.session.get_bind(clause=query) is db.engine
+
+
+def test_get_endpoint_runs_on_the_reader(client, user_headers, statements):
+    assert client.get("/api/v1/companies", headers=user_headers).status_code == 200
+
+    assert any("FROM company" in s for s in statements[READER_BIND])
+    assert not any("FROM company" in s for s in statements["writer"])
+
+
+def test_writes_go_to_the_writer(client, admin_headers, statements):
+    response = client.put("/api/v1/companies/1", json={"name": "Renamed"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert any(s.startswith("UPDATE company") for s in statements["writer"])
+    assert not any(s.startswith("UPDATE") for s in statements[READER_BIND])
+    assert client.get("/api/v1/companies/1", headers=admin_headers).get_json()["name"] == "Renamed"
+
+
+def test_reader_connection_is_read_only(app):
+    with app.app_context():
+        with db.engines[READER_BIND].connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM company")).scalar() == 5
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.execute(text("UPDATE company SET name = 'x' WHERE id = 1"))
+
+
+def test_routing_can_be_switched_off(config):
+    app = create_app(type("NoRouting", (config,), {"DB_READ_ROUTING": False}))
+    with app.test_request_context(method="GET"):
+        assert READER_BIND not in db.engines
+        assert db.session.get_bind(clause=select(Company)) is db.engine
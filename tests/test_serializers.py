@@ -0,0 +1,120 @@
+"""Core-row serializers produce what the ORM helpers they replaced produced"""
+from datetime import date
+
+import pytest
+
+from api.models.models import db, Financial, MacroIndicators, Stock
+from api.utils.serializers import RowSerializer
+
+
+# The per-instance helpers the list endpoints used before, kept as the reference
+def orm_stock(stock):
+    return {
+        "date": stock.date.strftime("%Y-%m-%d"),
+        "open": float(stock.open),
+        "close": float(stock.close),
+        "high": float(stock.high),
+        "low": float(stock.low),
+        "volume": stock.volume,
+        "change": round(((stock.close - stock.open) / stock.open) * 100, 2),
+    }
+
+
+def orm_financial(record):
+    numbers = [
+        "revenue", "cost_of_revenue", "gross_profit", "operating_expenses", "operating_income",
+        "net_income", "total_assets", "total_liabilities", "total_equity", "current_ratio",
+        "debt_to_equity", "return_on_equity", "return_on_assets", "profit_margin",
+    ]
+    return {
+        "id": record.id,
+        "company_id": record.company_id,
+        "year": record.year,
+        "period": record.period,
+        **{name: float(getattr(record, name)) if getattr(record, name) else None for name in numbers},
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+        "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+    }
+
+
+def orm_macro(record):
+    numbers = [
+        "gdp_growth", "gdp_per_capita", "inflation_rate", "interest_rate", "unemployment_rate",
+        "etb_usd", "etb_eur", "etb_gbp", "etb_jpy", "total_deposits", "total_loans", "npl_ratio",
+    ]
+    return {
+        "id": record.id,
+        "date": record.date.strftime("%Y-%m-%d"),
+        **{name: float(getattr(record, name)) if getattr(record, name) else None for name in numbers},
+    }
+
+
+@pytest.fixture
+def records(app):
+    with app.app_context():
+        for day, close in ((date(2025, 4, 9), 10.25), (date(2025, 4, 10), 10.75)):
+            db.session.add(Stock(company_id=1, date=day, open=10.5, high=11.0, low=10.0,
+                                 close=close, volume=1200))
+        for year in (2023, 2024):
+            db.session.add(Financial(
+                company_id=1, year=year, period="Annual", revenue=1000.0 * year, cost_of_revenue=600.0,
+                gross_profit=1000.0 * year - 600, operating_expenses=150.5, operating_income=249.5,
+                net_income=180.25, total_assets=5000.0, total_liabilities=3000.0, total_equity=2000.0,
+                current_ratio=1.4, debt_to_equity=1.5, return_on_equity=9.01, return_on_assets=3.6,
+                profit_margin=None,
+            ))
+        for month in (1, 2):
+            db.session.add(MacroIndicators(
+                date=date(2025, month, 1), gdp_growth=6.1, inflation_rate=20.5 + month,
+                interest_rate=7.0, etb_usd=56.5 + month, etb_eur=61.2, etb_gbp=71.4, etb_jpy=0.38,
+                total_deposits=1.45e6, npl_ratio=3.4,
+            ))
+        db.session.commit()
+
+
+def test_stock_rows_match_orm(app, client, records):
+    with app.app_context():
+        expected = [orm_stock(s) for s in Stock.query.filter_by(company_id=1).order_by(Stock.date)]
+
+    assert client.get("/api/v1/stocks/1").get_json()["data"] == expected
+    assert client.get("/api/v1/stocks/1/latest").get_json()["latest_stock"] == expected[-1]
+
+
+def test_financial_rows_match_orm(app, client, user_headers, records):
+    with app.app_context():
+        expected = [orm_financial(f) for f in Financial.query.order_by(Financial.year)]
+
+    body = client.get("/api/v1/financials/1", headers=user_headers).get_json()
+    assert sorted(body["data"], key=lambda r: r["year"]) == expected
+    latest = client.get("/api/v1/financials/1/latest", headers=user_headers).get_json()
+    assert latest["latest_financials"] == expected[-1]
+
+
+def test_macro_rows_match_orm(app, client, records):
+    with app.app_context():
+        expected = [orm_macro(m) for m in MacroIndicators.query.order_by(MacroIndicators.date)]
+
+    body = client.get("/api/v1/macro/indicators").get_json()
+    assert sorted(body["data"], key=lambda r: r["date"]) == expected
+    assert client.get("/api/v1/macro/latest").get_json()["latest_indicators"] == expected[-1]
+
+
+def test_zero_stays_zero(app):
+    # The ORM helpers turned 0.0 into null; a zero volume or rate is a value
+    with app.app_context():
+        db.session.add(Stock(company_id=1, date=date(2025, 4, 9), open=0.0, high=1.0, low=0.0,
+                             close=1.0, volume=0))
+        db.session.commit()
+        rows = RowSerializer([("open", Stock.open), ("volume", Stock.volume)])
+        assert rows.all(rows.select()) == [{"open": 0.0, "volume": 0}]
+
+
+def test_converters_and_derived_skip_nulls():
+    rows = RowSerializer(
+        [("a", None), ("b", None, str.upper)],
+        derived=[("both", lambda record: f"{record['a']}{record['b']}")],
+    )
+    assert rows.serialize([(1, "x"), (2, None)]) == [
+        {"a": 1, "b": "X", "both": "1X"},
+        {"a": 2, "b": None, "both": "2None"},
+    ]
@@ -0,0 +1,63 @@
+"""Slow-query log: statements over SLOW_QUERY_MS are aggregated with their plan"""
+import pytest
+
+from api.utils.slow_queries import SlowQueryLog, normalize_sql
+
+
+@pytest.fixture
+def config(config):
+    class SlowConfig(config):
+        SLOW_QUERY_MS = 0  # every statement is slow
+
+    return SlowConfig
+
+
+def test_literals_and_in_lists_share_a_shape():
+    assert normalize_sql("SELECT *\n  FROM stock WHERE company_id IN (?, ?, ?) AND close > 10.5") == (
+        "SELECT * FROM stock WHERE company_id IN (?, ...) AND close > ?"
+    )
+    assert normalize_sql("SELECT * FROM company WHERE ticker = 'WGB'") == normalize_sql(
+        "SELECT * FROM company WHERE ticker = 'CBE'"
+    )
+
+
+def test_least_recently_seen_fingerprint_is_evicted():
+    log = SlowQueryLog(threshold_ms=0, size=2)
+    plans = []
+
+    def explain():
+        plans.append(1)
+        return ["SCAN t"]
+
+    for statement in ["SELECT 1 FROM a", "SELECT 1 FROM b", "SELECT 2 FROM a", "SELECT 1 FROM c"]:
+        log.record(statement, (), 0.01, "test", explain)
+
+    entries = {entry["sql"]: entry for entry in log.entries()}
+    assert set(entries) == {"SELECT ? FROM a", "SELECT ? FROM c"}
+    assert entries["SELECT ? FROM a"]["count"] == 2
+    # One plan per fingerprint, not per execution
+    assert len(plans) == 3
+
+
+def test_slow_request_query_is_logged_with_plan(client, admin_headers, user_headers):
+    client.delete("/api/v1/admin/slow-queries", headers=admin_headers)
+    assert client.get("/api/v1/companies", headers=user_headers).status_code == 200
+
+    body = client.get("/api/v1/admin/slow-queries?limit=500", headers=admin_headers).get_json()
+
+    assert body["threshold_ms"] == 0
+    listing = [
+        entry for entry in body["queries"]
+        if "company_api.get_companies" in entry["endpoints"] and "FROM company" in entry["sql"]
+    ]
+    assert listing
+    assert all(entry["plan"] and not entry["plan"][0].startswith("unavailable") for entry in listing)
+    assert all(entry["count"] >= 1 and entry["max_ms"] >= 0 for entry in listing)
+
+
+def test_log_is_admin_only_and_clearable(app, client, admin_headers, user_headers):
+    assert client.get("/api/v1/admin/slow-queries", headers=user_headers).status_code == 403
+
+    assert client.delete("/api/v1/admin/slow-queries", headers=admin_headers).status_code == 200
+    # Statements run before the clear are gone; nothing runs after it
+    assert app.extensions["slow_query_log"].entries() == []
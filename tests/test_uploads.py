@@ -0,0 +1,37 @@
+"""Admin file uploads, ingested in the background"""
+import io
+
+from api.models.models import db, Stock
+
+BARS = (
+    "ticker,date,open,high,low,close,volume\n"
+    "WGB,2025-04-10,10,11,9,10.5,100\n"
+    "WGB,2025-04-11,10.5,11.5,10,11,120\n"
+    "XXX,2025-04-11,10.5,11.5,10,11,120\n"
+)
+
+
+def upload(client, headers, data, filename="bars.csv"):
+    return client.post(
+        "/api/v1/admin/uploads", headers=headers,
+        data={"file": (io.BytesIO(data.encode()), filename)}, content_type="multipart/form-data",
+    )
+
+
+def test_upload_is_ingested_with_a_rejection_report(app, client, admin_headers, poll):
+    response = upload(client, admin_headers, BARS)
+    assert response.status_code == 202
+    status = poll(response.get_json()["status_url"], headers=admin_headers)
+
+    assert (status["status"], status["rows_loaded"], status["rows_rejected"]) == ("loaded", 2, 1)
+    report = client.get(status["report_url"], headers=admin_headers)
+    assert report.status_code == 200
+    assert report.data.splitlines() == [b"row,error", b"4,Unknown company"]
+    with app.app_context():
+        assert db.session.query(Stock).filter_by(company_id=1).count() == 2
+
+
+def test_upload_is_admin_only_and_checks_the_file(client, admin_headers, user_headers):
+    assert upload(client, user_headers, BARS).status_code == 403
+    assert upload(client, admin_headers, BARS, filename="bars.txt").status_code == 400
+    assert upload(client, admin_headers, "a,b\n1,2\n").status_code == 400
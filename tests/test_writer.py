@@ -0,0 +1,53 @@
+"""Single-writer queue: timed-out writes are withdrawn, ingestion goes through the queue"""
+import sqlite3
+
+from api.models.models import db, Company
+from api.utils import writer
+from api.utils.ingestion import ingest_file
+
+
+def test_write_timeout_returns_503_and_is_never_applied(app, client, admin_headers):
+    app.config["WRITE_QUEUE_TIMEOUT"] = 0.3
+    with app.app_context():
+        path = db.engine.url.database
+
+    # Another process holds the write lock past the queue timeout
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        response = client.put("/api/v1/companies/1", json={"name": "Renamed"}, headers=admin_headers)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+    assert response.status_code == 503
+    assert "not applied" in response.get_json()["error"]["message"]
+
+    # Once the lock is free the writer drains its queue; the withdrawn job must not run
+    app.extensions["write_queue"].stop()
+    with app.app_context():
+        assert db.session.get(Company, 1).name == "Wegagen Bank"
+
+
+def test_ingestion_chunks_are_write_jobs(app, tmp_path, monkeypatch):
+    jobs = []
+    submit = writer.WriteQueue.submit
+
+    def recording_submit(self, fn, *args, **kwargs):
+        jobs.append(fn.__name__)
+        return submit(self, fn, *args, **kwargs)
+
+    monkeypatch.setattr(writer.WriteQueue, "submit", recording_submit)
+    monkeypatch.setattr("api.utils.ingestion.CHUNK_SIZE", 2)
+    path = tmp_path / "macro.csv"
+    path.write_text(
+        "date,gdp_growth,inflation_rate,interest_rate,etb_usd,etb_eur,etb_gbp,etb_jpy\n"
+        + "".join(f"2024-0{month}-01,6.1,20.5,7.0,56.{month},61.0,71.0,0.38\n" for month in range(1, 6))
+    )
+
+    with app.app_context():
+        result = ingest_file(str(path))
+
+    assert result["rows_loaded"] == 5
+    assert jobs.count("load_macro") == 3
+    assert "_record_file" in jobs